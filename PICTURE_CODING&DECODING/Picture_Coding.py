@@ -1,69 +1,66 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from PIL import Image
 import os
-import tkinter as tk
-from tkinter import filedialog, simpledialog
-
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from linecode import compression, framing, imagefile, parallel, profiling, registry
+from linecode.archive import ArchiveWriter
+from linecode.bitbuffer import BitBuffer
+from linecode.signalfile import write_signal
+
+# Kho chứa mọi ảnh đã mã hóa (mỗi ảnh một bản ghi tự mô tả, ghi thêm vào kho có sẵn)
+ARCHIVE_FILE = "encoded_images.lca"
+# Các kiểu nén trước khi mã hóa (linecode.compression)
+COMPRESSIONS = {1: "rle", 2: "delta+rle", 3: "delta+zlib", 4: "lzma"}
+
+# Đo từng khâu (đọc ảnh, nén, đóng khung, mã hóa, lưu, vẽ) khi đặt biến môi trường
+# LINECODE_PROFILE=<tiền tố>: kết quả ghi ra <tiền tố>.json và <tiền tố>.trace.json (linecode.profiling)
+@profiling.profiled(data=None)
 def image_to_binary(image_path):
-    """Chuyển đổi ảnh thành chuỗi nhị phân (BGR)"""
-    img = Image.open(image_path)
-    img_data = np.array(img)
-    binary_data = ''.join(format(pixel, '08b') for row in img_data for col in row for pixel in col)
-    return binary_data, img_data.shape
+    """Chuyển đổi ảnh thành chuỗi bit đóng gói (BitBuffer, lấy thẳng từ bộ đệm pixel theo mode) và shape của bộ đệm"""
+    pixels = imagefile.load_image(image_path).pixels
+    return BitBuffer.from_bytes(pixels), pixels.shape
 
 def unipolar_encoding(binary_data):
     """Mã hóa Unipolar từ dữ liệu nhị phân"""
-    encoded_signal = [1 if bit == '1' else 0 for bit in binary_data]
-    return encoded_signal
+    return parallel.encode(binary_data, "unipolar")
 
 def nrzl_encoding(binary_data):
     """Mã hóa NRZ-L từ dữ liệu nhị phân"""
-    encoded_signal = [-1 if bit == '1' else 1 for bit in binary_data]
-    return encoded_signal
+    return parallel.encode(binary_data, "nrz-l")
 
 def manchester_encoding(binary_data):
     """Mã hóa Manchester từ dữ liệu nhị phân"""
-    encoded_signal = []
-    for bit in binary_data:
-        if bit == '1':
-            encoded_signal.extend([-1, 1])  # Bit 1: -1 -> +1
-        else:
-            encoded_signal.extend([1, -1])  # Bit 0: +1 -> -1
-    return encoded_signal
+    return parallel.encode(binary_data, "manchester")
 
 def ami_encoding(binary_data):
     """Mã hóa AMI từ dữ liệu nhị phân"""
-    encoded_signal = []
-    last_polarity = 1  # Khởi tạo với +1 cho bit 1 đầu tiên
-    for bit in binary_data:
-        if bit == '1':
-            encoded_signal.append(last_polarity)
-            last_polarity = -last_polarity  # Chuyển đổi giữa +1 và -1 cho mỗi bit 1
-        else:
-            encoded_signal.append(0)  # Bit 0 là 0
-    return encoded_signal
+    return parallel.encode(binary_data, "ami")
 
 def two_b_one_q(binary_data):
     """Mã hóa 2B1Q từ dữ liệu nhị phân"""
-    signal, level = [], 1
-    transition_table = {'00': {'pos': 1, 'neg': -1}, '01': {'pos': 3, 'neg': -3},
-                        '10': {'pos': -1, 'neg': 1}, '11': {'pos': -3, 'neg': 3}}
-    
-    # Mã hóa từng cặp bit
-    for i in range(0, len(binary_data), 2):
-        pair = binary_data[i:i+2]
-        prev_state = 'pos' if level > 0 else 'neg'
-        level = transition_table.get(pair, {'pos': 0, 'neg': 0})[prev_state]
-        signal.append(level)
-    return np.array(signal)
-
-def save_signal_to_file(signal, filename):
-    """Lưu tín hiệu điện áp vào file text"""
-    with open(filename, 'w') as f:
-        f.write('\n'.join(map(str, signal)))
+    return parallel.encode(binary_data, "2b1q")
+
+def line_code_menu():
+    """Danh sách lựa chọn mã đường truyền cho hộp thoại, lấy từ bảng mã dùng chung (kể cả mã cắm thêm)"""
+    return ", ".join(f"{num}: {registry.get(code).label}" for num, code in enumerate(registry.names(), 1))
+
+def save_signal_to_file(signal, filename, code=None, img_size=None, framed=False):
+    """Lưu tín hiệu điện áp: file .txt theo kiểu cũ, còn lại theo định dạng nhị phân .lcs"""
+    with profiling.stage("save_signal_to_file", profiling.nbytes(signal)) as stage:
+        if filename.endswith('.txt'):
+            with open(filename, 'w') as f:
+                f.write('\n'.join(map(str, signal)))
+        else:
+            payload = None if img_size is None else {"shape": [int(n) for n in img_size], "dtype": "uint8"}
+            if framed:
+                payload = dict(payload or {}, framing={"payload_size": framing.FRAME_PAYLOAD})
+            write_signal(filename, signal, code, payload=payload)
+        stage.record(bytes_out=os.path.getsize(filename))
 
 def encode_image():
+    import tkinter as tk
+    from tkinter import filedialog, messagebox, simpledialog
     root = tk.Tk()
     root.withdraw()
     image_path = filedialog.askopenfilename(title="Chọn file ảnh", filetypes=[("Image Files", "*.png;*.jpg;*.jpeg;*.bmp")])
@@ -75,65 +72,69 @@ def encode_image():
         print("❌ Lỗi: Không tìm thấy file ảnh!")
         return
     
-    encoding_choice = simpledialog.askinteger("Lựa chọn mã hóa", "Nhập kiểu mã hóa (1: Unipolar, 2: NRZ-L, 3: Manchester, 4: AMI, 5: 2B1Q):")
-    if encoding_choice not in [1, 2, 3, 4, 5]:
-        print("❌ Lựa chọn không hợp lệ! Hãy nhập 1 (Unipolar), 2 (NRZ-L), 3 (Manchester), 4 (AMI) hoặc 5 (2B1Q).")
+    codes = registry.names()
+    encoding_choice = simpledialog.askinteger("Lựa chọn mã hóa", f"Nhập kiểu mã hóa ({line_code_menu()}):")
+    if encoding_choice not in range(1, len(codes) + 1):
+        print(f"❌ Lựa chọn không hợp lệ! Hãy nhập một số từ 1 đến {len(codes)} ({line_code_menu()}).")
         return
-
-    binary_data, img_size = image_to_binary(image_path)
-    print(f"✅ Ảnh đã chuyển thành {len(binary_data)} bit dữ liệu!")
+    code = codes[encoding_choice - 1]
+
+    with profiling.stage("image_to_binary", os.path.getsize(image_path)) as stage:
+        image = imagefile.load_image(image_path)
+        binary_data = BitBuffer.from_bytes(image.pixels)
+        stage.record(bytes_out=image.pixels.nbytes)
+    print(f"✅ Ảnh {image.mode} đã chuyển thành {len(binary_data)} bit dữ liệu!")
+
+    # Nén: ảnh nhiều vùng phẳng (ảnh chụp màn hình) cần ít ký hiệu hơn nhiều lần
+    compress_choice = simpledialog.askinteger("Nén dữ liệu", "Nén trước khi mã hóa (0: Không nén, 1: RLE, 2: Delta + RLE, 3: Delta + zlib, 4: LZMA):", initialvalue=0)
+    # Đóng khung: tín hiệu hỏng một đoạn chỉ làm mất các khung bị ảnh hưởng
+    framed = messagebox.askyesno("Đóng khung", "Đóng khung dữ liệu (từ đồng bộ + CRC mỗi khung)?")
+    compression_info = None
+    if compress_choice in COMPRESSIONS and framed:
+        # Nén riêng từng khung: khung hỏng chỉ làm mất phần ảnh của nó, không làm hỏng cả dòng nén
+        blocks, compression_info = profiling.call("compress", compression.compress_blocks, binary_data,
+                                                  COMPRESSIONS[compress_choice], framing.FRAME_PAYLOAD,
+                                                  imagefile.bytes_per_pixel(image))
+        print(f"🗜️ {compression.summary(compression_info)}")
+        binary_data = BitBuffer.from_bytes(profiling.call("frame", b''.join, framing.block_frames(blocks)))
+    elif compress_choice in COMPRESSIONS:
+        data, compression_info = profiling.call("compress", compression.compress, binary_data,
+                                                COMPRESSIONS[compress_choice], imagefile.bytes_per_pixel(image))
+        binary_data = BitBuffer.from_bytes(data)
+        print(f"🗜️ {compression.summary(compression_info)}")
+    elif framed:
+        binary_data = BitBuffer.from_bytes(profiling.call("frame", framing.frame, binary_data))
     
-    if encoding_choice == 1:
-        encoded_signal = unipolar_encoding(binary_data)
-        plot_signal(encoded_signal[:100], "Mã hóa Unipolar (100 bit đầu)", [0, 1], ['0', '1'])
-    elif encoding_choice == 2:
-        encoded_signal = nrzl_encoding(binary_data)
-        plot_signal(encoded_signal[:100], "Mã hóa NRZ-L (100 bit đầu)", [-1, 1], ['-1', '+1'])
-    elif encoding_choice == 3:
-        encoded_signal = manchester_encoding(binary_data)
-        plot_signal(encoded_signal[:100], "Mã hóa Manchester (100 bit đầu)", [-1, 1], ['-1', '+1'])
-    elif encoding_choice == 4:
-        encoded_signal = ami_encoding(binary_data)
-        plot_signal(encoded_signal[:100], "Mã hóa AMI (100 bit đầu)", [-1, 0, 1], ['-1', '0', '+1'])
-    else:
-        encoded_signal = two_b_one_q(binary_data)
-        plot_signal(encoded_signal[:100], "Mã hóa 2B1Q (100 bit đầu)", [-3, -1, 1, 3], ['-3', '-1', '1', '3'])
+    encoded_signal = profiling.call(f"encode {code}", parallel.encode, binary_data, code)
+    plot_signal(encoded_signal, f"Mã hóa {registry.get(code).label}", code)
     
-    # Lưu dữ liệu
+    # Lưu tín hiệu vào kho cùng kích thước, mode, bảng màu, mã đường truyền và CRC32 của ảnh
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    signal_file = os.path.join(script_dir, "encoded_image.txt")
-    size_file = os.path.join(script_dir, "image_size.npy")
-    
-    save_signal_to_file(encoded_signal, signal_file)
-    np.save(size_file, img_size)
-    print(f"✅ Dữ liệu điện áp đã được lưu vào '{signal_file}' và thông tin kích thước ảnh được lưu vào '{size_file}'")
-
-def plot_signal(signal, title, yticks, ylabels):
-    """Vẽ đồ thị tín hiệu mã hóa"""
-    plt.figure(figsize=(12, 4))
-    plt.rcParams['font.family'] = 'Times New Roman'  # Đổi font chữ
-
-    # Vẽ đồ thị bước
-    plt.step(range(len(signal)), signal, where='post', linewidth=2, color='black')  # Đường biểu đồ màu đen
-
-    # Điều chỉnh trục tung để không bị che tín hiệu
-    plt.ylim(min(yticks) - 0.1, max(yticks) + 0.1)
-    plt.yticks(yticks, ylabels)
-    
-    # Bỏ trục hoành
-    plt.xticks([])
-
-    # Thiết lập nhãn trục và tiêu đề
-    plt.xlabel("Thời gian (mẫu)")
-    plt.ylabel("Điện áp")
-    plt.title(title)
-
-    # Hiển thị lưới đứt đoạn
-    plt.grid(True, linestyle='dashed')
-
-    # Loại bỏ khung trên và bên phải
-    plt.gca().spines['top'].set_color('none')
-    plt.gca().spines['right'].set_color('none')
+    archive_file = os.path.join(script_dir, ARCHIVE_FILE)
+    name = os.path.basename(image_path)
+    payload = imagefile.image_payload(image, name)
+    if compression_info:
+        payload["compression"] = compression_info
+    if framed:
+        payload["framing"] = {"payload_size": framing.FRAME_PAYLOAD}
+    with profiling.stage("save_archive", encoded_signal.nbytes) as stage:
+        before = os.path.getsize(archive_file) if os.path.exists(archive_file) else 0
+        with ArchiveWriter(archive_file) as archive:
+            archive.write(name, encoded_signal, code, payload=payload)
+        stage.record(bytes_out=os.path.getsize(archive_file) - before)
+    print(f"✅ Ảnh '{name}' đã được lưu vào kho '{archive_file}'")
+
+def plot_signal(signal, title, code):
+    """Vẽ đồ thị toàn bộ tín hiệu mã hóa (giảm mẫu min/max, phóng to để xem từng mẫu)"""
+    import matplotlib.pyplot as plt
+    from linecode.render import use_font
+    from linecode.waveform import plot_waveform
+    # Chỉ đo phần dựng đồ thị, không tính thời gian cửa sổ plt.show() mở
+    with profiling.stage("plot_signal", profiling.nbytes(signal)):
+        use_font()  # Đổi font chữ (chỉ tra font một lần)
+
+        # Trục tung theo tập mức của mã trong bảng mã dùng chung
+        plot_waveform(signal, title, code=code)
 
     # Hiển thị đồ thị
     plt.show()
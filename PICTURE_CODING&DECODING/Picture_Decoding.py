@@ -1,146 +1,186 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from PIL import Image
 import os
-import tkinter as tk
-from tkinter import simpledialog
+import sys
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from linecode import framing, imagefile, parallel, profiling, registry, two_b_one_q
+from linecode.archive import Archive
+from linecode.decoders import as_levels
+from linecode.signalfile import SignalFile, is_signal_file, load_signal, open_signal
+
+# Kho ảnh do Picture_Coding.py ghi
+ARCHIVE_FILE = "encoded_images.lca"
+
+# Đo từng khâu (đọc tín hiệu, giải mã, hiển thị, lưu ảnh) khi đặt biến môi trường
+# LINECODE_PROFILE=<tiền tố>: kết quả ghi ra <tiền tố>.json và <tiền tố>.trace.json (linecode.profiling)
+@profiling.profiled(data=None)
 def read_voltage_file(filename):
-    """Đọc dữ liệu điện áp từ file txt"""
-    with open(filename, 'r') as f:
-        voltage_data = list(map(int, f.read().strip().split()))
-    return voltage_data
+    """Mở file .lcs (ánh xạ bộ nhớ, chỉ giải nén từng khối khi giải mã) hoặc đọc file txt kiểu cũ"""
+    return open_signal(filename) if is_signal_file(filename) else load_signal(filename)
+
+def raise_first_error(voltage_data, code, errors):
+    """Báo lỗi tại ký hiệu lỗi đầu tiên (nếu có) theo bảng mã dùng chung
+
+    Chỉ đọc lại nhóm ký hiệu lỗi và nhóm đứng trước nó (2B1Q báo lỗi kèm mức
+    trước đó), không đọc lại cả tín hiệu.
+    """
+    if not errors.size:
+        return
+    codec = registry.get(code)
+    first = int(errors[0])
+    start = max(first - 1, 0) * codec.group_symbols
+    stop = (first + 1) * codec.group_symbols
+    if isinstance(voltage_data, SignalFile):
+        window = voltage_data.read(start, min(stop, len(voltage_data)))
+    else:
+        window = as_levels(voltage_data)[start:stop]
+    groups = np.arange(stop // codec.group_symbols - start // codec.group_symbols)
+    codec.raise_on_invalid(window, groups == first - start // codec.group_symbols, start)
+
+@profiling.profiled()
+def decode_pixels(voltage_data, code, img_size):
+    """Giải mã thẳng vào mảng pixel uint8 cấp phát sẵn; ký hiệu không hợp lệ gây ValueError (mọi mã như nhau)
+
+    Tín hiệu được giải mã theo khối nên bộ nhớ đỉnh chỉ khoảng kích thước
+    ảnh cộng một khối tín hiệu.
+    """
+    pixels = np.empty(img_size, dtype=np.uint8)
+    nbits, errors = parallel.decode_into(voltage_data, code, pixels)
+    if nbits < pixels.size * 8:
+        raise ValueError(f"Tín hiệu chỉ đủ cho {nbits // 8} / {pixels.size} byte ảnh!")
+    raise_first_error(voltage_data, code, errors)
+    return pixels
 
 def unipolar_decoding(voltage_data, img_size):
     """Giải mã Unipolar về dữ liệu pixel"""
-    binary_data = ''.join(str(bit) for bit in voltage_data)
-    pixel_values = [int(binary_data[i:i+8], 2) for i in range(0, len(binary_data), 8)]
-    return np.array(pixel_values, dtype=np.uint8).reshape(img_size)
+    return decode_pixels(voltage_data, "unipolar", img_size)
 
 def nrzl_decoding(voltage_data, img_size):
     """Giải mã NRZ-L về dữ liệu pixel"""
-    binary_data = ''.join('1' if level == -1 else '0' for level in voltage_data)
-    pixel_values = [int(binary_data[i:i+8], 2) for i in range(0, len(binary_data), 8)]
-    return np.array(pixel_values, dtype=np.uint8).reshape(img_size)
+    return decode_pixels(voltage_data, "nrz-l", img_size)
 
 def manchester_decoding(voltage_data, img_size):
     """Giải mã Manchester về dữ liệu pixel"""
-    binary_data = []
-    for i in range(0, len(voltage_data), 2):
-        if voltage_data[i] == -1 and voltage_data[i+1] == 1:
-            binary_data.append('1')
-        elif voltage_data[i] == 1 and voltage_data[i+1] == -1:
-            binary_data.append('0')
-        else:
-            raise ValueError("Lỗi tín hiệu Manchester: Không phải sự thay đổi hợp lệ!")
-    
-    pixel_values = [int(''.join(binary_data[i:i+8]), 2) for i in range(0, len(binary_data), 8)]
-    return np.array(pixel_values, dtype=np.uint8).reshape(img_size)
+    return decode_pixels(voltage_data, "manchester", img_size)
 
 def ami_decoding(voltage_data, img_size):
     """Giải mã AMI về dữ liệu pixel"""
-    binary_data = []
-    last_polarity = 1  # Khởi tạo với +1 cho bit 1 đầu tiên
-    for level in voltage_data:
-        if level == 0:
-            binary_data.append('0')  # Bit 0 là 0
-        elif level == last_polarity:
-            binary_data.append('1')  # Bit 1
-            last_polarity = -last_polarity  # Chuyển đổi giữa +1 và -1 cho mỗi bit 1
-        else:
-            raise ValueError("Lỗi tín hiệu AMI: Dữ liệu không hợp lệ!")
-    
-    pixel_values = [int(''.join(binary_data[i:i+8]), 2) for i in range(0, len(binary_data), 8)]
-    return np.array(pixel_values, dtype=np.uint8).reshape(img_size)
+    return decode_pixels(voltage_data, "ami", img_size)
 
 def two_b_one_q_decode(signal):
-    """Giải mã tín hiệu 2B1Q thành chuỗi bit nhị phân theo mức tín hiệu trước đó."""
-    decoded_bits = []
-    
-    # Mapping based on previous level dependency
-    reverse_transition_table = {
-        (1, 1): "00",  
-        (3, 1): "00",  
-        (-1, -1): "00",  
-        (-3, -1): "00",
-        (1, 3): "01",  
-        (3, 3): "01", 
-        (-1, -3): "01",  
-        (-3, -3): "01",
-        (1, -1): "10",  
-        (3, -1): "10",  
-        (-1, 1): "10",  
-        (-3, 1): "10",
-        (1, -3): "11",  
-        (3, -3): "11",  
-        (-1, 3): "11",  
-        (-3, 3): "11"
-    }
-    
-    previous_level = 1  # Start with a default positive level
-
-    for current_level in signal:
-        # Lookup transition using (previous_level, current_level)
-        current_bits = reverse_transition_table.get((previous_level, current_level), "")
-        
-        if current_bits == "":
-            raise ValueError(f"Không tìm thấy giá trị {current_level} với mức trước đó {previous_level}.")
-        
-        decoded_bits.append(current_bits)  # Append decoded bits
-        
-        # Update previous level for next iteration
-        previous_level = current_level
-    
-    return ''.join(decoded_bits)
+    """Giải mã tín hiệu 2B1Q thành chuỗi bit (BitBuffer) theo mức tín hiệu trước đó."""
+    bits, invalid = parallel.decode(signal, "2b1q")
+    two_b_one_q.raise_on_invalid(signal, invalid)
+    return bits
 
 def two_b_one_q_decoding(voltage_data, img_size):
     """Giải mã tín hiệu 2B1Q thành dữ liệu pixel"""
-    # Giải mã tín hiệu 2B1Q thành chuỗi bit nhị phân
-    binary_data = two_b_one_q_decode(voltage_data)
-    
-    # Chuyển đổi chuỗi nhị phân thành dữ liệu pixel
-    pixel_values = [int(binary_data[i:i+8], 2) for i in range(0, len(binary_data), 8)]
-    return np.array(pixel_values, dtype=np.uint8).reshape(img_size)
+    return decode_pixels(voltage_data, "2b1q", img_size)
 
-def decode_image():
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    voltage_file = os.path.join(script_dir, "encoded_image.txt")
+def is_framed(filename):
+    """File .lcs được ghi với dữ liệu đã đóng khung hay không"""
+    return is_signal_file(filename) and "framing" in (open_signal(filename).payload or {})
+
+@profiling.profiled()
+def framed_decoding(voltage_data, img_size, code):
+    """Giải mã tín hiệu đã đóng khung: báo các khung lỗi, phần còn lại của ảnh vẫn được giữ"""
+    report = framing.decode_frames(voltage_data, code)
+    for info in report.frames:
+        if not info.ok:
+            print(f"⚠️ Khung #{info.sequence} sai CRC (byte {info.offset}-{info.offset + info.length})")
+    for sequence in report.missing:
+        print(f"⚠️ Không tìm thấy khung #{sequence}")
+    count = int(np.prod(img_size))
+    if len(report.data) < count:
+        raise ValueError("Lỗi tín hiệu: không tìm thấy đủ khung dữ liệu của ảnh!")
+    return np.frombuffer(report.data, dtype=np.uint8, count=count).reshape(img_size)
+
+def decode_archive_entry(archive_file, name):
+    """Giải mã một ảnh trong kho; mã đường truyền, kích thước, mode và bảng màu lấy từ bản ghi"""
+    signal_file = Archive(archive_file)[name]
+    pixels, errors, warnings = profiling.call("decode_pixels", imagefile.decode_pixels, signal_file)
+    for warning in warnings:
+        print(f"⚠️ {name}: {warning}")
+    return imagefile.to_image(pixels, signal_file.payload)
+
+def choose_archive_entry(archive_file):
+    """Chọn ảnh cần giải mã trong kho (hỏi người dùng nếu kho có nhiều ảnh), None nếu không chọn được"""
+    from tkinter import simpledialog
+    archive = Archive(archive_file)
+    names = archive.names()
+    if len(names) <= 1:
+        return names[0] if names else None
+    listing = "\n".join(f"{i}: {name} ({archive.entries[name]['code']})" for i, name in enumerate(names, 1))
+    choice = simpledialog.askinteger("Chọn ảnh", f"Nhập số thứ tự ảnh cần giải mã:\n{listing}")
+    if choice not in range(1, len(names) + 1):
+        return None
+    return names[choice - 1]
+
+def decode_legacy_image(script_dir):
+    """Giải mã encoded_image.lcs/.txt + image_size.npy (định dạng cũ, phải chọn mã đường truyền), trả về ảnh PIL"""
+    from PIL import Image
+    from tkinter import simpledialog
+    voltage_file = os.path.join(script_dir, "encoded_image.lcs")
+    if not os.path.exists(voltage_file):
+        voltage_file = os.path.join(script_dir, "encoded_image.txt")
     size_file = os.path.join(script_dir, "image_size.npy")
     
     if not os.path.exists(voltage_file) or not os.path.exists(size_file):
         print("❌ Không tìm thấy file mã hóa hoặc file kích thước ảnh!")
-        return
+        return None
     
     voltage_data = read_voltage_file(voltage_file)
     img_size = tuple(np.load(size_file))
     
+    codes = registry.names()
+    menu = ", ".join(f"{num}: {registry.get(code).label}" for num, code in enumerate(codes, 1))
+    decode_choice = simpledialog.askinteger("Lựa chọn giải mã", f"Nhập kiểu giải mã ({menu}):")
+    if decode_choice not in range(1, len(codes) + 1):
+        print(f"❌ Lựa chọn không hợp lệ! Hãy nhập một số từ 1 đến {len(codes)} ({menu}).")
+        return None
+    code = codes[decode_choice - 1]
+    
+    if is_framed(voltage_file):
+        img_array = framed_decoding(voltage_data, img_size, code)
+    else:
+        img_array = decode_pixels(voltage_data, code, img_size)
+    
+    # Mảng pixel uint8 liền mạch: ảnh xám/RGBA dùng chung bộ đệm, không sao chép
+    return Image.fromarray(img_array)
+
+def decode_image():
+    import matplotlib.pyplot as plt
+    import tkinter as tk
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    archive_file = os.path.join(script_dir, ARCHIVE_FILE)
+    
     root = tk.Tk()
     root.withdraw()
-    decode_choice = simpledialog.askinteger("Lựa chọn giải mã", "Nhập kiểu giải mã (1: Unipolar, 2: NRZ-L, 3: Manchester, 4: AMI, 5: 2B1Q):")
-    if decode_choice not in [1, 2, 3, 4, 5]:
-        print("❌ Lựa chọn không hợp lệ! Hãy nhập 1 (Unipolar), 2 (NRZ-L), 3 (Manchester), 4 (AMI) hoặc 5 (2B1Q).")
-        return
-    
-    if decode_choice == 1:
-        img_array = unipolar_decoding(voltage_data, img_size)
-    elif decode_choice == 2:
-        img_array = nrzl_decoding(voltage_data, img_size)
-    elif decode_choice == 3:
-        img_array = manchester_decoding(voltage_data, img_size)
-    elif decode_choice == 4:
-        img_array = ami_decoding(voltage_data, img_size)
+    if os.path.exists(archive_file):
+        name = choose_archive_entry(archive_file)
+        if name is None:
+            print("❌ Kho ảnh trống hoặc lựa chọn không hợp lệ!")
+            return
+        img = decode_archive_entry(archive_file, name)
+        save_name = f"decoded_{os.path.splitext(name)[0]}{imagefile.image_extension(img.mode)}"
     else:
-        img_array = two_b_one_q_decoding(voltage_data, img_size)
+        img = decode_legacy_image(script_dir)
+        if img is None:
+            return
+        save_name = "decoded_image.png"
     
-    img = Image.fromarray(img_array)
-    plt.figure(figsize=(6,6))
-    plt.imshow(img)
-    plt.axis('off')
-    plt.title("Ảnh giải mã")
+    with profiling.stage("plot_image"):
+        plt.figure(figsize=(6,6))
+        # CMYK, LAB, ảnh 16/32 bit... được đổi sang RGB chỉ để hiển thị; file lưu giữ nguyên mode
+        plt.imshow(img if img.mode in ('1', 'L', 'P', 'RGB', 'RGBA') else img.convert('RGB'))
+        plt.axis('off')
+        plt.title("Ảnh giải mã")
     plt.show()
     
-    save_path = os.path.join(script_dir, "decoded_image.png")
-    img.save(save_path)
+    save_path = os.path.join(script_dir, save_name)
+    with profiling.stage("save_image") as stage:
+        img.save(save_path)
+        stage.record(bytes_out=os.path.getsize(save_path))
     print(f"✅ Ảnh đã được lưu tại: {save_path}")
 
 if __name__ == "__main__":
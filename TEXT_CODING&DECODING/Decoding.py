@@ -1,187 +1,145 @@
+import glob
 import numpy as np
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from linecode import compression, decoders, profiling, registry, text as textcodec
+from linecode.bitbuffer import BitBuffer
+from linecode.signalfile import is_signal_file, load_signal, open_signal
 
 # === CHUYỂN ĐỔI VĂN BẢN ===
-def text_to_bits(text):
-    return ''.join(format(ord(c), '08b') for c in text)
+# Văn bản là các byte đã mã hóa ký tự (mặc định UTF-8; file .lcs ghi bảng mã
+# trong header). Byte không hợp lệ được thay bằng U+FFFD (chính sách 'replace').
+TEXT_ENCODING = textcodec.ENCODING
+
+def text_to_bits(text, encoding=TEXT_ENCODING):
+    return textcodec.text_to_bits(text, encoding)
 
-def bits_to_text(bits):
-    chars = [bits[i:i+8] for i in range(0, len(bits), 8)]
-    return ''.join(chr(int(c, 2)) for c in chars)
+# Đo từng khâu (đọc file, giải mã, giải nén, chuyển văn bản) khi đặt biến môi trường
+# LINECODE_PROFILE=<tiền tố>: kết quả ghi ra <tiền tố>.json và <tiền tố>.trace.json (linecode.profiling)
+@profiling.profiled()
+def bits_to_text(bits, encoding=TEXT_ENCODING, errors=textcodec.ERRORS):
+    return textcodec.bits_to_text(bits, encoding, errors)
+
+# === GIẢI NÉN ===
+@profiling.profiled()
+def decompress_bits(bits, info):
+    """Giải nén chuỗi bit đã giải mã theo thông tin nén trong header .lcs"""
+    return BitBuffer.from_bytes(compression.decompress(bits.tobytes(), info))
 
 # === GIẢI MÃ CÁC KIỂU MÃ HÓA ===
+# Các hàm giải mã dùng bảng mã dùng chung (linecode.registry) và trả về
+# BitBuffer (bit đóng gói); str(...) cho chuỗi '0'/'1' để hiển thị. Mọi mã
+# xử lý ký hiệu không hợp lệ như nhau: báo ValueError tại ký hiệu lỗi đầu tiên.
+# Đây là thay đổi so với bản cũ: trước đây manchester_decode lặng lẽ bỏ qua
+# cặp ký hiệu lỗi, còn ami_decode (và pseudoternary_decode) không kiểm tra
+# ký hiệu. Cần giải mã bỏ qua lỗi thì gọi registry.get(code).decode(levels):
+# kết quả là (bit, mặt nạ ký hiệu không hợp lệ), không báo lỗi.
+@profiling.profiled()
+def decode_signal(signal, code):
+    """Giải mã tín hiệu bằng mã `code`, báo lỗi nếu có ký hiệu không hợp lệ"""
+    codec = registry.get(code)
+    levels = decoders.as_levels(signal)
+    bits, invalid = codec.decode(levels)
+    codec.raise_on_invalid(levels, invalid)
+    return bits
+
 def unipolar_decode(signal):
     """Giải mã Unipolar (0V → 0, V → 1)"""
-    return ''.join('1' if v == 1 else '0' for v in signal)
+    return decode_signal(signal, "unipolar")
 
 def nrz_l_decode(signal):
     """Giải mã NRZ-L"""
-    return ''.join('1' if v == -1 else '0' for v in signal)
+    return decode_signal(signal, "nrz-l")
 
 def nrz_i_decode(signal):
     """Giải mã NRZ-I"""
-    decoded_bits = []
-    level = 1
-    for v in signal:
-        if v == level:
-            decoded_bits.append('0')
-        else:
-            decoded_bits.append('1')
-            level = -level
-    return ''.join(decoded_bits)
+    return decode_signal(signal, "nrz-i")
 
 def rz_decode(signal):
     """Giải mã RZ"""
-    decoded_bits = []
-    for i in range(0, len(signal), 2):
-        decoded_bits.append('1' if signal[i] == 1 else '0')
-    return ''.join(decoded_bits)
+    return decode_signal(signal, "rz")
 
 def manchester_decode(signal):
     """Giải mã Manchester"""
-    decoded_bits = []
-    for i in range(0, len(signal), 2):
-        if signal[i] == -1 and signal[i+1] == 1:
-            decoded_bits.append('1')
-        elif signal[i] == 1 and signal[i+1] == -1:
-            decoded_bits.append('0')
-    return ''.join(decoded_bits)
+    return decode_signal(signal, "manchester")
 
 def differential_manchester_decode(signal):
     """Giải mã Differential Manchester"""
-    decoded_bits = []
-    level = 1  # Bắt đầu với mức tín hiệu đầu tiên
-
-    for i in range(0, len(signal), 2):  # Duyệt qua từng cặp giá trị tín hiệu
-        start_level = signal[i]
-        mid_level = signal[i+1]
-
-        # Bit '0' xảy ra khi có sự đảo trạng thái ngay đầu chu kỳ
-        if start_level != level:
-            decoded_bits.append('0')
-        else:  # Bit '1' xảy ra khi không có sự đảo trạng thái đầu chu kỳ
-            decoded_bits.append('1')
-
-        # Cập nhật mức tín hiệu cho lần lặp tiếp theo (lấy giá trị giữa chu kỳ)
-        level = mid_level  
-
-    return ''.join(decoded_bits)
+    return decode_signal(signal, "diffmanchester")
 
 def ami_decode(signal):
     """Giải mã AMI"""
-    return ''.join('1' if v != 0 else '0' for v in signal)
+    return decode_signal(signal, "ami")
 
 def pseudoternary_decode(signal):
     """Giải mã Pseudoternary"""
-    return ''.join('0' if v != 0 else '1' for v in signal)
+    return decode_signal(signal, "pseudoternary")
 
 def two_b_one_q_decode(signal):
     """Giải mã tín hiệu 2B1Q thành chuỗi bit nhị phân theo mức tín hiệu trước đó."""
-    decoded_bits = []
-    
-    # Mapping based on **previous level dependency**
-    reverse_transition_table = {
-    (1, 1): "00",  
-    (3, 1): "00",  
-    (-1, -1): "00",  
-    (-3, -1): "00",
-    (1, 3): "01",  
-    (3, 3): "01", 
-    (-1, -3): "01",  
-    (-3, -3): "01",
-    (1, -1): "10",  
-    (3, -1): "10",  
-    (-1, 1): "10",  
-    (-3, 1): "10",
-    (1, -3): "11",  
-    (3, -3): "11",  
-    (-1, 3): "11",  
-    (-3, 3): "11"
-                                }
-    
-    previous_level = 1  # Start with a default positive level
-
-    for current_level in signal:
-        # Lookup transition using (previous_level, current_level)
-        current_bits = reverse_transition_table.get((previous_level, current_level), "")
-        
-        if current_bits == "":
-            raise ValueError(f"Không tìm thấy giá trị {current_level} với mức trước đó {previous_level}.")
-
-        decoded_bits.append(current_bits)  # Append decoded bits
-        
-        # Update previous level for next iteration
-        previous_level = current_level
-    
-    return ''.join(decoded_bits)
+    return decode_signal(signal, "2b1q")
+
+def find_signal_file(script_dir, choice):
+    """File tín hiệu của lựa chọn `choice` ('<số>.<tên mã>'): file .lcs mới nhất, nếu không có thì file .txt kiểu cũ"""
+    for extension in ('.lcs', '.txt'):
+        found = glob.glob(os.path.join(glob.escape(script_dir), f"{choice}.*{extension}"))
+        if found:
+            return max(found, key=os.path.getmtime)
+    return None
 
 
 # === CHƯƠNG TRÌNH CHÍNH GIẢI MÃ ===
 def main():
-    # Danh sách các tên file tương ứng với mỗi phương pháp giải mã
-    files = {
-        1: "1.Unipolar.txt",
-        2: "2.NRZ-L.txt",
-        3: "3.NRZ-I.txt",
-        4: "4.RZ.txt",
-        5: "5.Manchester.txt",
-        6: "6.Diffmanchester.txt",
-        7: "7.AMI.txt",
-        8: "8.Pseudoternary.txt",
-        9: "9.2b1q.txt"
-    }
-
+    # Menu cùng thứ tự với Encoding.py (thứ tự đăng ký trong bảng mã dùng chung)
+    codes = registry.names()
     print("\nChọn kiểu giải mã:")
-    print("1. Unipolar")
-    print("2. NRZ-L")
-    print("3. NRZ-I")
-    print("4. RZ")
-    print("5. Manchester")
-    print("6. Differential Manchester")
-    print("7. AMI")
-    print("8. Pseudoternary")
-    print("9. 2B1Q")
-
-    choice = int(input("Nhập số (1-9): "))
+    for num, code in enumerate(codes, 1):
+        print(f"{num}. {registry.get(code).label}")
+
+    choice = int(input(f"Nhập số (1-{len(codes)}): "))
 
     # Kiểm tra lựa chọn hợp lệ
-    if choice not in files:
+    if not 1 <= choice <= len(codes):
         print("❌ Lựa chọn không hợp lệ!")
         return
 
-    # Đọc tín hiệu từ file tương ứng
-    file_name = files[choice]
-    file_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), file_name)
+    # Đọc tín hiệu từ file tương ứng (ưu tiên file nhị phân .lcs, sau đó tới .txt kiểu cũ)
+    script_dir = os.path.dirname(os.path.realpath(__file__))
+    file_path = find_signal_file(script_dir, choice)
+    if file_path is None:
+        print(f"❌ Không tìm thấy file tín hiệu {choice}.*.lcs hoặc {choice}.*.txt!")
+        return
+    file_name = os.path.basename(file_path)
 
     try:
-        # Đọc tín hiệu từ tệp
-        encoded_signal = np.loadtxt(file_path, dtype=int)
+        # Đọc tín hiệu từ tệp (file .lcs được ánh xạ bộ nhớ, không nạp toàn bộ)
+        with profiling.stage("load_signal", os.path.getsize(file_path)) as stage:
+            encoded_signal = load_signal(file_path)
+            stage.record(bytes_out=profiling.nbytes(encoded_signal))
     except Exception as e:
         print(f"❌ Lỗi khi đọc file: {e}")
         return
 
     print(f"Đã đọc tín hiệu từ file {file_name}.")
 
-    # Các phương pháp giải mã
-    decoding_methods = {
-        1: unipolar_decode,
-        2: nrz_l_decode,
-        3: nrz_i_decode,
-        4: rz_decode,
-        5: manchester_decode,
-        6: differential_manchester_decode,
-        7: ami_decode,
-        8: pseudoternary_decode,
-        9: two_b_one_q_decode,
-    }
-
-    decode_function = decoding_methods[choice]
-    decoded_signal = decode_function(encoded_signal)
+    try:
+        decoded_signal = decode_signal(encoded_signal, codes[choice - 1])
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
 
     print(f"Tín hiệu đã giải mã: {decoded_signal}")
 
-    # Chuyển tín hiệu đã giải mã thành văn bản
-    decoded_text = bits_to_text(decoded_signal)
+    # Văn bản đã nén khi mã hóa: thông tin nén nằm trong header file .lcs
+    payload = open_signal(file_path).payload if is_signal_file(file_path) else None
+    if payload and "compression" in payload:
+        decoded_signal = decompress_bits(decoded_signal, payload["compression"])
+        print(f"🗜️ Đã giải nén {payload['compression']['method']}: {len(decoded_signal) // 8} byte")
+
+    # Chuyển tín hiệu đã giải mã thành văn bản theo bảng mã ghi trong header (file cũ: UTF-8)
+    decoded_text = bits_to_text(decoded_signal, (payload or {}).get("encoding", TEXT_ENCODING))
     print(f"Văn bản giải mã: {decoded_text}")
 
 
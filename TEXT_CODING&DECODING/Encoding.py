@@ -1,196 +1,105 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import os
+import sys
 
-# === CHUYỂN ĐỔI VĂN BẢN ===
-def text_to_bits(text):
-    return ''.join(format(ord(c), '08b') for c in text)
-
-def bits_to_text(bits):
-    chars = [bits[i:i+8] for i in range(0, len(bits), 8)]
-    return ''.join(chr(int(c, 2)) for c in chars)
-
-# === CÁC KIỂU MÃ HÓA ===
-def Unipolar(bits):
-    return np.array([1 if bit == '1' else 0 for bit in bits])
-
-def NRZL(bits):
-    return np.array([-1 if bit == '1' else 1 for bit in bits])
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from linecode import compression, encoders, profiling, registry, text as textcodec
+from linecode.bitbuffer import BitBuffer
+from linecode.signalfile import write_signal
 
-def NRZI(bits):
-    signal, level = [], 1
-    for bit in bits:
-        if bit == '1':
-            level = -level
-        signal.append(level)
-    return np.array(signal)
+# === CHUYỂN ĐỔI VĂN BẢN ===
+# Văn bản được mã hóa thành byte (mặc định UTF-8, đổi bảng mã qua `encoding`)
+# rồi xem thẳng như chuỗi bit đóng gói; bảng mã được ghi vào header .lcs.
+TEXT_ENCODING = textcodec.ENCODING
 
-def RZ(bits):
-    signal = []
-    for bit in bits:
-        if bit == '1':
-            signal.extend([1, 0])
-        else:
-            signal.extend([-1, 0])
-    return np.array(signal, dtype=np.int8)
+# Đo từng khâu (chuyển bit, nén, mã hóa, lưu file, vẽ) khi đặt biến môi trường
+# LINECODE_PROFILE=<tiền tố>: kết quả ghi ra <tiền tố>.json và <tiền tố>.trace.json (linecode.profiling)
+@profiling.profiled()
+def text_to_bits(text, encoding=TEXT_ENCODING):
+    return textcodec.text_to_bits(text, encoding)
 
-def Manchester(bits):
-    return np.array([val for bit in bits for val in ([-1, 1] if bit == '1' else [1, -1])])
+# === NÉN (TÙY CHỌN) ===
+# Nén chuỗi bit trước khi mã hóa; thông tin nén được ghi vào header .lcs để bên giải mã giải nén.
+COMPRESSIONS = {1: "rle", 2: "zlib", 3: "lzma"}
 
-def Diffmanchester(bits):
-    signal, level = [], 1
-    for bit in bits:
-        if bit == '0':
-            level = -level
-        signal.append(level)
-        level = -level
-        signal.append(level)
-    return np.array(signal)
+@profiling.profiled()
+def compress_bits(bit_stream, method):
+    """Nén chuỗi bit bằng `method`, trả về (BitBuffer đã nén, thông tin nén)"""
+    data, info = compression.compress(bit_stream, method)
+    return BitBuffer.from_bytes(data), info
 
-def AMI(bits):
-    signal, level = [], 1
-    for bit in bits:
-        if bit == '1':
-            signal.append(level)
-            level = -level
-        else:
-            signal.append(0)
-    return np.array(signal)
-
-def Pseudoternary(bits):
-    signal, level = [], 1
-    for bit in bits:
-        if bit == '0':
-            signal.append(level)
-            level = -level
-        else:
-            signal.append(0)
-    return np.array(signal)
+def bits_to_text(bits, encoding=TEXT_ENCODING, errors=textcodec.ERRORS):
+    return textcodec.bits_to_text(bits, encoding, errors)
 
-def two_b_one_q(bits):
-    signal, level = [], 1
-    transition_table = {'00': {'pos': 1, 'neg': -1}, '01': {'pos': 3, 'neg': -3},
-                        '10': {'pos': -1, 'neg': 1}, '11': {'pos': -3, 'neg': 3}}
-    for i in range(0, len(bits), 2):
-        pair = bits[i:i+2]
-        prev_state = 'pos' if level > 0 else 'neg'
-        level = transition_table.get(pair, {'pos': 0, 'neg': 0})[prev_state]
-        signal.append(level)
-    return np.array(signal)
+# === CÁC KIỂU MÃ HÓA ===
+# Các hàm nhận BitBuffer, chuỗi '0'/'1', mảng bit uint8 hoặc bytes và mã hóa bằng
+# phép toán mảng trong linecode.encoders thay vì duyệt từng bit. Menu lấy mọi
+# mã trong bảng mã dùng chung (linecode.registry), kể cả mã cắm thêm như MLT-3.
+Unipolar = encoders.unipolar
+NRZL = encoders.nrz_l
+NRZI = encoders.nrz_i
+RZ = encoders.rz
+Manchester = encoders.manchester
+Diffmanchester = encoders.diff_manchester
+AMI = encoders.ami
+Pseudoternary = encoders.pseudoternary
+two_b_one_q = encoders.two_b_one_q
 
 # === LƯU FILE ===
-def save_signal_to_file(filename, signal):
+def save_signal_to_file(filename, signal, code=None, payload=None):
+    """Lưu tín hiệu: file .txt theo kiểu cũ (mỗi dòng một số), còn lại theo định dạng nhị phân .lcs (kèm payload)"""
     file_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), filename)
-    np.savetxt(file_path, signal, fmt='%d')
+    with profiling.stage("save_signal_to_file", profiling.nbytes(signal)) as stage:
+        if filename.endswith('.txt'):
+            np.savetxt(file_path, signal, fmt='%d')
+        else:
+            write_signal(file_path, signal, code, payload=payload)
+        stage.record(bytes_out=os.path.getsize(file_path))
     print(f"💾 Đã lưu tín hiệu vào {file_path}")
 
 # === VẼ ĐỒ THỊ ===
-def plot_signal_standard(original_text, encoded_signal, encoding_type, bit_stream):
-    plt.figure(figsize=(12, 4))
-    plt.rcParams['font.family'] = 'Times New Roman'
-    
-    x = range(len(encoded_signal) + 1)
-    y = np.append(encoded_signal, encoded_signal[-1])
-    plt.step(x, y, where='post', linewidth=2, color='black')
-    plt.xlim(0, len(encoded_signal))
-    
-    for i, bit in enumerate(bit_stream):
-        plt.text(i + 0.5, encoded_signal[i] + 0.2, bit, ha='center', va='bottom', fontsize=10,
-                 bbox=dict(facecolor='white', edgecolor='none', boxstyle='round,pad=0'))
-    
-    plt.ylim(min(encoded_signal) - 1, max(encoded_signal) + 1)
-    plt.ylabel("Điện áp")
-    plt.xticks([]) 
-    plt.grid(True, linestyle='dashed')
-    plt.title(f"Mã hóa {encoding_type} cho văn bản: {original_text}")
-    plt.gca().spines['top'].set_color('none')
-    plt.gca().spines['right'].set_color('none')
-    plt.show()
-
-def plot_signal_special(original_text, encoded_signal, encoding_type, bit_stream):
-    plt.figure(figsize=(12, 4))
-    plt.rcParams['font.family'] = 'Times New Roman'
-    
-    x = range(len(encoded_signal) + 1)
-    y = np.append(encoded_signal, encoded_signal[-1])
-    plt.step(x, y, where='post', linewidth=2, color='black')
-    plt.xlim(0, len(encoded_signal))
-    
-    for i in range(0, len(encoded_signal) - 1, 2):
-        mid_x = i + 1
-        mid_y = (encoded_signal[i] + encoded_signal[i + 1]) / 2
-        bit = bit_stream[i // 2] if i // 2 < len(bit_stream) else ''
-        plt.text(mid_x, mid_y + 0.2, bit, ha='center', va='top', fontsize=10,
-                 bbox=dict(facecolor='white', edgecolor='none', boxstyle='round,pad=0.3'))
-    
-    plt.ylim(min(encoded_signal) - 1, max(encoded_signal) + 1)
-    plt.ylabel("Điện áp")
-    plt.xticks([]) 
-    plt.grid(True, linestyle='dashed')
-    plt.title(f"Mã hóa {encoding_type} cho văn bản: {original_text}")
-    plt.gca().spines['top'].set_color('none')
-    plt.gca().spines['right'].set_color('none')
-    plt.show()
-
-# === VẼ ĐỒ THỊ DÀNH RIÊNG CHO 2B1Q ===
-def plot_2b1q_signal(original_text, encoded_signal):
-    plt.figure(figsize=(12, 4))
-    plt.rcParams['font.family'] = 'Times New Roman'
-
-    # Cập nhật các mức điện áp
-    transition_table = {'00': 1, '01': 3, '10': -1, '11': -3}
-
-    x = range(len(encoded_signal) + 1)
-    y = np.append(encoded_signal, encoded_signal[-1])
-    plt.step(x, y, where='post', linewidth=2, color='black')
-    plt.xlim(0, len(encoded_signal))
-
-    plt.ylim(min(encoded_signal) - 1, max(encoded_signal) + 1)
-    plt.ylabel("Điện áp")
-    plt.xticks([]) 
-    plt.grid(True, linestyle='dashed')
-    plt.title(f"Mã hóa 2B1Q cho văn bản: {original_text}")
-    plt.gca().spines['top'].set_color('none')
-    plt.gca().spines['right'].set_color('none')
+# Vẽ bằng linecode.waveform: tín hiệu dài được giảm mẫu min/max theo từng cột
+# điểm ảnh, nhãn bit chỉ hiện khi phóng to đủ gần (không còn gọi plt.text cho mọi bit).
+def plot_signal(original_text, encoded_signal, code, bit_stream):
+    """Vẽ tín hiệu với trục tung theo tập mức của mã; nhãn bit chỉ khi mỗi bit có ít nhất một ký hiệu (không với 2B1Q)"""
+    import matplotlib.pyplot as plt
+    from linecode.render import use_font
+    from linecode.waveform import plot_waveform
+    codec = registry.get(code)
+    # Chỉ đo phần dựng đồ thị, không tính thời gian cửa sổ plt.show() mở
+    with profiling.stage("plot_signal", profiling.nbytes(encoded_signal)):
+        use_font()
+        plot_waveform(encoded_signal, f"Mã hóa {codec.label} cho văn bản: {original_text}",
+                      bit_stream if codec.symbols_per_bit >= 1 else None, code)
     plt.show()
 
 # === CHƯƠNG TRÌNH CHÍNH ===
 def main():
     text = input("Nhập văn bản: ")
     bit_stream = text_to_bits(text)
-    print(f"Chuỗi bit sau khi chuyển đổi: {bit_stream}")
+    print(f"Chuỗi bit sau khi chuyển đổi ({TEXT_ENCODING}, {len(bit_stream) // 8} byte): {bit_stream}")
 
-    encoding_methods = {
-        1: ("Unipolar", Unipolar),
-        2: ("NRZ-L", NRZL),
-        3: ("NRZ-I", NRZI),
-        4: ("RZ", RZ),
-        5: ("Manchester", Manchester),
-        6: ("Diffmanchester", Diffmanchester),
-        7: ("AMI", AMI),
-        8: ("Pseudoternary", Pseudoternary),
-        9: ("2b1q", two_b_one_q),
-    }
+    compress_choice = input("Nén văn bản trước khi mã hóa (0: Không nén, 1: RLE, 2: zlib, 3: LZMA) [0]: ").strip()
+    payload = {"kind": "text", "encoding": TEXT_ENCODING}
+    if compress_choice.isdigit() and int(compress_choice) in COMPRESSIONS:
+        bit_stream, info = compress_bits(bit_stream, COMPRESSIONS[int(compress_choice)])
+        payload["compression"] = info
+        print(f"🗜️ {compression.summary(info)}")
+        print(f"Chuỗi bit sau khi nén: {bit_stream}")
 
+    codes = registry.names()
     print("\nChọn kiểu mã hóa:")
-    for num, (name, _) in encoding_methods.items():
-        print(f"{num}. {name.upper()}")
+    for num, code in enumerate(codes, 1):
+        print(f"{num}. {registry.get(code).label.upper()}")
 
-    choice = int(input("Nhập số (1-9): "))
+    choice = int(input(f"Nhập số (1-{len(codes)}): "))
 
-    if choice in encoding_methods:
-        encoding_name, encode_function = encoding_methods[choice]
-        encoded_signal = encode_function(bit_stream)
-        filename = f"{choice}.{encoding_name}.txt"
-        save_signal_to_file(filename, encoded_signal)
-        
-        # Nếu chọn 2b1q, vẽ đồ thị đặc biệt cho mã hóa này
-        if encoding_name == "2b1q":
-            plot_2b1q_signal(text, encoded_signal)
-        elif encoding_name in ["RZ", "Manchester", "Diffmanchester"]:
-            plot_signal_special(text, encoded_signal, encoding_name.upper(), bit_stream)
-        else:
-            plot_signal_standard(text, encoded_signal, encoding_name.upper(), bit_stream)
+    if 1 <= choice <= len(codes):
+        codec = registry.get(codes[choice - 1])
+        encoded_signal = profiling.call(f"encode {codec.name}", codec.encode, bit_stream)
+        # Tên file theo số thứ tự trong menu, Decoding.py tìm lại file theo số này
+        save_signal_to_file(f"{choice}.{codec.label}.lcs", encoded_signal, codec.name, payload)
+        plot_signal(text, encoded_signal, codec.name, bit_stream)
     else:
         print("❌ Lựa chọn không hợp lệ!")
 
@@ -0,0 +1,258 @@
+"""Đo hiệu năng mọi hàm mã hóa/giải mã của phần văn bản, phần ảnh, mọi mã trong linecode.registry và bộ xáo trộn.
+
+Mỗi trường hợp (đường đi, hàm, loại dữ liệu, kích thước) chạy trong một tiến
+trình riêng để đỉnh RSS không bị lẫn giữa các trường hợp. Kết quả ghi ra JSON:
+    python benchmarks/bench_codecs.py --sizes 1K,1M,64M -o ket_qua.json
+    python benchmarks/bench_codecs.py --images anh.png --compare ket_qua.json
+Với --compare, trường hợp nào chậm hơn lần chạy cũ quá --tolerance sẽ được
+liệt kê và chương trình trả mã lỗi 1.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+try:
+    import resource
+except ImportError:  # Windows không có module resource
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TEXT_ENCODING = "TEXT_CODING&DECODING/Encoding.py"
+TEXT_DECODING = "TEXT_CODING&DECODING/Decoding.py"
+PICTURE_CODING = "PICTURE_CODING&DECODING/Picture_Coding.py"
+PICTURE_DECODING = "PICTURE_CODING&DECODING/Picture_Decoding.py"
+
+# (đường đi, công đoạn, mã đường truyền, file, tên hàm)
+CASES = [
+    ("text", "encode", "unipolar", TEXT_ENCODING, "Unipolar"),
+    ("text", "encode", "nrz-l", TEXT_ENCODING, "NRZL"),
+    ("text", "encode", "nrz-i", TEXT_ENCODING, "NRZI"),
+    ("text", "encode", "rz", TEXT_ENCODING, "RZ"),
+    ("text", "encode", "manchester", TEXT_ENCODING, "Manchester"),
+    ("text", "encode", "diffmanchester", TEXT_ENCODING, "Diffmanchester"),
+    ("text", "encode", "ami", TEXT_ENCODING, "AMI"),
+    ("text", "encode", "pseudoternary", TEXT_ENCODING, "Pseudoternary"),
+    ("text", "encode", "2b1q", TEXT_ENCODING, "two_b_one_q"),
+    ("text", "decode", "unipolar", TEXT_DECODING, "unipolar_decode"),
+    ("text", "decode", "nrz-l", TEXT_DECODING, "nrz_l_decode"),
+    ("text", "decode", "nrz-i", TEXT_DECODING, "nrz_i_decode"),
+    ("text", "decode", "rz", TEXT_DECODING, "rz_decode"),
+    ("text", "decode", "manchester", TEXT_DECODING, "manchester_decode"),
+    ("text", "decode", "diffmanchester", TEXT_DECODING, "differential_manchester_decode"),
+    ("text", "decode", "ami", TEXT_DECODING, "ami_decode"),
+    ("text", "decode", "pseudoternary", TEXT_DECODING, "pseudoternary_decode"),
+    ("text", "decode", "2b1q", TEXT_DECODING, "two_b_one_q_decode"),
+    ("picture", "encode", "unipolar", PICTURE_CODING, "unipolar_encoding"),
+    ("picture", "encode", "nrz-l", PICTURE_CODING, "nrzl_encoding"),
+    ("picture", "encode", "manchester", PICTURE_CODING, "manchester_encoding"),
+    ("picture", "encode", "ami", PICTURE_CODING, "ami_encoding"),
+    ("picture", "encode", "2b1q", PICTURE_CODING, "two_b_one_q"),
+    ("picture", "decode", "unipolar", PICTURE_DECODING, "unipolar_decoding"),
+    ("picture", "decode", "nrz-l", PICTURE_DECODING, "nrzl_decoding"),
+    ("picture", "decode", "manchester", PICTURE_DECODING, "manchester_decoding"),
+    ("picture", "decode", "ami", PICTURE_DECODING, "ami_decoding"),
+    ("picture", "decode", "2b1q", PICTURE_DECODING, "two_b_one_q_decoding"),
+]
+
+def _library_cases():
+    """Các trường hợp đo thẳng thư viện: mọi mã đã đăng ký (kể cả mã cắm thêm) và các kiểu xáo trộn."""
+    from linecode import registry, scrambler
+    cases = [("codec", stage, code, None, stage) for stage in ("encode", "decode") for code in registry.names()]
+    cases += [("scrambler", stage, kind, None, function)
+              for stage, function in (("encode", "scramble"), ("decode", "descramble"))
+              for kind in scrambler.SCRAMBLERS]
+    return cases
+
+_UNITS = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+def parse_size(text):
+    """'64K', '16M', '1G' → số byte."""
+    text = text.strip().upper().rstrip('B')
+    unit = text[-1] if text[-1:] in _UNITS else ''
+    return int(float(text[:len(text) - len(unit)]) * _UNITS[unit])
+
+def _load(relative_path):
+    """Nạp một script theo đường dẫn (tên thư mục có '&' nên không import bình thường được)."""
+    name = os.path.splitext(os.path.basename(relative_path))[0]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _peak_rss():
+    """Đỉnh RSS của tiến trình hiện tại (byte), None nếu hệ điều hành không hỗ trợ."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+# === DỮ LIỆU ĐO ===
+def _payload(spec):
+    """Tạo dữ liệu vào: ('random', số byte, seed) hoặc ('image', đường dẫn)."""
+    import numpy as np
+    if spec[0] == 'image':
+        from PIL import Image
+        with Image.open(spec[1]) as img:
+            pixels = np.ascontiguousarray(np.asarray(img), dtype=np.uint8)
+        return pixels.reshape(-1), pixels.shape
+    data = np.random.default_rng(spec[2]).integers(0, 256, spec[1], dtype=np.uint8)
+    return data, data.shape
+
+def _arguments(case, spec):
+    """Tham số gọi hàm cần đo và số bit dữ liệu tương ứng."""
+    from linecode import registry
+    from linecode.bitbuffer import BitBuffer
+    path, stage, code = case[:3]
+    data, shape = _payload(spec)
+    bits = BitBuffer.from_bytes(data)
+    if stage == "encode":
+        return (bits,), bits.nbits
+    if path == "scrambler":
+        from linecode import scrambler
+        return (scrambler.scramble(bits, code),), bits.nbits
+    signal = registry.get(code).encode(bits)
+    return ((signal, shape) if path == "picture" else (signal,)), bits.nbits
+
+def _function(case):
+    """Hàm cần đo và tên hiển thị của nó."""
+    path, stage, code, script, function_name = case
+    if script is not None:
+        return getattr(_load(script), function_name), f"{os.path.basename(script)}:{function_name}"
+    if path == "scrambler":
+        import functools
+        from linecode import scrambler
+        return functools.partial(getattr(scrambler, function_name), kind=code), f"scrambler:{function_name}"
+    from linecode import registry
+    return getattr(registry.get(code), function_name), f"registry:{code}.{function_name}"
+
+def run_case(case, spec, repeat):
+    """Đo một trường hợp (chạy trong tiến trình con riêng)."""
+    path, stage, code = case[:3]
+    function, label = _function(case)
+    args, nbits = _arguments(case, spec)
+    rss_before = _peak_rss()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+    rss_after = _peak_rss()
+    # Đo cấp phát ở một lần chạy riêng vì tracemalloc làm chậm hàm được đo
+    tracemalloc.start()
+    function(*args)
+    allocated, alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = min(timings)
+    return {
+        "path": path,
+        "stage": stage,
+        "code": code,
+        "function": label,
+        "payload": spec[0] if spec[0] == 'random' else os.path.basename(spec[1]),
+        "bytes": nbits // 8,
+        "bits": nbits,
+        "repeat": repeat,
+        "seconds": best,
+        "seconds_all": timings,
+        "mbit_per_s": nbits / best / 1e6 if best else None,
+        "peak_rss_bytes": rss_after,
+        "peak_rss_delta_bytes": None if rss_before is None else rss_after - rss_before,
+        "alloc_peak_bytes": alloc_peak,
+        "alloc_retained_bytes": allocated,
+    }
+
+def _key(result):
+    return (result["path"], result["stage"], result["code"], result["payload"], result["bytes"])
+
+# === SO SÁNH VỚI LẦN CHẠY TRƯỚC ===
+def compare(results, baseline, tolerance):
+    """Liệt kê các trường hợp có thông lượng giảm quá `tolerance` (tỉ lệ) so với `baseline`."""
+    previous = {_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = previous.get(_key(result))
+        if old and old["mbit_per_s"] and result["mbit_per_s"] is not None:
+            ratio = result["mbit_per_s"] / old["mbit_per_s"]
+            if ratio < 1 - tolerance:
+                regressions.append({"case": list(_key(result)), "old_mbit_per_s": old["mbit_per_s"],
+                                    "new_mbit_per_s": result["mbit_per_s"], "ratio": ratio})
+    return regressions
+
+def _metadata():
+    import numpy as np
+    try:
+        commit = subprocess.run(["git", "-C", ROOT, "rev-parse", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+# === CHƯƠNG TRÌNH CHÍNH ===
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Đo thông lượng, đỉnh RSS và cấp phát của các bộ mã hóa/giải mã.")
+    parser.add_argument('--sizes', default='1K,64K,1M,16M', help="kích thước dữ liệu ngẫu nhiên, ví dụ 1K,1M,1G")
+    parser.add_argument('--images', nargs='*', default=[], help="ảnh thật dùng làm dữ liệu đo")
+    parser.add_argument('--paths', default='text,picture,codec,scrambler',
+                        help="đường đi cần đo: text, picture, codec (mọi mã đã đăng ký), scrambler")
+    parser.add_argument('--stages', default='encode,decode', help="công đoạn cần đo: encode, decode")
+    parser.add_argument('--codes', default=None, help="chỉ đo các mã này (phân tách bằng dấu phẩy)")
+    parser.add_argument('--repeat', type=int, default=3, help="số lần lặp, lấy thời gian nhỏ nhất")
+    parser.add_argument('--seed', type=int, default=0, help="seed của dữ liệu ngẫu nhiên")
+    parser.add_argument('-o', '--output', default=None, help="file JSON kết quả (mặc định in ra stdout)")
+    parser.add_argument('--compare', default=None, help="file JSON của lần chạy trước để so sánh")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="mức giảm thông lượng chấp nhận được")
+    args = parser.parse_args(argv)
+
+    paths, stages = args.paths.split(','), args.stages.split(',')
+    codes = None if args.codes is None else args.codes.split(',')
+    cases = [case for case in CASES + _library_cases()
+             if case[0] in paths and case[1] in stages and (codes is None or case[2] in codes)]
+    specs = [('random', parse_size(size), args.seed) for size in args.sizes.split(',') if size]
+    specs += [('image', os.path.abspath(image)) for image in args.images]
+
+    results = []
+    # Mỗi trường hợp một tiến trình mới (spawn) để đo đỉnh RSS độc lập
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn'), max_tasks_per_child=1) as pool:
+        for spec in specs:
+            for case in cases:
+                result = pool.submit(run_case, case, spec, args.repeat).result()
+                results.append(result)
+                print(f"{result['path']:8} {result['stage']:7} {result['code']:15} {result['payload']:>12} "
+                      f"{result['bytes']:>12} B {result['mbit_per_s'] or 0:12.1f} Mbit/s", file=sys.stderr)
+
+    report = {"meta": _metadata(), "results": results}
+    status = 0
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            report["regressions"] = compare(results, json.load(f), args.tolerance)
+        for regression in report["regressions"]:
+            print(f"❌ Chậm hơn: {regression['case']} ({regression['ratio']:.0%} so với lần trước)", file=sys.stderr)
+        status = 1 if report["regressions"] else 0
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Bộ máy mã hóa đường truyền dùng chung cho phần văn bản và phần ảnh."""
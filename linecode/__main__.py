@@ -0,0 +1,5 @@
+import sys
+
+from linecode.cli import main
+
+sys.exit(main())
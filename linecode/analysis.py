@@ -0,0 +1,175 @@
+"""Thống kê tín hiệu đường truyền và phổ công suất, tính trong một lượt duyệt theo khối.
+
+Để chọn mã cho một tuyến cần biết: thành phần DC (mức trung bình), đoạn dài
+nhất không có chuyển mức (bên thu mất đồng bộ), mật độ chuyển mức, tần suất
+từng mức và mật độ phổ công suất (PSD). SignalAnalyzer nhận tín hiệu theo
+từng khối (mảng từ bộ mã hóa, hoặc các khối memmap của file .lcs) nên bộ nhớ
+chỉ cỡ một khối; PSD ước lượng bằng phương pháp Welch: các đoạn `nperseg` ký
+hiệu chồng nửa đoạn, cửa sổ Hann, trung bình bình phương biên độ FFT. Đoạn
+dở cuối khối được giữ lại ghép với khối sau nên kết quả không phụ thuộc cách
+chia khối. Tần số tính theo tốc độ ký hiệu (0 đến 0.5 chu kỳ/ký hiệu); không
+trừ trung bình trước FFT để PSD giữ được vạch DC.
+Ví dụ:
+    stats = analyze("out/anh.png.ami.lcs")
+    table = compare_codes(open("anh.png", "rb").read(), ["nrz-l", "ami", "hdb3"])
+"""
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from linecode import registry
+from linecode.signalfile import SignalFile, is_signal_file, open_signal, read_text_signal
+from linecode.stream import StreamEncoder
+
+# Số ký hiệu mỗi đoạn Welch mặc định
+NPERSEG = 256
+# Số ký hiệu mỗi khối khi duyệt file/mã hóa để so sánh
+CHUNK_SIZE = 1 << 20
+# Số đoạn Welch biến đổi FFT mỗi lượt (giới hạn bộ nhớ tạm)
+_SEGMENT_BATCH = 1 << 12
+
+SignalStats = namedtuple('SignalStats', ['length', 'dc', 'power', 'histogram', 'transitions',
+                                         'transition_density', 'longest_run', 'frequencies', 'psd'])
+
+class SignalAnalyzer:
+    """Tích lũy thống kê của một tín hiệu nhận theo từng khối mức (int8)."""
+
+    def __init__(self, nperseg=NPERSEG):
+        self.nperseg = nperseg
+        self.step = max(nperseg // 2, 1)
+        # Hann đối xứng bỏ hai điểm 0 ở đầu mút
+        self.window = np.hanning(nperseg + 2)[1:-1] if nperseg > 1 else np.ones(1)
+        self.length = 0
+        self.total = 0
+        self.squares = 0
+        self.counts = np.zeros(256, dtype=np.int64)
+        self.transitions = 0
+        self.longest_run = 0
+        self._last = None
+        self._run = 0
+        self._spectrum = np.zeros(nperseg // 2 + 1)
+        self._segments = 0
+        self._held = np.zeros(0, dtype=np.int8)
+
+    def feed(self, levels):
+        """Thêm một khối mức tín hiệu."""
+        levels = np.asarray(levels, dtype=np.int8).reshape(-1)
+        if not levels.size:
+            return
+        counts = np.bincount(levels.view(np.uint8), minlength=256)
+        self.counts += counts
+        values = np.arange(256, dtype=np.uint8).view(np.int8).astype(np.int64)
+        self.total += int(counts @ values)
+        self.squares += int(counts @ (values * values))
+        self.length += levels.size
+        self._runs(levels)
+        self._welch(levels)
+
+    def _runs(self, levels):
+        """Đếm chuyển mức và đoạn đứng yên dài nhất, nối tiếp đoạn đứng yên cuối khối trước."""
+        edges = np.flatnonzero(levels[1:] != levels[:-1]) + 1
+        continues = self._last is not None and levels[0] == self._last
+        if self._last is not None and not continues:
+            self.transitions += 1
+        self.transitions += int(edges.size)
+        if not edges.size:
+            self._run = self._run + levels.size if continues else levels.size
+        else:
+            first = int(edges[0]) + (self._run if continues else 0)
+            inner = int(np.diff(edges).max()) if edges.size > 1 else 0
+            self.longest_run = max(self.longest_run, first, inner)
+            self._run = levels.size - int(edges[-1])
+        self.longest_run = max(self.longest_run, self._run)
+        self._last = levels[-1]
+
+    def _welch(self, levels):
+        """Cộng dồn phổ các đoạn Welch trọn vẹn; phần chưa đủ đoạn được giữ lại."""
+        if self._held.size:
+            levels = np.concatenate([self._held, levels])
+        count = (levels.size - self.nperseg) // self.step + 1 if levels.size >= self.nperseg else 0
+        if count:
+            segments = np.lib.stride_tricks.sliding_window_view(levels, self.nperseg)[::self.step][:count]
+            for first in range(0, count, _SEGMENT_BATCH):
+                batch = segments[first:first + _SEGMENT_BATCH] * self.window
+                spectrum = np.fft.rfft(batch, axis=1)
+                self._spectrum += (spectrum.real ** 2 + spectrum.imag ** 2).sum(axis=0)
+            self._segments += count
+        self._held = levels[count * self.step:].copy()
+
+    def result(self):
+        """SignalStats của phần tín hiệu đã nhận.
+
+        `histogram` là {mức: số ký hiệu}; `transition_density` là số chuyển
+        mức trên mỗi ký hiệu; `psd` là PSD một phía (công suất trên một đơn
+        vị tần số ký hiệu), rỗng nếu tín hiệu ngắn hơn một đoạn Welch.
+        """
+        length = self.length
+        levels = np.flatnonzero(self.counts)
+        histogram = {int(np.uint8(level).view(np.int8)): int(self.counts[level]) for level in levels}
+        histogram = dict(sorted(histogram.items()))
+        frequencies = np.fft.rfftfreq(self.nperseg)
+        if self._segments:
+            psd = self._spectrum / (self._segments * float(self.window @ self.window))
+            # Một phía: nhân đôi mọi tần số trừ DC (và Nyquist khi nperseg chẵn)
+            psd[1:len(psd) - (self.nperseg % 2 == 0)] *= 2
+        else:
+            frequencies, psd = frequencies[:0], np.zeros(0)
+        return SignalStats(length, self.total / length if length else 0.0,
+                           self.squares / length if length else 0.0, histogram, self.transitions,
+                           self.transitions / (length - 1) if length > 1 else 0.0,
+                           self.longest_run, frequencies, psd)
+
+# === PHÂN TÍCH FILE VÀ SO SÁNH MÃ ===
+def analyze(signal, nperseg=NPERSEG, chunk_size=CHUNK_SIZE):
+    """Thống kê một tín hiệu: mảng mức, SignalFile hoặc đường dẫn .lcs/.txt (file .lcs đọc lười theo khối)."""
+    if isinstance(signal, (str, os.PathLike)):
+        signal = open_signal(signal) if is_signal_file(signal) else read_text_signal(signal)
+    analyzer = SignalAnalyzer(nperseg)
+    if isinstance(signal, SignalFile):
+        for block in signal.chunks(chunk_size):
+            analyzer.feed(block)
+    else:
+        levels = np.asarray(signal, dtype=np.int8).reshape(-1)
+        for start in range(0, levels.size, chunk_size):
+            analyzer.feed(levels[start:start + chunk_size])
+    return analyzer.result()
+
+def compare_codes(data, codes=None, nperseg=NPERSEG, chunk_size=CHUNK_SIZE):
+    """Mã hóa cùng dữ liệu (bytes) bằng từng mã (mặc định mọi mã đã đăng ký), trả về {mã: SignalStats}.
+
+    Mỗi khối `chunk_size` byte dữ liệu được mã hóa bằng mọi mã rồi đưa ngay
+    vào bộ phân tích của mã đó, nên chỉ một khối tín hiệu tồn tại mỗi lúc.
+    """
+    codes = registry.names() if codes is None else codes
+    data = memoryview(data).cast('B')
+    encoders = {code: StreamEncoder(code) for code in codes}
+    analyzers = {code: SignalAnalyzer(nperseg) for code in codes}
+    for start in range(0, len(data), chunk_size):
+        chunk = data[start:start + chunk_size]
+        for code in codes:
+            analyzers[code].feed(encoders[code].feed(chunk))
+    for code in codes:
+        analyzers[code].feed(encoders[code].flush())
+    return {code: analyzers[code].result() for code in codes}
+
+def to_dict(stats, code=None):
+    """SignalStats → dict ghi được ra JSON (thêm số chuyển mức trên mỗi bit nếu biết mã)."""
+    result = stats._asdict()
+    result["histogram"] = {str(level): count for level, count in stats.histogram.items()}
+    result["frequencies"] = stats.frequencies.tolist()
+    result["psd"] = stats.psd.tolist()
+    codec = registry.find(code)
+    if codec is not None:
+        result = {"code": code, **result, "transitions_per_bit": stats.transition_density * codec.symbols_per_bit}
+    return result
+
+def summary(code, stats):
+    """Một dòng tóm tắt: DC, công suất, đoạn đứng yên dài nhất, chuyển mức/bit, tần số có PSD lớn nhất."""
+    codec = registry.find(code)
+    per_bit = stats.transition_density * (codec.symbols_per_bit if codec else 1)
+    peak = float(stats.frequencies[np.argmax(stats.psd)]) if stats.psd.size else float('nan')
+    levels = ' '.join(f"{level:+d}:{count / stats.length:.2f}" if level else f"0:{count / stats.length:.2f}"
+                      for level, count in stats.histogram.items())
+    return (f"{code or '?':15} DC {stats.dc:+.4f}  P {stats.power:.3f}  chạy dài nhất {stats.longest_run:>8}  "
+            f"chuyển mức/bit {per_bit:.3f}  đỉnh PSD {peak:.3f}  [{levels}]")
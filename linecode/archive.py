@@ -0,0 +1,199 @@
+"""Kho nhiều tín hiệu (.lca): các bản ghi .lcs nối tiếp nhau cùng một mục lục để truy cập ngẫu nhiên.
+
+[MAGIC 4 byte][phiên bản 1 byte][3 byte trống][vị trí mục lục 8 byte][độ dài mục lục 8 byte]
+[bản ghi .lcs][bản ghi .lcs]...[mục lục JSON]
+Mỗi bản ghi là một file .lcs đầy đủ, bắt đầu ở bội số 64 byte. Mục lục ghi
+tên, vị trí, mã đường truyền, số ký hiệu và payload của từng bản ghi, nên
+liệt kê kho hay mở một ảnh chỉ đọc mục lục và header của bản ghi đó (tín
+hiệu đọc qua memmap), không phải quét cả kho. Ghi thêm vào kho có sẵn: bản
+ghi mới nối vào cuối, mục lục mới ghi sau cùng rồi mới cập nhật vị trí mục
+lục ở đầu file, nên kho vẫn đọc được nếu quá trình ghi bị ngắt. Bản ghi trùng
+tên thay thế bản ghi cũ trong mục lục.
+Vì chỉ ghi thêm, kho chỉ lớn dần: bản ghi bị thay thế và các mục lục cũ vẫn
+nằm trong file. compact() ghi lại kho chỉ với các bản ghi còn trong mục lục.
+Ví dụ:
+    with ArchiveWriter("anh.lca") as archive:
+        archive.write("meo.png", signal, "ami", payload)
+    signal_file = Archive("anh.lca")["meo.png"]
+    compact("anh.lca")
+"""
+import json
+import os
+import struct
+
+import numpy as np
+
+from linecode.signalfile import SignalFile, SignalWriter
+
+MAGIC = b'LCSA'
+VERSION = 1
+_PREFIX = struct.Struct('<4sB3xQQ')
+_ALIGN = 64
+# Số ký hiệu chép mỗi lần khi ghi lại kho
+_CHUNK = 1 << 20
+
+def is_archive(path):
+    """Kiểm tra file có phải kho .lca hay không."""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def _read_index(f, path):
+    """Đọc mục lục từ file kho đang mở, trả về dict tên → thông tin bản ghi."""
+    prefix = f.read(_PREFIX.size)
+    if len(prefix) < _PREFIX.size:
+        raise ValueError(f"{path} không phải kho tín hiệu .lca")
+    magic, version, index_offset, index_size = _PREFIX.unpack(prefix)
+    if magic != MAGIC:
+        raise ValueError(f"{path} không phải kho tín hiệu .lca")
+    if version > VERSION:
+        raise ValueError(f"Không hỗ trợ phiên bản kho tín hiệu {version}")
+    if not index_offset:
+        return {}
+    f.seek(index_offset)
+    return {entry["name"]: entry for entry in json.loads(f.read(index_size).decode('utf-8'))["entries"]}
+
+# === ĐỌC KHO ===
+class Archive:
+    """Kho .lca mở để đọc; `archive[tên]` trả về SignalFile của bản ghi (memmap, không nạp cả kho)."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.entries = _read_index(f, path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def __getitem__(self, name):
+        try:
+            entry = self.entries[name]
+        except KeyError:
+            raise KeyError(f"Kho {self.path} không có bản ghi {name!r}") from None
+        return SignalFile(self.path, entry["offset"])
+
+    def names(self):
+        """Tên các bản ghi theo thứ tự ghi."""
+        return list(self.entries)
+
+# === GHI KHO ===
+class _EntryWriter(SignalWriter):
+    """SignalWriter ghi một bản ghi vào file kho; mục lục được cập nhật khi đóng."""
+
+    def __init__(self, archive, name, code, alphabet, storage, payload):
+        super().__init__(archive.path, code, alphabet, storage, payload, file=archive._file)
+        self.archive = archive
+        self.name = name
+
+    def close(self):
+        if self._closed:
+            return
+        super().close()
+        self.archive._add(self.name, self._start, self)
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is not None:
+            # Bản ghi dở dang không được đưa vào mục lục
+            self._closed = True
+            return
+        self.close()
+
+class ArchiveWriter:
+    """Ghi bản ghi vào kho .lca (mặc định ghi thêm vào kho có sẵn); mục lục được ghi khi đóng."""
+
+    def __init__(self, path, append=True):
+        self.path = path
+        if append and os.path.exists(path) and os.path.getsize(path):
+            self._file = open(path, 'r+b')
+            try:
+                self.entries = _read_index(self._file, path)
+            except Exception:
+                self._file.close()
+                raise
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self._file = open(path, 'w+b')
+            self.entries = {}
+            self._file.write(_PREFIX.pack(MAGIC, VERSION, 0, 0))
+
+    def _align(self):
+        position = self._file.tell()
+        if position % _ALIGN:
+            self._file.write(b'\0' * (_ALIGN - position % _ALIGN))
+
+    def _add(self, name, offset, writer):
+        self.entries.pop(name, None)
+        self.entries[name] = {"name": name, "offset": offset, "code": writer.code,
+                              "length": writer.length, "payload": writer.payload}
+
+    def writer(self, name, code=None, alphabet=None, storage=None, payload=None):
+        """SignalWriter cho bản ghi mới tên `name` (ghi theo khối như file .lcs riêng)."""
+        self._align()
+        return _EntryWriter(self, name, code, alphabet, storage, payload)
+
+    def write(self, name, signal, code=None, alphabet=None, storage=None, payload=None):
+        """Ghi toàn bộ tín hiệu thành bản ghi `name` (tự chuyển sang int8 nếu có mức lạ, như write_signal)."""
+        levels = np.asarray(signal, dtype=np.int8).ravel()
+        if storage != 'int8':
+            self._align()
+            start = self._file.tell()
+            try:
+                with self.writer(name, code, alphabet, storage, payload) as writer:
+                    writer.write(levels)
+                return
+            except ValueError:
+                self._file.seek(start)
+                self._file.truncate()
+                storage = 'int8'
+        with self.writer(name, code, alphabet, storage, payload) as writer:
+            writer.write(levels)
+
+    def close(self):
+        """Ghi mục lục vào cuối kho rồi cập nhật vị trí mục lục ở đầu file."""
+        if self._file.closed:
+            return
+        self._file.seek(0, os.SEEK_END)
+        index_offset = self._file.tell()
+        index = json.dumps({"entries": list(self.entries.values())}, ensure_ascii=False).encode('utf-8')
+        self._file.write(index)
+        self._file.flush()
+        self._file.seek(0)
+        self._file.write(_PREFIX.pack(MAGIC, VERSION, index_offset, len(index)))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# === GHI LẠI KHO ===
+def compact(path):
+    """Ghi lại kho chỉ với các bản ghi còn trong mục lục và một mục lục duy nhất.
+
+    Kho mới được ghi ra file tạm cạnh kho cũ rồi mới thay thế, nên kho cũ còn
+    nguyên nếu quá trình ghi bị ngắt. Trả về số byte giải phóng được.
+    """
+    source = Archive(path)
+    temp = f"{path}.tmp"
+    try:
+        with ArchiveWriter(temp, append=False) as target:
+            for name in source:
+                signal_file = source[name]
+                with target.writer(name, signal_file.code, signal_file.alphabet,
+                                   signal_file.storage, signal_file.payload) as writer:
+                    for chunk in signal_file.chunks(_CHUNK):
+                        writer.write(chunk)
+                # Nhả memmap của bản ghi trước khi thay file kho
+                del signal_file
+    except BaseException:
+        os.remove(temp)
+        raise
+    before = os.path.getsize(path)
+    os.replace(temp, path)
+    return before - os.path.getsize(path)
@@ -0,0 +1,193 @@
+import numpy as np
+
+
+class BitBuffer:
+    """Chuỗi bit lưu ở dạng đóng gói (8 bit/byte, bit cao trước).
+
+    `packed` là mảng uint8 một chiều, `nbits` là số bit có nghĩa. Tạo từ
+    bytes/bytearray/memoryview/ndarray không sao chép dữ liệu; `memoryview()`
+    cũng trả về vùng nhớ gốc.
+    """
+
+    __slots__ = ('packed', 'nbits')
+
+    def __init__(self, packed, nbits=None):
+        if not isinstance(packed, np.ndarray):
+            packed = np.frombuffer(packed, dtype=np.uint8)
+        elif packed.dtype != np.uint8:
+            packed = packed.view(np.uint8)
+        self.packed = packed.reshape(-1)
+        self.nbits = self.packed.size * 8 if nbits is None else int(nbits)
+        if not 0 <= self.nbits <= self.packed.size * 8:
+            raise ValueError(f"Số bit {self.nbits} vượt quá {self.packed.size} byte dữ liệu.")
+
+    # === TẠO BỘ ĐỆM ===
+    @classmethod
+    def from_bytes(cls, data):
+        """Tạo từ bytes/bytearray/memoryview hoặc mảng numpy (không sao chép)."""
+        return cls(data)
+
+    @classmethod
+    def from_bits(cls, bits):
+        """Đóng gói mảng bit 0/1 (uint8 hoặc bool)."""
+        bits = np.asarray(bits).reshape(-1)
+        return cls(np.packbits(bits), bits.size)
+
+    @classmethod
+    def from_string(cls, text):
+        """Tạo từ chuỗi '0'/'1' kiểu cũ."""
+        bits = np.frombuffer(text.encode('ascii'), dtype=np.uint8) - ord('0')
+        return cls.from_bits(bits)
+
+    # === CHUYỂN ĐỔI ===
+    def unpack(self):
+        """Trả về mảng bit uint8 (mỗi bit một byte)."""
+        return np.unpackbits(self.packed, count=self.nbits)
+
+    def tobytes(self):
+        """Trả về bytes; nếu bộ đệm được tạo từ bytes thì trả lại chính đối tượng đó."""
+        source = self.packed.base
+        if isinstance(source, bytes) and len(source) == self.packed.size:
+            return source
+        return self.packed.tobytes()
+
+    def memoryview(self):
+        """memoryview trỏ vào vùng nhớ đóng gói (không sao chép)."""
+        return memoryview(self.packed)
+
+    def __buffer__(self, flags):
+        return memoryview(self.packed)
+
+    def __bytes__(self):
+        return self.tobytes()
+
+    def to_string(self):
+        """Trả về chuỗi '0'/'1' (chỉ dùng để hiển thị, tốn 1 byte cho mỗi bit)."""
+        return (self.unpack() + ord('0')).tobytes().decode('ascii')
+
+    # === GIAO DIỆN DÃY ===
+    def __len__(self):
+        return self.nbits
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return BitBuffer.from_bits(self.unpack()[index])
+        if index < 0:
+            index += self.nbits
+        if not 0 <= index < self.nbits:
+            raise IndexError("Chỉ số bit nằm ngoài phạm vi.")
+        return int(self.packed[index >> 3] >> (7 - (index & 7))) & 1
+
+    def __iter__(self):
+        return iter(self.unpack().tolist())
+
+    def __eq__(self, other):
+        if not isinstance(other, BitBuffer):
+            return NotImplemented
+        return self.nbits == other.nbits and np.array_equal(self.unpack(), other.unpack())
+
+    def __str__(self):
+        return self.to_string()
+
+    def __repr__(self):
+        return f"BitBuffer(nbits={self.nbits})"
+
+# === CHUẨN HÓA DỮ LIỆU VÀO ===
+def as_bits(data):
+    """Chuyển dữ liệu vào thành mảng bit uint8 (0/1).
+
+    Chấp nhận BitBuffer, chuỗi '0'/'1', bytes/bytearray/memoryview (bit đã
+    đóng gói, MSB trước) hoặc mảng numpy chứa sẵn các bit.
+    """
+    if isinstance(data, BitBuffer):
+        return data.unpack()
+    if isinstance(data, str):
+        return np.frombuffer(data.encode('ascii'), dtype=np.uint8) - ord('0')
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+    bits = np.asarray(data)
+    if bits.dtype != np.uint8:
+        bits = bits.astype(np.uint8)
+    return bits.ravel()
+
+def as_packed(data):
+    """Trả về (mảng byte đã đóng gói, số bit); BitBuffer và bytes được dùng trực tiếp, không sao chép."""
+    if isinstance(data, BitBuffer):
+        return data.packed, data.nbits
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        packed = np.frombuffer(data, dtype=np.uint8)
+        return packed, packed.size * 8
+    bits = as_bits(data)
+    return np.packbits(bits), bits.size
+
+# === CÁC PHÉP TOÁN TRÊN BIT ĐÃ ĐÓNG GÓI ===
+def prefix_parity(packed):
+    """Chẵn lẻ tích lũy (bao gồm bit hiện tại) của số bit 1, ở dạng đóng gói.
+
+    Quét tiền tố XOR trong từng từ 64 bit bằng 6 phép dịch, sau đó cộng dồn
+    chẵn lẻ giữa các từ (số phần tử ít hơn 64 lần so với duyệt từng bit).
+    """
+    words = np.zeros(-(-packed.size // 8), dtype='>u8')
+    words.view(np.uint8)[:packed.size] = packed
+    words = words.astype(np.uint64)
+    for shift in (1, 2, 4, 8, 16, 32):
+        words ^= words >> np.uint64(shift)
+    if words.size:
+        carry = np.bitwise_xor.accumulate(words & np.uint64(1))
+        words[1:] ^= carry[:-1] * np.uint64(0xFFFFFFFFFFFFFFFF)
+    return words.astype('>u8').view(np.uint8)[:packed.size]
+
+_BYTE_ONES = np.uint64(0x0101010101010101)
+_STATE_BLOCK = 1 << 16
+
+def byte_states(packed):
+    """Chẵn lẻ số bit 1 của tất cả các byte đứng trước mỗi byte (mảng 0/1).
+
+    Xử lý từng đoạn _STATE_BLOCK byte trên từ 64 bit: gộp chẵn lẻ từng byte về
+    bit thấp, nhân với 0x0101...01 để mỗi byte nhận tổng các byte từ đầu từ
+    tới nó, cộng thêm tổng của các từ trước rồi lùi kết quả đi một byte.
+    """
+    states = np.empty(packed.size, dtype=np.uint8)
+    states[:1] = 0
+    words = np.empty(-(-min(packed.size, _STATE_BLOCK) // 8), dtype='<u8')
+    temp = np.empty_like(words)
+    carry = 0
+    for start in range(0, packed.size, _STATE_BLOCK):
+        chunk = packed[start:start + _STATE_BLOCK]
+        block, shifted = words[:-(-chunk.size // 8)], temp[:-(-chunk.size // 8)]
+        block[-1:] = 0
+        block.view(np.uint8)[:chunk.size] = chunk
+        for shift in (4, 2, 1):
+            np.right_shift(block, np.uint64(shift), out=shifted)
+            block ^= shifted
+        block &= _BYTE_ONES
+        block *= _BYTE_ONES
+        counts = block.view(np.uint8).reshape(-1, 8)
+        before = np.cumsum(counts[:, 7], dtype=np.uint8)
+        before -= counts[:, 7]
+        before += carry
+        counts += before[:, None]
+        counts &= 1
+        inclusive = block.view(np.uint8)[:chunk.size]
+        carry = int(inclusive[-1])
+        states[start + 1:start + 1 + chunk.size] = inclusive[:packed.size - start - 1]
+    return states
+
+_GATHER_BLOCK = 1 << 14
+
+def gather_bytes(table, packed, states=None):
+    """Tra bảng theo từng byte: phần tử thứ k là table[byte k] (có `states`: table[2·byte + trạng thái]).
+
+    Chạy theo từng đoạn _GATHER_BLOCK byte để mảng chỉ số intp nằm gọn trong cache.
+    """
+    out = np.empty(packed.size, dtype=table.dtype)
+    index = np.empty(min(packed.size, _GATHER_BLOCK), dtype=np.intp)
+    for start in range(0, packed.size, _GATHER_BLOCK):
+        stop = min(start + _GATHER_BLOCK, packed.size)
+        chunk = index[:stop - start]
+        chunk[:] = packed[start:stop]
+        if states is not None:
+            chunk <<= 1
+            chunk |= states[start:stop]
+        np.take(table, chunk, out=out[start:stop])
+    return out
@@ -0,0 +1,142 @@
+"""Mô phỏng kênh truyền có nhiễu giữa bộ mã hóa và bộ giải mã, đo tỉ lệ lỗi bit (BER).
+
+Chuỗi xử lý: Signal (encoders + nhịp lấy mẫu) → transmit (suy hao, trôi đường
+nền, AWGN) → slice_levels (integrate-and-dump, so ngưỡng ra mức gần nhất) → decoders. Bộ mã hóa/giải mã có sẵn
+là chuẩn để so: bit giải mã được so với bit gốc.
+Ví dụ:
+    ber_sweep("ami", [0, 2, 4, 6, 8], 10**8, samples_per_symbol=4, wander=0.1)
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from linecode import registry
+from linecode.bitbuffer import BitBuffer, as_packed
+from linecode.linesignal import Signal, integrate_and_dump
+
+# Số bit 1 của mỗi byte
+_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+# Số bit mỗi khối khi đo BER (bội số của 8)
+CHUNK_BITS = 1 << 22
+
+# === KÊNH TRUYỀN ===
+def transmit(signal, snr_db=None, attenuation=1.0, wander=0.0, wander_period=10000,
+             samples_per_symbol=1, rng=None, pulse='rect'):
+    """Truyền tín hiệu qua kênh, trả về mảng mẫu float32.
+
+    `signal` là Signal (dùng nhịp lấy mẫu và dạng xung của nó) hoặc mảng mức
+    theo ký hiệu (lấy `samples_per_symbol` mẫu mỗi ký hiệu với dạng xung
+    `pulse`). Dạng sóng được nhân `attenuation`, cộng trôi đường nền dạng sin
+    biên độ `wander`, chu kỳ `wander_period` ký hiệu, pha ngẫu nhiên, rồi cộng
+    AWGN. SNR là công suất trung bình của tín hiệu (sau suy hao) trên phương
+    sai nhiễu mỗi mẫu; `snr_db=None` là kênh không nhiễu.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    if not isinstance(signal, Signal):
+        signal = Signal(signal, samples_per_symbol=samples_per_symbol, pulse=pulse)
+    samples_per_symbol = signal.samples_per_symbol
+    samples = signal.samples()
+    samples *= np.float32(attenuation)
+    power = float(np.dot(samples, samples)) / samples.size if samples.size else 0.0
+    if wander:
+        phase = np.arange(samples.size, dtype=np.float32)
+        phase *= np.float32(2 * np.pi / (wander_period * samples_per_symbol))
+        phase += np.float32(rng.uniform(0, 2 * np.pi))
+        np.sin(phase, out=phase)
+        phase *= np.float32(wander)
+        samples += phase
+        del phase
+    if snr_db is not None and power:
+        noise = rng.standard_normal(samples.size, dtype=np.float32)
+        noise *= np.float32(np.sqrt(power / 10 ** (snr_db / 10)))
+        samples += noise
+    return samples
+
+# === BỘ QUYẾT ĐỊNH NGƯỠNG ===
+def thresholds(alphabet, scale=1.0):
+    """Ngưỡng quyết định: điểm giữa các mức liền kề (đã sắp xếp), nhân hệ số `scale`."""
+    levels = np.sort(np.asarray(alphabet, dtype=np.float32))
+    return (levels[1:] + levels[:-1]) / 2 * np.float32(scale)
+
+def slice_levels(samples, alphabet, samples_per_symbol=1, scale=1.0, phase=0, pulse='rect'):
+    """Tích phân từng ký hiệu (integrate-and-dump, lệch `phase` mẫu) rồi so ngưỡng ra mức gần nhất (int8).
+
+    `scale` là biên độ kỳ vọng của kênh (ví dụ bằng `attenuation`). Kết quả
+    bắt đầu từ mức thấp nhất và cộng thêm khoảng cách tới mức kế tiếp mỗi khi
+    ước lượng vượt một ngưỡng (tập mức tối đa 4 mức, không cần tìm kiếm hay tra bảng).
+    """
+    centers = integrate_and_dump(samples, samples_per_symbol, phase, pulse)
+    levels = np.sort(np.asarray(alphabet, dtype=np.int8))
+    result = np.full(centers.size, levels[0], dtype=np.int8)
+    for threshold, step in zip(thresholds(alphabet, scale), np.diff(levels)):
+        above = (centers > threshold).view(np.int8)
+        if step != 1:
+            above *= step
+        result += above
+    return result
+
+# === ĐO TỈ LỆ LỖI BIT ===
+def bit_errors(sent, received):
+    """Số bit khác nhau giữa hai chuỗi bit; phần chênh lệch độ dài tính là lỗi."""
+    sent, sent_bits = as_packed(sent)
+    received, received_bits = as_packed(received)
+    nbits = min(sent_bits, received_bits)
+    whole = nbits // 8
+    diff = sent[:whole] ^ received[:whole]
+    errors = int(np.take(_POPCOUNT, diff).sum(dtype=np.int64))
+    if nbits % 8:
+        tail = (int(sent[whole]) ^ int(received[whole])) >> (8 - nbits % 8)
+        errors += bin(tail).count('1')
+    return errors + abs(sent_bits - received_bits)
+
+def _measure_chunk(task):
+    """Truyền một khối bit ngẫu nhiên, trả về (số bit lỗi, số ký hiệu lỗi); chạy được trong tiến trình con."""
+    code, count, seed, snr_db, channel = task
+    rng = np.random.default_rng(seed)
+    sent = BitBuffer(rng.integers(0, 256, -(-count // 8), dtype=np.uint8), count)
+    signal = Signal.encode(sent, code, pulse=channel["pulse"])
+    signal.samples_per_symbol = channel["samples_per_symbol"]
+    samples = transmit(signal, snr_db, channel["attenuation"], channel["wander"], channel["wander_period"], rng=rng)
+    sliced = slice_levels(samples, signal.alphabet, signal.samples_per_symbol, channel["attenuation"],
+                          pulse=signal.pulse)
+    del samples
+    result = registry.get(code).decode(sliced)
+    # Bỏ bit đệm (2B1Q với số bit lẻ) trước khi so
+    errors = bit_errors(sent, BitBuffer(result.bits.packed, min(result.bits.nbits, count)))
+    return errors, int(np.count_nonzero(result.invalid))
+
+def measure_ber(code, nbits, snr_db=None, attenuation=1.0, wander=0.0, wander_period=10000,
+                samples_per_symbol=1, pulse='rect', seed=0, chunk_bits=CHUNK_BITS, processes=1):
+    """Truyền `nbits` bit ngẫu nhiên bằng mã `code` qua kênh, trả về dict kết quả BER.
+
+    Dữ liệu được xử lý theo khối `chunk_bits` bit (mỗi khối là một lần truyền
+    độc lập) nên bộ nhớ không phụ thuộc `nbits`. Mỗi khối có seed riêng tách
+    từ `seed` nên kết quả không phụ thuộc số tiến trình `processes`. Bộ thu
+    biết trước suy hao.
+    """
+    chunk_bits = max(chunk_bits // 8, 1) * 8
+    counts = [min(chunk_bits, nbits - start) for start in range(0, nbits, chunk_bits)]
+    seeds = np.random.SeedSequence(seed).spawn(len(counts))
+    channel = {"attenuation": attenuation, "wander": wander, "wander_period": wander_period,
+               "samples_per_symbol": samples_per_symbol, "pulse": pulse}
+    tasks = [(code, count, chunk_seed, snr_db, channel) for count, chunk_seed in zip(counts, seeds)]
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(tasks) <= 1:
+        results = [_measure_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(_measure_chunk, tasks))
+    errors = sum(result[0] for result in results)
+    return {
+        "code": code,
+        "snr_db": snr_db,
+        "bits": nbits,
+        "errors": errors,
+        "ber": errors / nbits if nbits else 0.0,
+        "invalid_symbols": sum(result[1] for result in results),
+    }
+
+def ber_sweep(code, snr_values, nbits, **channel):
+    """Đo BER của mã `code` tại từng giá trị SNR (dB); tham số kênh như measure_ber."""
+    return [measure_ber(code, nbits, snr_db, **channel) for snr_db in snr_values]
@@ -0,0 +1,648 @@
+"""Giao diện dòng lệnh không tương tác cho bộ mã hóa/giải mã đường truyền.
+
+Ví dụ:
+    python -m linecode encode --code ami -o out/ anh.png vanban.txt
+    python -m linecode decode -o out/ out/anh.png.ami.lcs
+    python -m linecode decode --code nrz-l "TEXT_CODING&DECODING/2.NRZ-L.txt"
+    python -m linecode encode --code 2b1q --jobs 8 -o out/ thu_muc_anh/
+    python -m linecode encode --code manchester --frame 4096 -o out/ anh_lon.png
+    python -m linecode encode --code nrz-l --compress delta+zlib -o out/ anh_man_hinh.png
+    python -m linecode encode --code hdb3 --scramble multiplicative -o out/ anh.png
+    python -m linecode encode --code ami --archive out/anh.lca thu_muc_anh/
+    python -m linecode list out/anh.lca
+    python -m linecode compact out/anh.lca
+    python -m linecode decode --entry meo.png -o out/ out/anh.lca
+    python -m linecode render --format svg --size 4x1.5 --jobs 8 -o thumbs/ out/
+    python -m linecode ber --codes nrz-l,ami,2b1q --snr 0:12:2 --bits 1e8 --jobs 8
+    python -m linecode analyze anh.png out/anh.png.ami.lcs
+    python -m linecode analyze --codes nrz-l,ami,hdb3 --json anh.png
+    python -m linecode transport serve 127.0.0.1:9000 -o nhan.bin
+    python -m linecode transport send 127.0.0.1:9000 --code hdb3 --impair flip:1e-4 anh.png
+    python -m linecode transport loopback --code ami --impair awgn:8 anh.png
+    python -m linecode --profile prof/anh encode --code hdb3 --compress lzma -o out/ anh.png
+
+matplotlib chỉ được nạp khi có --plot hoặc lệnh render (backend Agg, không cần
+màn hình), PIL chỉ được nạp khi gặp file ảnh, asyncio (linecode.transport)
+chỉ được nạp ở lệnh transport; tkinter không bao giờ được nạp.
+"""
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from linecode import analysis, compression, parallel, profiling, registry, scrambler
+from linecode.archive import Archive, ArchiveWriter, compact, is_archive
+from linecode.bitbuffer import BitBuffer
+from linecode.channel import ber_sweep
+from linecode.framing import FRAME_PAYLOAD, block_frames, deframe_signal, describe, frames
+from linecode.imagefile import bytes_per_pixel, decode_pixels, image_extension, image_payload, load_image, save_image
+from linecode.linesignal import PULSES
+from linecode.render import render_batch, renderer
+from linecode.signalfile import SignalWriter, TextSignalWriter, is_signal_file, open_signal, read_text_signal
+from linecode.stream import StreamDecoder, decode_stream, encode_chunks, encode_stream
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tif', '.tiff'}
+CHUNK_SIZE = 1 << 20
+
+# === MÃ HÓA ===
+def _open_writer(path, fmt, code, payload, archive=None):
+    if archive is not None:
+        return archive.writer(payload["name"], code, payload=payload)
+    if fmt == 'txt':
+        return TextSignalWriter(path)
+    return SignalWriter(path, code, payload=payload)
+
+def encode_file(path, code, output_dir, fmt='lcs', kind='auto', processes=1, frame=None, archive=None,
+                compress=None, scramble=None):
+    """Mã hóa một file (ảnh hoặc dữ liệu thô), trả về (đường dẫn file tín hiệu, các dòng thông tin).
+
+    Với `processes` > 1, ảnh (hoặc dữ liệu đã đóng khung) được chia khối và
+    mã hóa trên nhiều tiến trình. `frame` là số byte payload mỗi khung
+    (linecode.framing); mặc định không đóng khung. `compress` là chuỗi nén
+    (linecode.compression) áp dụng trước khi đóng khung (có đóng khung thì
+    mỗi khung được nén riêng); tỉ lệ và tốc độ nén được trả về trong các dòng thông tin. `scramble` (linecode.scrambler)
+    xáo trộn dữ liệu sau cùng, ngay trước khi mã hóa đường truyền. Với
+    `archive` (ArchiveWriter), tín hiệu thành một bản ghi mang tên file gốc trong kho.
+    """
+    name = os.path.basename(path)
+    if kind == 'auto':
+        kind = 'image' if os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS else 'raw'
+    output = f"{archive.path}:{name}" if archive is not None else os.path.join(output_dir, f"{name}.{code}.{fmt}")
+    notes = []
+    stride = 1
+    if kind == 'image':
+        with profiling.stage("load_image", os.path.getsize(path)) as stage:
+            image = load_image(path)
+            stage.record(bytes_out=image.pixels.nbytes)
+        payload = image_payload(image, name)
+        data = memoryview(image.pixels.reshape(-1).view(np.uint8))
+        stride = bytes_per_pixel(image)
+    else:
+        payload = {"kind": "raw", "name": name}
+        data = None
+    if compress:
+        if data is None:
+            with open(path, 'rb') as source:
+                data = source.read()
+        if frame:
+            # Nén riêng từng khung: khung hỏng chỉ làm mất khối dữ liệu của nó, không làm hỏng cả dòng nén
+            blocks, payload["compression"] = profiling.call("compress", compression.compress_blocks, data, compress,
+                                                            frame, stride)
+        else:
+            data, payload["compression"] = profiling.call("compress", compression.compress, data, compress, stride)
+        notes.append(compression.summary(payload["compression"]))
+    if frame:
+        payload["framing"] = {"payload_size": frame}
+        if data is None:
+            with open(path, 'rb') as source:
+                data = source.read()
+        chunks = block_frames(blocks) if compress else frames(data, frame)
+        if processes > 1 or scramble:
+            data = profiling.call("frame", b''.join, chunks)
+    elif data is None and not scramble:
+        with profiling.stage("encode", os.path.getsize(path)) as stage:
+            with open(path, 'rb') as source, _open_writer(output, fmt, code, payload, archive) as writer:
+                encode_stream(source, writer, code, CHUNK_SIZE)
+            stage.record(bytes_out=_written(output, archive))
+        return output, notes
+    if scramble:
+        if data is None:
+            with open(path, 'rb') as source:
+                data = source.read()
+        data = profiling.call("scramble", scrambler.scramble, data, scramble).memoryview()
+        payload["scrambler"] = scramble
+    if not frame or scramble:
+        chunks = (data[i:i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE))
+    with profiling.stage("encode", profiling.nbytes(data)) as stage:
+        with _open_writer(output, fmt, code, payload, archive) as writer:
+            if processes > 1:
+                writer.write(parallel.encode(BitBuffer.from_bytes(data), code, processes))
+            else:
+                encode_chunks(chunks, writer, code)
+        stage.record(bytes_out=_written(output, archive))
+    return output, notes
+
+def _written(output, archive):
+    """Số byte của file tín hiệu vừa ghi (None với bản ghi trong kho)."""
+    return os.path.getsize(output) if archive is None else None
+
+# === GIẢI MÃ ===
+def _output_name(payload, path, output_dir, code, tag=None):
+    """Tên file kết quả: <tên gốc>[.<tag>].decoded<đuôi gốc>, tránh ghi đè file gốc.
+
+    Không có đuôi gốc thì dùng .txt với file .txt kiểu cũ (Encoding.py mã hóa
+    văn bản), .bin với các file khác.
+    """
+    name = (payload or {}).get("name")
+    base, signal_ext = os.path.splitext(os.path.basename(path))
+    if not name:
+        # File không ghi tên gốc: bỏ đuôi file tín hiệu và hậu tố ".<mã>" do lệnh encode
+        # (hoặc ".<nhãn mã>" do Encoding.py, ví dụ 2.NRZ-L.txt) thêm vào, không phân biệt hoa thường
+        name = base
+        codec = registry.find(code)
+        suffixes = (codec.name, codec.label) if codec is not None else (code,) if code else ()
+        for suffix in suffixes:
+            if name.lower().endswith(f".{suffix}".lower()):
+                name = name[:-len(suffix) - 1]
+                break
+    stem, ext = os.path.splitext(name)
+    if (payload or {}).get("kind") == "image":
+        ext = image_extension(payload.get("mode"))
+    fallback = '.txt' if payload is None and signal_ext.lower() == '.txt' else '.bin'
+    return os.path.join(output_dir, f"{stem}{f'.{tag}' if tag else ''}.decoded{ext or fallback}")
+
+def _plan_outputs(items, output_dir, code=None):
+    """Hậu tố tên kết quả của từng đầu vào giải mã, để các đầu vào trong cùng một lô không ghi đè lên nhau.
+
+    Trả về [(hậu tố, đầu vào trùng)] theo thứ tự: đầu vào có tên kết quả mặc
+    định trùng nhau (ví dụ x.png.ami.lcs và x.png.2b1q.lcs, hoặc bản ghi
+    trong kho và file .lcs của cùng một ảnh) được thêm hậu tố là mã đường
+    truyền (bản ghi trong kho: tên kho và mã). Nếu vẫn trùng, các đầu vào sau
+    được gán nhãn của đầu vào trước để báo lỗi thay vì ghi đè.
+    """
+    planned = []
+    for item in items:
+        path, entry = item if isinstance(item, tuple) else (item, None)
+        try:
+            signal_file = Archive(path)[entry] if entry is not None else \
+                open_signal(path) if is_signal_file(path) else None
+        except (OSError, ValueError, KeyError):
+            # Lỗi đọc file được báo khi giải mã
+            planned.append(None)
+            continue
+        payload, file_code = (signal_file.payload, signal_file.code) if signal_file is not None else (None, code)
+        tag = file_code if entry is None else f"{os.path.splitext(os.path.basename(path))[0]}.{file_code}"
+        planned.append((payload, path, file_code, tag))
+    defaults = Counter(_output_name(plan[0], plan[1], output_dir, plan[2]) for plan in planned if plan)
+    result, owners = [], {}
+    for item, plan in zip(items, planned):
+        if plan is None:
+            result.append((None, None))
+            continue
+        payload, path, file_code, tag = plan
+        tag = tag if defaults[_output_name(payload, path, output_dir, file_code)] > 1 else None
+        output = _output_name(payload, path, output_dir, file_code, tag)
+        label = f"{item[0]}:{item[1]}" if isinstance(item, tuple) else item
+        result.append((tag, owners.get(output)))
+        owners.setdefault(output, label)
+    return result
+
+def decode_file(path, output_dir, code=None, processes=1, framed=False, entry=None, tag=None):
+    """Giải mã một file tín hiệu (.lcs, bản ghi `entry` của kho .lca hoặc .txt kiểu cũ).
+
+    Trả về (file kết quả, số ký hiệu lỗi, các cảnh báo). Ảnh được giải mã
+    thẳng vào mảng pixel rồi kiểm tra CRC32; với `processes` > 1, tín hiệu
+    được chia khối và giải mã trên nhiều tiến trình. Tín hiệu đã đóng khung
+    (ghi trong header, hoặc `framed` với file .txt) được bỏ khung, khung hỏng
+    được báo trong cảnh báo. `tag` (nếu có) được thêm vào tên file kết quả.
+    """
+    signal_file = None
+    if entry is not None:
+        archive = Archive(path)
+        if entry not in archive:
+            raise ValueError(f"Kho không có bản ghi {entry!r}.")
+        signal_file = archive[entry]
+    elif is_signal_file(path):
+        signal_file = open_signal(path)
+    if signal_file is not None:
+        payload = signal_file.payload or {}
+        if code is not None and code != signal_file.code:
+            raise ValueError(f"File được mã hóa bằng {signal_file.code}, không phải {code}.")
+        output = _output_name(payload, path, output_dir, signal_file.code, tag)
+        if payload.get("kind") == "image":
+            pixels, errors, warnings = profiling.call("decode", decode_pixels, signal_file, processes)
+            with profiling.stage("save_image", pixels.nbytes) as stage:
+                save_image(pixels, payload, output)
+                stage.record(bytes_out=os.path.getsize(output))
+            return output, errors, warnings
+        warnings = []
+        damaged = ()
+        if "framing" in payload:
+            bits, invalid = profiling.call("decode", parallel.decode, signal_file, signal_file.code, processes)
+            if "scrambler" in payload:
+                bits = profiling.call("descramble", scrambler.descramble, bits, payload["scrambler"])
+            report = profiling.call("deframe", deframe_signal, signal_file, signal_file.code, bits, processes,
+                                    payload.get("scrambler"))
+            data, errors, damaged = report.data, int(np.count_nonzero(invalid)), report.damaged
+            if report.damaged or not report.frames:
+                warnings.append(describe(report))
+        elif processes > 1 or "compression" in payload or "scrambler" in payload:
+            bits, invalid = profiling.call("decode", parallel.decode, signal_file, signal_file.code, processes)
+            if "scrambler" in payload:
+                bits = profiling.call("descramble", scrambler.descramble, bits, payload["scrambler"])
+            data, errors = bits.memoryview(), int(np.count_nonzero(invalid))
+        else:
+            with profiling.stage("decode", profiling.nbytes(signal_file)) as stage:
+                with open(output, 'wb') as sink:
+                    errors = decode_stream(signal_file, sink)
+                stage.record(bytes_out=os.path.getsize(output))
+            return output, errors, warnings
+        if "block_size" in payload.get("compression", {}):
+            data, lost = profiling.call("decompress", compression.decompress_blocks, data, payload["compression"],
+                                        damaged)
+            if lost:
+                warnings.append(compression.describe_lost(lost, len(data)))
+        elif "compression" in payload:
+            data = profiling.call("decompress", compression.decompress, data, payload["compression"])
+        with profiling.stage("save", profiling.nbytes(data)) as stage:
+            with open(output, 'wb') as sink:
+                sink.write(data)
+            stage.record(bytes_out=os.path.getsize(output))
+        return output, errors, warnings
+    if code is None:
+        raise ValueError("File .txt kiểu cũ không ghi mã đường truyền, hãy chỉ định --code.")
+    levels = read_text_signal(path)
+    decoder = StreamDecoder(code)
+    results = [decoder.feed(levels), decoder.flush()]
+    bits = np.concatenate([result.bits.unpack() for result in results])
+    errors = sum(int(np.count_nonzero(result.invalid)) for result in results)
+    output = _output_name(None, path, output_dir, code, tag)
+    warnings = []
+    if framed:
+        report = deframe_signal(levels, code, BitBuffer.from_bits(bits), processes)
+        data = report.data
+        if report.damaged or not report.frames:
+            warnings.append(describe(report))
+    else:
+        data = np.packbits(bits)
+    with open(output, 'wb') as sink:
+        sink.write(data)
+    return output, errors, warnings
+
+def list_archive(path):
+    """Các dòng mô tả từng bản ghi trong kho .lca (chỉ đọc mục lục)."""
+    lines = []
+    for name, entry in Archive(path).entries.items():
+        payload = entry.get("payload") or {}
+        # Kích thước ảnh rộng x cao (bản ghi cũ chỉ có shape của mảng pixel)
+        size = payload.get("size") or payload.get("shape")
+        shape = "x".join(map(str, size)) if size else payload.get("kind", "")
+        mode = payload.get("mode", "")
+        lines.append(f"{name:30} {entry['code'] or '':15} {shape:>15} {mode:5} {entry['length']:>14} ký hiệu")
+    return lines
+
+# === VẼ (TÙY CHỌN) ===
+def plot_preview(path, start=0, stop=None):
+    """Lưu ảnh PNG đoạn [start, stop) của file tín hiệu (mặc định toàn bộ, giảm mẫu min/max).
+
+    Vẽ bằng Renderer dùng chung của tiến trình (không qua pyplot); file .lcs
+    được đọc lười qua memmap.
+    """
+    return renderer().render(path, path + '.png', os.path.basename(path), start, stop)
+
+def _window(text):
+    """'START:STOP' → (start, stop); bỏ trống một đầu nghĩa là từ đầu/tới cuối."""
+    start, _, stop = text.partition(':')
+    return int(start or 0), int(stop) if stop else None
+
+def _snr_values(text):
+    """'0:12:2' → [0, 2, ..., 12]; '3,6.5' → [3, 6.5]."""
+    if ':' not in text:
+        return [float(value) for value in text.split(',')]
+    start, stop, step = (float(value) for value in text.split(':'))
+    return [float(value) for value in np.arange(start, stop + step / 2, step)]
+
+def _size(text):
+    """'WxH' (inch) → (W, H)."""
+    width, _, height = text.lower().partition('x')
+    return float(width), float(height)
+
+# === CHƯƠNG TRÌNH CHÍNH ===
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m linecode',
+                                     description="Mã hóa/giải mã đường truyền hàng loạt, không cần giao diện.")
+    parser.add_argument('--profile', metavar='PREFIX',
+                        help="đo từng khâu (thời gian, CPU, byte vào/ra, bộ nhớ đỉnh), ghi PREFIX.json "
+                             "và PREFIX.trace.json (Chrome trace)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    encode = commands.add_parser('encode', help="mã hóa file ảnh hoặc file dữ liệu")
+    encode.add_argument('inputs', nargs='+', help="các file hoặc thư mục cần mã hóa")
+    encode.add_argument('-c', '--code', required=True, choices=registry.names(), help="mã đường truyền")
+    encode.add_argument('-o', '--output-dir', default='.', help="thư mục ghi kết quả")
+    encode.add_argument('-f', '--format', choices=['lcs', 'txt'], default='lcs', help="định dạng file tín hiệu")
+    encode.add_argument('-k', '--kind', choices=['auto', 'image', 'raw'], default='auto',
+                        help="coi file vào là ảnh hay dữ liệu thô (mặc định đoán theo đuôi file)")
+    encode.add_argument('--frame', type=int, nargs='?', const=FRAME_PAYLOAD, metavar='BYTES',
+                        help="đóng khung dữ liệu (từ đồng bộ, độ dài, CRC32) với BYTES byte mỗi khung "
+                             f"(mặc định {FRAME_PAYLOAD}) để tín hiệu hỏng một đoạn chỉ mất các khung bị ảnh hưởng")
+    encode.add_argument('-z', '--compress', choices=compression.METHODS,
+                        help="nén dữ liệu trước khi mã hóa (delta: lọc hiệu theo pixel; rle, huffman, zlib, lzma)")
+    encode.add_argument('-s', '--scramble', choices=scrambler.SCRAMBLERS,
+                        help="xáo trộn bit ngay trước khi mã hóa (additive: x^11+x^9+1; "
+                             "multiplicative: tự đồng bộ x^23+x^18+1)")
+    encode.add_argument('-a', '--archive', metavar='PATH',
+                        help="ghi mọi file vào một kho .lca (ghi thêm nếu kho đã có) thay vì mỗi file một .lcs")
+    encode.add_argument('--plot', action='store_true', help="lưu thêm ảnh PNG của tín hiệu")
+    encode.add_argument('--plot-window', type=_window, default=(0, None), metavar='START:STOP',
+                        help="đoạn ký hiệu cần vẽ với --plot (mặc định toàn bộ tín hiệu)")
+
+    decode = commands.add_parser('decode', help="giải mã file tín hiệu .lcs hoặc .txt kiểu cũ")
+    decode.add_argument('inputs', nargs='+', help="các file tín hiệu hoặc thư mục chứa chúng")
+    decode.add_argument('-c', '--code', choices=registry.names(),
+                        help="mã đường truyền (bắt buộc với file .txt kiểu cũ)")
+    decode.add_argument('-o', '--output-dir', default='.', help="thư mục ghi kết quả")
+    decode.add_argument('-e', '--entry', action='append',
+                        help="chỉ giải mã bản ghi này của kho .lca (lặp lại để chọn nhiều bản ghi)")
+    decode.add_argument('--framed', action='store_true',
+                        help="tín hiệu đã đóng khung (chỉ cần với file .txt; file .lcs tự ghi trong header)")
+
+    listing = commands.add_parser('list', help="liệt kê các bản ghi trong kho .lca")
+    listing.add_argument('inputs', nargs='+', help="các kho .lca")
+
+    compacting = commands.add_parser('compact', help="ghi lại kho .lca, bỏ các bản ghi đã bị thay thế và mục lục cũ")
+    compacting.add_argument('inputs', nargs='+', help="các kho .lca")
+
+    render = commands.add_parser('render', help="xuất ảnh PNG/SVG của file tín hiệu, không cần màn hình")
+    render.add_argument('inputs', nargs='+', help="các file tín hiệu, kho .lca (mọi bản ghi) hoặc thư mục chứa chúng")
+    render.add_argument('-o', '--output-dir', default='.', help="thư mục ghi ảnh")
+    render.add_argument('-f', '--format', choices=['png', 'svg'], default='png', help="định dạng ảnh")
+    render.add_argument('--size', type=_size, default=(12, 4), metavar='WxH', help="kích thước ảnh (inch)")
+    render.add_argument('--dpi', type=int, default=100, help="số điểm ảnh mỗi inch")
+    render.add_argument('--window', type=_window, default=(0, None), metavar='START:STOP',
+                        help="đoạn ký hiệu cần vẽ (mặc định toàn bộ tín hiệu)")
+
+    ber = commands.add_parser('ber', help="đo tỉ lệ lỗi bit qua kênh có nhiễu theo SNR")
+    ber.add_argument('-c', '--codes', type=lambda text: text.split(','), default=registry.names(),
+                     help="các mã cần đo, phân tách bằng dấu phẩy (mặc định tất cả)")
+    ber.add_argument('--snr', type=_snr_values, default=_snr_values('0:12:2'), metavar='START:STOP:STEP',
+                     help="các giá trị SNR (dB): START:STOP:STEP (gồm cả STOP) hoặc danh sách a,b,c")
+    ber.add_argument('-n', '--bits', type=lambda text: int(float(text)), default=10 ** 6,
+                     help="số bit mỗi điểm SNR, ví dụ 1e8")
+    ber.add_argument('--oversample', type=int, default=1, help="số mẫu mỗi ký hiệu (bên thu tích phân từng ký hiệu)")
+    ber.add_argument('--pulse', choices=PULSES, default='rect', help="dạng xung của mỗi ký hiệu")
+    ber.add_argument('--attenuation', type=float, default=1.0, help="hệ số suy hao biên độ")
+    ber.add_argument('--wander', type=float, default=0.0, help="biên độ trôi đường nền")
+    ber.add_argument('--wander-period', type=float, default=10000, help="chu kỳ trôi đường nền (ký hiệu)")
+    ber.add_argument('--seed', type=int, default=0, help="seed của dữ liệu và nhiễu")
+    ber.add_argument('--json', action='store_true', help="in kết quả dạng JSON")
+    analyze = commands.add_parser('analyze', help="thống kê tín hiệu (DC, đoạn đứng yên, chuyển mức, PSD Welch)")
+    analyze.add_argument('inputs', nargs='+', help="file tín hiệu .lcs/.lca, hoặc file dữ liệu để so sánh các mã")
+    analyze.add_argument('-c', '--codes', type=lambda text: text.split(','), default=None,
+                         help="các mã dùng để mã hóa file dữ liệu, phân tách bằng dấu phẩy (mặc định tất cả)")
+    analyze.add_argument('-k', '--kind', choices=['auto', 'signal', 'payload'], default='auto',
+                         help="coi file vào là tín hiệu hay dữ liệu (mặc định: .lcs/.lca là tín hiệu; "
+                              "dùng signal cho file .txt kiểu cũ)")
+    analyze.add_argument('--nperseg', type=int, default=analysis.NPERSEG, help="số ký hiệu mỗi đoạn Welch")
+    analyze.add_argument('--json', action='store_true', help="in kết quả dạng JSON (kèm PSD)")
+    link = commands.add_parser('transport', help="truyền tín hiệu qua socket TCP/Unix giữa hai tiến trình")
+    modes = link.add_subparsers(dest='mode', required=True)
+    serve = modes.add_parser('serve', help="bên nhận: giải mã các luồng gửi tới ADDRESS")
+    serve.add_argument('address', help="host:port hoặc unix:/đường/dẫn")
+    serve.add_argument('-o', '--output', help="file ghi dữ liệu giải mã (mặc định bỏ đi)")
+    serve.add_argument('-n', '--connections', type=int, default=None, help="dừng sau N kết nối")
+    send = modes.add_parser('send', help="bên gửi: mã hóa file và gửi tới ADDRESS")
+    send.add_argument('address', help="host:port hoặc unix:/đường/dẫn")
+    loop = modes.add_parser('loopback', help="chạy bên nhận trong tiến trình riêng rồi gửi file tới nó")
+    loop.add_argument('-o', '--output', help="file ghi dữ liệu giải mã (mặc định bỏ đi)")
+    loop.add_argument('--address', default=None, help="địa chỉ dùng (mặc định Unix socket tạm)")
+    for mode in (send, loop):
+        mode.add_argument('input', help="file dữ liệu cần truyền")
+        mode.add_argument('-c', '--code', required=True, choices=registry.names(), help="mã đường truyền")
+        mode.add_argument('--impair', metavar='SPEC',
+                          help="khâu suy giảm giữa hai đầu: flip:TỈ_LỆ (lỗi ký hiệu) hoặc awgn:SNR_DB")
+        mode.add_argument('--seed', type=int, default=None, help="seed của khâu suy giảm")
+        mode.add_argument('--chunk-size', type=int, default=None,
+                          help="số byte dữ liệu mỗi khối (mặc định transport.CHUNK_SIZE)")
+        mode.add_argument('--batch', type=int, default=None,
+                          help="số byte ký hiệu gom lại mỗi lần ghi socket (mặc định transport.BATCH_SIZE)")
+        mode.add_argument('--json', action='store_true', help="in báo cáo dạng JSON")
+    for command in (encode, decode, render, ber):
+        command.add_argument('-j', '--jobs', type=int, default=1,
+                             help="số tiến trình song song (nhiều file: mỗi tiến trình một file)")
+    return parser
+
+def _expand(inputs, command, entries=None):
+    """Thay mỗi thư mục bằng các file trong đó (khi giải mã chỉ lấy file .lcs/.lca/.txt).
+
+    Khi giải mã hoặc vẽ, mỗi kho .lca được thay bằng các cặp (kho, tên bản
+    ghi): mọi bản ghi, hoặc đúng các tên trong `entries` nếu có (tên không
+    có trong kho sẽ được báo lỗi khi giải mã).
+    """
+    paths = []
+    for path in inputs:
+        if not os.path.isdir(path):
+            paths.append(path)
+            continue
+        for name in sorted(os.listdir(path)):
+            full = os.path.join(path, name)
+            if os.path.isfile(full) and (command == 'encode' or name.endswith(('.lcs', '.lca', '.txt'))):
+                paths.append(full)
+    if command not in ('decode', 'render'):
+        return paths
+    items = []
+    for path in paths:
+        if os.path.isfile(path) and is_archive(path):
+            items.extend((path, name) for name in (Archive(path) if entries is None else entries))
+        else:
+            items.append(path)
+    return items
+
+def _process(task):
+    """Xử lý một file (hoặc bản ghi (kho, tên) khi giải mã), trả về (thành công?, các dòng thông báo).
+
+    Chạy được trong tiến trình con; `archive` (ArchiveWriter) chỉ dùng khi mã hóa tuần tự vào kho.
+    """
+    args, item, processes, archive, plan = task
+    path, entry = item if isinstance(item, tuple) else (item, None)
+    label = path if entry is None else f"{path}:{entry}"
+    try:
+        if args.command == 'encode':
+            with profiling.stage(f"encode_file {label}"):
+                output, notes = encode_file(path, args.code, args.output_dir, args.format, args.kind, processes,
+                                            args.frame, archive, args.compress, args.scramble)
+            lines = [f"✅ {path} → {output}"] + [f"🗜️ {note}" for note in notes]
+            if args.plot:
+                with profiling.stage("plot"):
+                    lines.append(f"📈 {plot_preview(output, *args.plot_window)}")
+        else:
+            tag, clash = plan
+            if clash is not None:
+                raise ValueError(f"tên file kết quả trùng với {clash}, bỏ qua để không ghi đè")
+            with profiling.stage(f"decode_file {label}"):
+                output, errors, warnings = decode_file(path, args.output_dir, args.code, processes, args.framed,
+                                                       entry, tag)
+            note = f" ({errors} ký hiệu lỗi)" if errors else ""
+            lines = [f"✅ {label} → {output}{note}"] + [f"⚠️ {warning}" for warning in warnings]
+        return True, lines
+    except (OSError, ValueError) as e:
+        return False, [f"❌ {label}: {e}"]
+
+def _process_profiled(task):
+    """_process trong tiến trình con khi đang đo: trả về kèm các khâu đã đo để tiến trình chính gộp lại."""
+    return _process(task), profiling.take()
+
+def run_ber(args):
+    """In bảng (hoặc JSON) BER của từng mã tại từng SNR."""
+    channel = {"attenuation": args.attenuation, "wander": args.wander, "wander_period": args.wander_period,
+               "samples_per_symbol": args.oversample, "pulse": args.pulse, "seed": args.seed, "processes": args.jobs}
+    results = []
+    for code in args.codes:
+        for result in ber_sweep(code, args.snr, args.bits, **channel):
+            results.append(result)
+            if not args.json:
+                print(f"{code:15} {result['snr_db']:6.1f} dB {result['errors']:>12} / {result['bits']} "
+                      f"BER {result['ber']:.3e}")
+    if args.json:
+        print(json.dumps(results, indent=2))
+    return 0
+
+def _analysis_inputs(path, kind):
+    """Các cặp (nhãn, mã, SignalStats) của một đầu vào lệnh analyze.
+
+    File tín hiệu .lcs (mỗi bản ghi của kho .lca, hoặc file .txt với kind
+    'signal') được phân tích trực tiếp; với file dữ liệu nguồn trả về None
+    (run_analyze mã hóa nó bằng từng mã để so sánh).
+    """
+    if kind == 'signal' or (kind == 'auto' and (is_signal_file(path) or is_archive(path))):
+        if is_archive(path):
+            archive = Archive(path)
+            return [(f"{path}:{name}", archive[name].code, analysis.analyze(archive[name])) for name in archive]
+        signal = open_signal(path) if is_signal_file(path) else read_text_signal(path)
+        return [(path, getattr(signal, 'code', None), analysis.analyze(signal))]
+    return None
+
+def run_analyze(args):
+    """In thống kê (DC, đoạn đứng yên dài nhất, chuyển mức, tần suất mức, PSD) của từng đầu vào."""
+    reports, failures = [], 0
+    for path in args.inputs:
+        try:
+            items = _analysis_inputs(path, args.kind)
+            if items is None:
+                # Dữ liệu nguồn: đọc qua memmap để file lớn không phải nạp hết vào bộ nhớ
+                data = np.memmap(path, dtype=np.uint8, mode='r') if os.path.getsize(path) else b''
+                items = [(path, code, stats) for code, stats
+                         in analysis.compare_codes(data, args.codes, args.nperseg).items()]
+        except (OSError, ValueError) as e:
+            failures += 1
+            print(f"❌ {path}: {e}", file=sys.stderr)
+            continue
+        for label, code, stats in items:
+            if args.json:
+                reports.append({"input": label, **analysis.to_dict(stats, code)})
+            else:
+                print(f"{label}: {analysis.summary(code, stats)}")
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    return 1 if failures else 0
+
+def _transport_summary(report):
+    """Một dòng tóm tắt báo cáo truyền: thông lượng, độ trễ, số ký hiệu lỗi."""
+    latency = report["latency_ms"] or {"p50": 0.0, "p99": 0.0}
+    return (f"{report['code']}: {report['sent_bits']} bit, {report['blocks']} khối, {report['writes']} lần ghi, "
+            f"{report['mbit_per_s'] or 0:.1f} Mbit/s, độ trễ p50 {latency['p50']:.2f} ms / p99 {latency['p99']:.2f} ms, "
+            f"{report['invalid']} ký hiệu lỗi")
+
+def run_transport(args):
+    """Chạy bên nhận (serve), bên gửi (send) hoặc cả hai trên một máy (loopback)."""
+    # asyncio chỉ nạp ở lệnh này: các lệnh khác không phải trả thời gian nạp
+    import asyncio
+    from linecode import transport
+    if args.mode == 'serve':
+        open_sink = (lambda: open(args.output, 'wb')) if args.output else None
+        ready = lambda address: print(f"📡 Đang nhận tại {address}", file=sys.stderr, flush=True)
+        reports = asyncio.run(transport.serve(args.address, open_sink, args.connections, ready))
+        for report in reports:
+            print(json.dumps(report))
+        return 1 if any("error" in report for report in reports) else 0
+    try:
+        impair = transport.impairment(args.impair, args.code, args.seed) if args.impair else None
+        with open(args.input, 'rb') as source:
+            chunk_size = args.chunk_size or transport.CHUNK_SIZE
+            batch = args.batch or transport.BATCH_SIZE
+            chunks = iter(lambda: source.read(chunk_size), b'')
+            if args.mode == 'send':
+                report = asyncio.run(transport.send(args.address, chunks, args.code, impair, batch))
+            else:
+                report = transport.loopback(chunks, args.code, args.address, impair, args.output, batch)
+    except (OSError, ValueError) as e:
+        print(f"❌ {args.input}: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(report, indent=2) if args.json else _transport_summary(report))
+    return 0
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.profile is None:
+        return _run(parser, args)
+    # Cũng bật được bằng biến môi trường LINECODE_PROFILE (khi đó phiên đo giữ tới lúc thoát)
+    owned = not profiling.enabled()
+    profiling.enable()
+    try:
+        with profiling.stage(args.command):
+            return _run(parser, args)
+    finally:
+        paths = profiling.export(args.profile)
+        print(f"⏱️ Đã ghi kết quả đo vào {paths[0]} và {paths[1]}", file=sys.stderr)
+        if owned:
+            profiling.disable()
+
+def _run(parser, args):
+    if args.command == 'transport':
+        return run_transport(args)
+    if args.command == 'ber':
+        return run_ber(args)
+    if args.command == 'analyze':
+        return run_analyze(args)
+    if args.command == 'list':
+        failures = 0
+        for path in args.inputs:
+            try:
+                print(f"{path}:\n" + '\n'.join(list_archive(path)))
+            except (OSError, ValueError) as e:
+                failures += 1
+                print(f"❌ {path}: {e}", file=sys.stderr)
+        return 1 if failures else 0
+    if args.command == 'compact':
+        failures = 0
+        for path in args.inputs:
+            try:
+                print(f"✅ {path}: giải phóng {compact(path)} byte")
+            except (OSError, ValueError) as e:
+                failures += 1
+                print(f"❌ {path}: {e}", file=sys.stderr)
+        return 1 if failures else 0
+    if args.command == 'encode' and args.archive and (args.format == 'txt' or args.plot):
+        parser.error("--archive không dùng chung được với --format txt hoặc --plot")
+    if args.command == 'encode' and args.compress and args.format == 'txt':
+        parser.error("--compress cần định dạng lcs (file .txt không ghi được thông tin nén)")
+    if args.command == 'encode' and args.scramble and args.format == 'txt':
+        parser.error("--scramble cần định dạng lcs (file .txt không ghi được kiểu xáo trộn)")
+    os.makedirs(args.output_dir, exist_ok=True)
+    paths = _expand(args.inputs, args.command, args.entry if args.command == 'decode' else None)
+    # Giải mã: đầu vào trùng tên kết quả được thêm hậu tố (hoặc báo lỗi), không ghi đè nhau kể cả khi chạy song song
+    plans = _plan_outputs(paths, args.output_dir, args.code) if args.command == 'decode' else [None] * len(paths)
+    if args.command == 'encode' and args.archive:
+        # Kho là một file duy nhất: các file được ghi lần lượt, mỗi file chia khối cho các tiến trình
+        os.makedirs(os.path.dirname(args.archive) or '.', exist_ok=True)
+        with ArchiveWriter(args.archive) as archive:
+            results = [_process((args, path, args.jobs, archive, None)) for path in paths]
+    elif args.command == 'render':
+        results = render_batch(paths, args.output_dir, args.format, args.jobs, args.size, args.dpi, *args.window)
+        labels = [f"{item[0]}:{item[1]}" if isinstance(item, tuple) else item for item in paths]
+        results = [(output is not None, [f"✅ {label} → {output}" if output else f"❌ {label}: {error}"])
+                   for label, (output, error) in zip(labels, results)]
+    elif args.jobs > 1 and len(paths) > 1:
+        # Nhiều file: mỗi tiến trình xử lý trọn một file, kết quả in theo thứ tự đầu vào
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            tasks = [(args, path, 1, None, plan) for path, plan in zip(paths, plans)]
+            if profiling.enabled():
+                results = []
+                for result, stages in pool.map(_process_profiled, tasks):
+                    results.append(result)
+                    profiling.absorb(stages)
+            else:
+                results = list(pool.map(_process, tasks))
+    else:
+        # Một file: chia khối file đó cho các tiến trình
+        results = (_process((args, path, args.jobs, None, plan)) for path, plan in zip(paths, plans))
+    failures = 0
+    for ok, lines in results:
+        failures += not ok
+        print('\n'.join(lines), file=sys.stdout if ok else sys.stderr)
+    return 1 if failures else 0
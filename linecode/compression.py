@@ -0,0 +1,236 @@
+"""Nén dữ liệu nguồn trước khi mã hóa đường truyền (tùy chọn).
+
+Mã đường truyền không nén: Unipolar/NRZ-L/AMI tốn một ký hiệu cho mỗi bit
+dữ liệu, nên ảnh chụp màn hình nhiều vùng phẳng tốn kênh truyền như ảnh chụp.
+Chuỗi nén là các bộ lọc rồi một bộ mã, nối bằng '+':
+    delta    lọc hiệu như bộ lọc Sub của PNG: mỗi byte trừ byte cách nó
+             `stride` byte (số byte mỗi pixel), vùng phẳng thành dãy 0
+    rle      PackBits (như TIFF): đoạn lặp ≥ 3 byte thành 2 byte, còn lại giữ nguyên
+    huffman  zlib chỉ dùng mã Huffman (không tìm chuỗi lặp), nhanh
+    zlib     DEFLATE (LZ77 + Huffman)
+    lzma     LZMA (nén mạnh nhất, chậm nhất)
+Thông tin nén (chuỗi nén, stride, số byte trước/sau, thời gian nén) được ghi
+vào payload "compression" của file tín hiệu để bên thu giải nén đúng.
+Khi dữ liệu còn được đóng khung (linecode.framing), compress_blocks nén từng
+khối độc lập (mỗi khối nén là payload của một khung), nên khung hỏng chỉ làm
+mất đúng khối của nó thay vì làm hỏng cả dòng nén; thông tin nén ghi thêm
+block_size và số byte nén của từng khối.
+Ví dụ:
+    data, info = compress(pixels, "delta+zlib", stride=3)
+    signal = encoders.ENCODERS["ami"](data)
+    pixels = decompress(decoded_bytes, info)
+"""
+import lzma
+import time
+import zlib
+
+import numpy as np
+
+from linecode.bitbuffer import as_packed
+
+FILTERS = ('delta',)
+CODERS = ('rle', 'huffman', 'zlib', 'lzma')
+# Các chuỗi nén hay dùng (lựa chọn của dòng lệnh)
+METHODS = ('rle', 'delta+rle', 'huffman', 'zlib', 'delta+zlib', 'lzma', 'delta+lzma')
+# Số byte mỗi khối khi nén RLE (giới hạn bộ nhớ mảng chỉ số)
+_RLE_CHUNK = 1 << 20
+
+def _stages(method):
+    """Tách chuỗi nén thành (các bộ lọc, bộ mã)."""
+    stages = method.split('+')
+    filters, coder = stages[:-1], stages[-1]
+    if coder not in CODERS or any(name not in FILTERS for name in filters):
+        raise ValueError(f"Không hỗ trợ kiểu nén {method!r} (bộ lọc: {', '.join(FILTERS)}; "
+                         f"bộ mã: {', '.join(CODERS)}).")
+    return filters, coder
+
+# === BỘ LỌC HIỆU ===
+def _delta(data, stride):
+    """Mỗi byte trừ byte cách nó `stride` byte (modulo 256); `stride` byte đầu giữ nguyên."""
+    out = data.copy()
+    out[stride:] -= data[:-stride]
+    return out
+
+def _undelta(data, stride):
+    """Ngược của _delta: cộng dồn (modulo 256) theo từng làn cách nhau `stride` byte."""
+    size = data.size
+    lanes = np.zeros(-(-size // stride) * stride, dtype=np.uint8)
+    lanes[:size] = data
+    lanes = lanes.reshape(-1, stride)
+    np.cumsum(lanes, axis=0, dtype=np.uint8, out=lanes)
+    return lanes.reshape(-1)[:size]
+
+# === RLE (PACKBITS) ===
+def _rle_chunk(data):
+    """Nén PackBits một khối byte bằng phép toán mảng.
+
+    Header h < 128: h + 1 byte nguyên văn theo sau; h > 128: byte kế tiếp lặp
+    257 - h lần. Đoạn lặp ≥ 3 byte thành gói lặp, các đoạn ngắn liền nhau gộp
+    thành gói nguyên văn; mọi gói dài tối đa 128 byte.
+    """
+    size = data.size
+    starts = np.concatenate(([0], np.flatnonzero(data[1:] != data[:-1]) + 1))
+    lengths = np.diff(np.append(starts, size))
+    repeat = lengths >= 3
+    # Mỗi đoạn lặp là một nhóm; các đoạn ngắn liền nhau chung một nhóm
+    first = repeat.copy()
+    first[1:] |= repeat[:-1]
+    first[0] = True
+    group = np.flatnonzero(first)
+    group_start = starts[group]
+    group_length = np.diff(np.append(group_start, size))
+    # Chia nhóm thành các gói tối đa 128 byte
+    pieces = -(-group_length // 128)
+    owner = np.repeat(np.arange(group.size), pieces)
+    piece = np.arange(owner.size) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    start = group_start[owner] + piece * 128
+    length = np.minimum(group_length[owner] - piece * 128, 128)
+    run = repeat[group][owner] & (length > 1)
+    body = np.where(run, 1, length)
+    position = np.cumsum(body + 1) - (body + 1)
+    out = np.empty(int(body.sum()) + body.size, dtype=np.uint8)
+    out[position] = np.where(run, 257 - length, length - 1)
+    out[position[run] + 1] = data[start[run]]
+    literal = length[~run]
+    offset = np.arange(int(literal.sum())) - np.repeat(np.cumsum(literal) - literal, literal)
+    out[np.repeat(position[~run] + 1, literal) + offset] = data[np.repeat(start[~run], literal) + offset]
+    return out
+
+def _rle_encode(data):
+    return b''.join(_rle_chunk(data[i:i + _RLE_CHUNK]).tobytes() for i in range(0, data.size, _RLE_CHUNK))
+
+def _rle_decode(data, size):
+    """Giải nén PackBits; chỉ duyệt header từng gói, phần thân chép theo lát cắt."""
+    source = memoryview(data)
+    out = bytearray(size)
+    i = o = 0
+    end = len(source)
+    while i < end:
+        header = source[i]
+        if header < 128:
+            count = header + 1
+            out[o:o + count] = source[i + 1:i + 1 + count]
+            i += count + 1
+        elif header > 128:
+            count = 257 - header
+            out[o:o + count] = bytes((source[i + 1],)) * count
+            i += 2
+        else:
+            i += 1
+            continue
+        o += count
+    if o != size:
+        raise ValueError(f"Dữ liệu RLE giải nén được {o} byte, cần {size} byte.")
+    return out
+
+# === NÉN / GIẢI NÉN ===
+def compress(data, method, stride=1):
+    """Nén `data` (bytes-like hoặc BitBuffer trọn byte) bằng chuỗi nén `method`, trả về (bytes, thông tin).
+
+    `stride` là số byte mỗi pixel cho bộ lọc delta (1 với văn bản/dữ liệu
+    thô). Thông tin là dict ghi vào payload "compression": method, stride,
+    size, compressed, seconds.
+    """
+    packed, nbits = as_packed(data)
+    if nbits % 8:
+        raise ValueError(f"Chỉ nén được dữ liệu trọn byte ({nbits} bit).")
+    filters, coder = _stages(method)
+    started = time.perf_counter()
+    packed = packed[:nbits // 8]
+    for name in filters:
+        packed = _delta(packed, stride)
+    if coder == 'rle':
+        result = _rle_encode(packed)
+    elif coder == 'huffman':
+        encoder = zlib.compressobj(9, zlib.DEFLATED, 15, 9, zlib.Z_HUFFMAN_ONLY)
+        result = encoder.compress(packed) + encoder.flush()
+    elif coder == 'zlib':
+        result = zlib.compress(packed)
+    else:
+        result = lzma.compress(packed)
+    info = {"method": method, "stride": stride, "size": int(packed.size), "compressed": len(result),
+            "seconds": time.perf_counter() - started}
+    return result, info
+
+def compress_blocks(data, method, block_size, stride=1):
+    """Nén từng khối `block_size` byte của `data` độc lập, trả về (danh sách bytes nén từng khối, thông tin).
+
+    Thông tin như của compress, thêm block_size và blocks (số byte nén của từng khối).
+    """
+    packed, nbits = as_packed(data)
+    if nbits % 8:
+        raise ValueError(f"Chỉ nén được dữ liệu trọn byte ({nbits} bit).")
+    if block_size < 1:
+        raise ValueError("Kích thước khối nén phải lớn hơn 0.")
+    started = time.perf_counter()
+    view = memoryview(packed[:nbits // 8])
+    blocks = [compress(view[i:i + block_size], method, stride)[0] for i in range(0, len(view), block_size)]
+    info = {"method": method, "stride": stride, "size": len(view),
+            "compressed": sum(len(block) for block in blocks), "seconds": time.perf_counter() - started,
+            "block_size": block_size, "blocks": [len(block) for block in blocks]}
+    return blocks, info
+
+def decompress_blocks(data, info, damaged=()):
+    """Giải nén dữ liệu của compress_blocks, bỏ qua các khối hỏng.
+
+    Khối chạm một vùng [start, stop) trong `damaged` (tọa độ dữ liệu nén, ví
+    dụ DeframeResult.damaged), thiếu dữ liệu hoặc không giải nén được thì để
+    0. Trả về (mảng uint8 dài info["size"], các vùng [start, stop) của dữ liệu
+    gốc bị mất).
+    """
+    size, block_size = info["size"], info["block_size"]
+    out = np.zeros(size, dtype=np.uint8)
+    data = memoryview(data)
+    lost = []
+    start = 0
+    for index, length in enumerate(info["blocks"]):
+        end = start + length
+        first, last = index * block_size, min((index + 1) * block_size, size)
+        part = {"method": info["method"], "stride": info["stride"], "size": last - first, "compressed": length}
+        try:
+            if end > len(data) or any(a < end and start < b for a, b in damaged):
+                raise ValueError
+            out[first:last] = decompress(data[start:end], part)
+        except ValueError:
+            if lost and lost[-1][1] == first:
+                lost[-1] = (lost[-1][0], last)
+            else:
+                lost.append((first, last))
+        start = end
+    return out, lost
+
+def decompress(data, info):
+    """Giải nén `data` theo thông tin nén `info` (do compress trả về), trả về mảng uint8 dài đúng info["size"]."""
+    if "block_size" in info:
+        out, lost = decompress_blocks(data, info)
+        if lost:
+            raise ValueError(f"Không giải nén được {sum(b - a for a, b in lost)} / {info['size']} byte {info['method']}.")
+        return out
+    filters, coder = _stages(info["method"])
+    size = info["size"]
+    data = memoryview(data)[:info["compressed"]]
+    try:
+        if coder == 'rle':
+            result = _rle_decode(data, size)
+        elif coder in ('huffman', 'zlib'):
+            result = zlib.decompress(data)
+        else:
+            result = lzma.decompress(data)
+    except (zlib.error, lzma.LZMAError, IndexError) as e:
+        raise ValueError(f"Không giải nén được dữ liệu {info['method']}: {e}") from None
+    if len(result) != size:
+        raise ValueError(f"Dữ liệu {info['method']} giải nén được {len(result)} byte, cần {size} byte.")
+    out = np.frombuffer(result, dtype=np.uint8)
+    for name in reversed(filters):
+        out = _undelta(out, info["stride"])
+    return out
+
+def describe_lost(lost, size):
+    """Mô tả ngắn các vùng dữ liệu gốc mất do khối nén hỏng (kết quả của decompress_blocks)."""
+    return f"{sum(stop - start for start, stop in lost)} / {size} byte sau giải nén bị mất (các khối nén hỏng để 0)"
+
+def summary(info):
+    """Mô tả ngắn tỉ lệ nén và tốc độ nén, ví dụ 'delta+zlib: 3000000 → 150000 byte (x20.0, 85.3 MB/s)'."""
+    ratio = info["size"] / info["compressed"] if info["compressed"] else float('inf')
+    speed = info["size"] / info["seconds"] / 1e6 if info["seconds"] else float('inf')
+    return f"{info['method']}: {info['size']} → {info['compressed']} byte (x{ratio:.1f}, {speed:.1f} MB/s)"
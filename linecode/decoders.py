@@ -0,0 +1,166 @@
+from collections import namedtuple
+
+import numpy as np
+
+from linecode import two_b_one_q as _2b1q
+from linecode.bitbuffer import BitBuffer, prefix_parity
+
+# Kết quả giải mã: `bits` là BitBuffer (bit đóng gói), `invalid` là mặt nạ bool
+# đánh dấu các ký hiệu (mỗi chu kỳ bit, hoặc mỗi mức với 2B1Q) không hợp lệ.
+# Ký hiệu lỗi vẫn chiếm chỗ trong `bits` để các bit sau không bị lệch.
+DecodeResult = namedtuple('DecodeResult', ['bits', 'invalid'])
+
+# Giá trị điền vào nửa chu kỳ còn thiếu khi tín hiệu 2 mẫu/bit có độ dài lẻ
+_MISSING = np.int8(127)
+
+# === CHUẨN HÓA TÍN HIỆU VÀO ===
+def as_levels(signal):
+    """Chuyển tín hiệu thành mảng int8 một chiều (các mức ngoài int8 bị chặn)."""
+    levels = np.asarray(signal)
+    if levels.dtype != np.int8:
+        levels = np.clip(levels, -128, 127).astype(np.int8)
+    return levels.ravel()
+
+def _pair_words(signal):
+    """Tín hiệu 2 mẫu/bit → (các mức, mảng từ 16 bit mỗi chu kỳ bit, nửa đầu ở byte thấp)."""
+    levels = as_levels(signal)
+    if levels.size % 2:
+        levels = np.append(levels, _MISSING)
+    return levels, levels.view('<u2')
+
+def _word(first, second):
+    """Từ 16 bit của cặp mức (nửa đầu, nửa sau)."""
+    return np.uint16((first & 0xFF) | (second & 0xFF) << 8)
+
+def _match_pairs(words, one, zero):
+    """Tra ngược cặp mức: bit 1 ở từ `one`, bit 0 ở từ `zero`, từ khác là lỗi.
+
+    Trả về (mặt nạ bit, mặt nạ lỗi); bit ở vị trí lỗi để 0, hàm gọi tự tính lại.
+    """
+    bits = words == _word(*one)
+    invalid = words != _word(*zero)
+    invalid &= ~bits
+    return bits, invalid
+
+def _not_polar(levels):
+    """Mặt nạ các mức khác ±1."""
+    return np.abs(levels) != 1
+
+def _bipolar_violations(levels, previous=-1):
+    """Mặt nạ vi phạm luân phiên cực tính (xung cùng dấu với xung khác 0 trước đó).
+
+    `previous` là cực tính xung trước khối (mặc định -1: xung đầu phải là +1).
+    Mức ngoài {-1, 0, +1} bị đánh dấu và không được tính là xung khi xét
+    luân phiên.
+    Kiểm tra nhanh trên bit đóng gói: khi luân phiên đúng, các xung +1 nằm
+    đúng ở vị trí có số xung tích lũy lẻ. Chỉ khi có lỗi mới tìm vị trí xung.
+    """
+    invalid = np.abs(levels) > 1
+    positive = np.packbits(levels == 1)
+    pulses = positive | np.packbits(levels == -1)
+    odd = prefix_parity(pulses)
+    if previous > 0:
+        odd = ~odd
+    if not invalid.any() and not np.any(positive ^ (pulses & odd)):
+        return invalid
+    positions = np.flatnonzero(np.abs(levels) == 1)
+    polarity = levels[positions]
+    repeated = np.empty(polarity.size, dtype=bool)
+    repeated[:1] = polarity[:1] == previous
+    np.equal(polarity[1:], polarity[:-1], out=repeated[1:])
+    invalid[positions[repeated]] = True
+    return invalid
+
+def _as_bits(mask):
+    """Mặt nạ bool → BitBuffer đóng gói."""
+    return BitBuffer.from_bits(mask)
+
+# === GIẢI MÃ CÁC KIỂU MÃ HÓA ===
+def unipolar(signal):
+    """Unipolar: 1 → 1, 0 → 0"""
+    levels = as_levels(signal)
+    return DecodeResult(_as_bits(levels == 1), levels.view(np.uint8) > 1)
+
+def nrz_l(signal):
+    """NRZ-L: -1 → 1, +1 → 0"""
+    levels = as_levels(signal)
+    return DecodeResult(_as_bits(levels == -1), _not_polar(levels))
+
+def nrz_i(signal, previous=1):
+    """NRZ-I: bit 1 khi mức khác mức trước đó (`previous`, mặc định +1)"""
+    levels = as_levels(signal)
+    changed = np.empty(levels.size, dtype=bool)
+    changed[:1] = levels[:1] != previous
+    np.not_equal(levels[1:], levels[:-1], out=changed[1:])
+    return DecodeResult(_as_bits(changed), _not_polar(levels))
+
+def rz(signal):
+    """RZ: (+1, 0) → 1, (-1, 0) → 0"""
+    levels, words = _pair_words(signal)
+    bits, invalid = _match_pairs(words, (1, 0), (-1, 0))
+    if invalid.any():
+        # Chu kỳ lỗi vẫn lấy bit theo nửa đầu như bản cũ
+        errors = np.flatnonzero(invalid)
+        bits[errors] = levels[2 * errors] == 1
+    return DecodeResult(_as_bits(bits), invalid)
+
+def manchester(signal):
+    """Manchester: (-1, +1) → 1, (+1, -1) → 0"""
+    levels, words = _pair_words(signal)
+    bits, invalid = _match_pairs(words, (-1, 1), (1, -1))
+    if invalid.any():
+        errors = np.flatnonzero(invalid)
+        bits[errors] = levels[2 * errors] == -1
+    return DecodeResult(_as_bits(bits), invalid)
+
+def diff_manchester(signal, previous=1):
+    """Differential Manchester: bit 1 khi đầu chu kỳ không đảo so với mức giữa chu kỳ trước
+
+    `previous` là mức nửa sau của chu kỳ bit trước khối (mặc định +1).
+    Với các chu kỳ hợp lệ, bit 1 đúng khi dạng cặp (-1, +1)/(+1, -1) khác
+    dạng của chu kỳ trước; chỉ các bit cạnh chu kỳ lỗi mới tính lại từ mức.
+    """
+    levels, words = _pair_words(signal)
+    rising, invalid = _match_pairs(words, (-1, 1), (1, -1))
+    kept = np.empty(words.size, dtype=bool)
+    kept[:1] = levels[:1] == previous
+    np.not_equal(rising[1:], rising[:-1], out=kept[1:])
+    if invalid.any():
+        # Chu kỳ lỗi và chu kỳ ngay sau nó (trừ chu kỳ đầu, đã so với `previous`)
+        touched = invalid.copy()
+        touched[1:] |= invalid[:-1]
+        touched[0] = False
+        errors = np.flatnonzero(touched)
+        kept[errors] = levels[2 * errors] == levels[2 * errors - 1]
+    return DecodeResult(_as_bits(kept), invalid)
+
+def ami(signal, previous=-1):
+    """AMI: xung ±1 → 1, 0 → 0; xung cùng dấu xung trước (`previous`) bị đánh dấu lỗi"""
+    levels = as_levels(signal)
+    return DecodeResult(_as_bits(levels != 0), _bipolar_violations(levels, previous))
+
+def pseudoternary(signal, previous=-1):
+    """Pseudoternary: 0 → 1, xung ±1 → 0; xung cùng dấu xung trước (`previous`) bị đánh dấu lỗi"""
+    levels = as_levels(signal)
+    return DecodeResult(_as_bits(levels == 0), _bipolar_violations(levels, previous))
+
+def two_b_one_q(signal, previous=1, nbits=None):
+    """2B1Q: mỗi mức cho 2 bit, phụ thuộc vào mức trước đó (`previous`, mặc định +1).
+
+    Dùng bộ mã 2B1Q chung (linecode.two_b_one_q). Mặt nạ lỗi có một phần tử
+    cho mỗi mức, không phải cho mỗi bit; `nbits` bỏ bit đệm của chuỗi bit lẻ.
+    """
+    return DecodeResult(*_2b1q.decode(as_levels(signal), previous, nbits))
+
+# Bảng tra theo tên mã hóa (cùng tên với linecode.encoders.ENCODERS)
+DECODERS = {
+    "unipolar": unipolar,
+    "nrz-l": nrz_l,
+    "nrz-i": nrz_i,
+    "rz": rz,
+    "manchester": manchester,
+    "diffmanchester": diff_manchester,
+    "ami": ami,
+    "pseudoternary": pseudoternary,
+    "2b1q": two_b_one_q,
+}
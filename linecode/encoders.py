@@ -0,0 +1,147 @@
+import numpy as np
+
+from linecode import two_b_one_q as _2b1q
+from linecode.bitbuffer import as_packed, byte_states, gather_bytes
+
+# === BẢNG TRA BYTE → KHỐI KÝ HIỆU ===
+# Mỗi byte vào ứng với một khối 8 (hoặc 16) ký hiệu cố định. Với mã có nhớ,
+# khối còn phụ thuộc một bit trạng thái đầu byte (chẵn lẻ số bit 1 của các byte
+# trước, xem byte_states): trạng thái 1 chỉ là khối của trạng thái 0 đổi dấu,
+# nên bảng có 2×256 dòng, dòng 2·byte + trạng thái. Mã hóa chỉ còn một phép
+# gather (xem gather_bytes).
+_BYTE_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).astype(np.int8)
+# Chẵn lẻ tích lũy (bao gồm bit hiện tại) của số bit 1 / số bit 0 trong byte
+_ONES_PARITY = np.cumsum(_BYTE_BITS, axis=1, dtype=np.int8) & 1
+_ZEROS_PARITY = np.cumsum(1 - _BYTE_BITS, axis=1, dtype=np.int8) & 1
+
+def _interleave(first, second):
+    """Ghép nửa đầu/nửa sau của mỗi chu kỳ bit thành khối 16 ký hiệu."""
+    blocks = np.empty((256, 16), dtype=np.int8)
+    blocks[:, 0::2] = first
+    blocks[:, 1::2] = second
+    return blocks
+
+def _byte_blocks(code):
+    """Khối ký hiệu (256 × 8 hoặc 16) của mỗi byte, tính từ trạng thái mặc định."""
+    bits, ones, zeros = _BYTE_BITS, _ONES_PARITY, _ZEROS_PARITY
+    if code == "nrz-l":
+        return 1 - 2 * bits
+    if code == "nrz-i":
+        return 1 - 2 * ones
+    if code == "rz":
+        return _interleave(2 * bits - 1, 0)
+    if code == "manchester":
+        return _interleave(1 - 2 * bits, 2 * bits - 1)
+    if code == "diffmanchester":
+        return _interleave(2 * ones - 1, 1 - 2 * ones)
+    if code == "ami":
+        return bits * (2 * ones - 1)
+    if code == "pseudoternary":
+        return (1 - bits) * (2 * zeros - 1)
+    raise KeyError(code)
+
+_STATEFUL = {"nrz-i", "diffmanchester", "ami", "pseudoternary"}
+_TABLES = {}
+
+def _byte_table(code):
+    """Bảng tra của mã `code`: mỗi phần tử là cả khối ký hiệu (uint64 hoặc 16 byte)."""
+    table = _TABLES.get(code)
+    if table is None:
+        blocks = _byte_blocks(code).astype(np.int8)
+        if code in _STATEFUL:
+            blocks = np.stack([blocks, -blocks], axis=1).reshape(512, -1)
+        blocks = np.ascontiguousarray(blocks)
+        table = blocks.view(np.uint64 if blocks.shape[1] == 8 else 'V16').ravel()
+        _TABLES[code] = table
+    return table
+
+def _lookup(code, data):
+    """Mã hóa bằng bảng tra: mỗi byte vào → một khối ký hiệu, không bung ra từng bit."""
+    packed, nbits = as_packed(data)
+    packed = packed[:-(-nbits // 8)]
+    states = byte_states(packed) if code in _STATEFUL else None
+    blocks = gather_bytes(_byte_table(code), packed, states)
+    return blocks.view(np.int8)[:nbits * SYMBOLS_PER_BIT[code]]
+
+# === CÁC KIỂU MÃ HÓA ===
+def unipolar(data):
+    """Unipolar: 1 → 1, 0 → 0"""
+    packed, nbits = as_packed(data)
+    return np.unpackbits(packed, count=nbits).view(np.int8)
+
+def nrz_l(data):
+    """NRZ-L: 1 → -1, 0 → +1"""
+    return _lookup("nrz-l", data)
+
+def nrz_i(data):
+    """NRZ-I: đảo mức mỗi khi gặp bit 1, bắt đầu ở mức +1"""
+    return _lookup("nrz-i", data)
+
+def rz(data):
+    """RZ: 1 → (+1, 0), 0 → (-1, 0)"""
+    return _lookup("rz", data)
+
+def manchester(data):
+    """Manchester: 1 → (-1, +1), 0 → (+1, -1)"""
+    return _lookup("manchester", data)
+
+def diff_manchester(data):
+    """Differential Manchester: luôn đảo giữa bit, đảo đầu bit khi gặp bit 0.
+
+    Mức đầu chu kỳ của bit thứ k là +1 khi số bit 1 tính đến bit k là lẻ.
+    """
+    return _lookup("diffmanchester", data)
+
+def ami(data):
+    """AMI: 0 → 0, các bit 1 lần lượt +1, -1, +1, ..."""
+    return _lookup("ami", data)
+
+def pseudoternary(data):
+    """Pseudoternary: 1 → 0, các bit 0 lần lượt +1, -1, +1, ..."""
+    return _lookup("pseudoternary", data)
+
+def two_b_one_q(data):
+    """2B1Q: bit đầu của cặp quyết định đổi dấu, bit sau quyết định biên độ 1/3.
+
+    Dùng bộ mã 2B1Q chung (linecode.two_b_one_q); số bit lẻ được đệm bit 0.
+    """
+    return _2b1q.encode(data)
+
+# Bảng tra các mã cài sẵn theo tên (bảng mã dùng chung, kể cả mã cắm thêm: linecode.registry)
+ENCODERS = {
+    "unipolar": unipolar,
+    "nrz-l": nrz_l,
+    "nrz-i": nrz_i,
+    "rz": rz,
+    "manchester": manchester,
+    "diffmanchester": diff_manchester,
+    "ami": ami,
+    "pseudoternary": pseudoternary,
+    "2b1q": two_b_one_q,
+}
+
+# Tập mức điện áp của từng mã
+ALPHABETS = {
+    "unipolar": (0, 1),
+    "nrz-l": (-1, 1),
+    "nrz-i": (-1, 1),
+    "rz": (-1, 0, 1),
+    "manchester": (-1, 1),
+    "diffmanchester": (-1, 1),
+    "ami": (-1, 0, 1),
+    "pseudoternary": (-1, 0, 1),
+    "2b1q": (-3, -1, 1, 3),
+}
+
+# Số ký hiệu (mẫu) trên mỗi bit dữ liệu
+SYMBOLS_PER_BIT = {
+    "unipolar": 1,
+    "nrz-l": 1,
+    "nrz-i": 1,
+    "rz": 2,
+    "manchester": 2,
+    "diffmanchester": 2,
+    "ami": 1,
+    "pseudoternary": 1,
+    "2b1q": 0.5,
+}
@@ -0,0 +1,69 @@
+"""4B5B + MLT-3 (như 100BASE-TX): mỗi 4 bit dữ liệu thành một từ mã 5 bit, rồi mã hóa MLT-3.
+
+Từ mã 5 bit có ít nhất hai bit 1 và không quá ba bit 0 liền nhau, nên tín
+hiệu MLT-3 không đứng yên lâu dù dữ liệu toàn bit 0. Mã hóa và giải mã tra
+bảng theo từng nửa byte (không duyệt từng bit); từ mã ngoài 16 từ dữ liệu
+(ký hiệu điều khiển, lỗi đường truyền) bị đánh dấu lỗi. Số bit lẻ nhóm 4
+được đệm bit 0.
+Ví dụ:
+    signal = registry.get("4b5b-mlt3").encode(b"Xin chao")
+"""
+import numpy as np
+
+from linecode import mlt3, registry
+from linecode.bitbuffer import BitBuffer, as_packed
+from linecode.decoders import DecodeResult, as_levels
+
+# Từ mã 5 bit của các nửa byte 0x0 - 0xF
+CODES = np.array([0b11110, 0b01001, 0b10100, 0b10101, 0b01010, 0b01011, 0b01110, 0b01111,
+                  0b10010, 0b10011, 0b10110, 0b10111, 0b11010, 0b11011, 0b11100, 0b11101], dtype=np.uint8)
+_CODE_BITS = np.unpackbits(CODES[:, None], axis=1)[:, 3:]
+# Từ mã → nửa byte, -1 với từ mã không phải dữ liệu
+_NIBBLES = np.full(32, -1, dtype=np.int8)
+_NIBBLES[CODES] = np.arange(16)
+# Số bit 1 trong hai từ mã của mỗi byte (tăng pha MLT-3)
+_BYTE_ONES = (_CODE_BITS.sum(axis=1)[np.arange(256) >> 4] + _CODE_BITS.sum(axis=1)[np.arange(256) & 15])
+_WEIGHTS = np.array([16, 8, 4, 2, 1], dtype=np.uint8)
+# Giá trị điền vào từ mã còn thiếu ở cuối tín hiệu (mức không hợp lệ của MLT-3)
+_MISSING = np.int8(127)
+
+def _nibbles(data):
+    """Các nửa byte của dữ liệu (bit cao trước), nửa byte cuối thiếu bit được đệm bit 0."""
+    packed, nbits = as_packed(data)
+    count = -(-nbits // 4)
+    nibbles = np.empty(packed.size * 2, dtype=np.uint8)
+    np.right_shift(packed, 4, out=nibbles[0::2])
+    np.bitwise_and(packed, 15, out=nibbles[1::2])
+    nibbles = nibbles[:count]
+    if nbits % 4:
+        nibbles[-1] &= (0xF0 >> (nbits % 4)) & 0xF
+    return nibbles
+
+def encode(data, phase=0):
+    """Mã hóa 4B5B rồi MLT-3, tiếp nối vị trí `phase` trong chu kỳ MLT-3."""
+    return mlt3.encode_bits(_CODE_BITS[_nibbles(data)].reshape(-1), phase)
+
+def decode(signal, previous=0):
+    """Giải mã MLT-3 rồi tra ngược từ mã 5 bit; mặt nạ lỗi có một phần tử cho mỗi từ mã."""
+    levels = as_levels(signal)
+    if levels.size % 5:
+        levels = np.concatenate((levels, np.full(5 - levels.size % 5, _MISSING)))
+    bits, invalid = mlt3.decode(levels, previous)
+    words = bits.unpack().reshape(-1, 5) @ _WEIGHTS
+    nibbles = _NIBBLES[words]
+    invalid = invalid.reshape(-1, 5).any(axis=1) | (nibbles < 0)
+    nibbles = nibbles.view(np.uint8) & 15
+    if nibbles.size % 2:
+        nibbles = np.append(nibbles, np.uint8(0))
+    packed = (nibbles[0::2] << 4) | nibbles[1::2]
+    return DecodeResult(BitBuffer(packed, invalid.size * 4), invalid)
+
+class CodeWordState(mlt3.CycleState):
+    """Trạng thái MLT-3 của 4B5B: pha tăng theo số bit 1 của các từ mã, không phải của dữ liệu."""
+
+    def ones(self, packed, nbits):
+        if nbits % 8:
+            return int(_CODE_BITS[_nibbles(BitBuffer(packed, nbits))].sum())
+        return int(_BYTE_ONES[packed[:nbits // 8]].sum(dtype=np.uint64))
+
+registry.register(registry.Codec("4b5b-mlt3", encode, decode, 1.25, (-1, 0, 1), CodeWordState(), "4B5B/MLT-3"))
@@ -0,0 +1,305 @@
+"""Đóng khung dữ liệu để giải mã được phần còn lại khi tín hiệu bị hỏng một đoạn.
+
+Dữ liệu (trọn byte) được chia thành các khung độc lập:
+    [PREAMBLE][SYNC 4 byte][header 28 byte][CRC32 header 4 byte][payload]
+Header (big-endian) gồm số thứ tự khung, vị trí payload trong dữ liệu, tổng
+số byte dữ liệu, số byte payload và CRC32 của payload. Header có CRC riêng
+nên độ dài khung vẫn tin được khi payload hỏng: bộ giải mã nhảy thẳng tới
+khung kế tiếp. Khi header hỏng (hoặc bit bị lệch vì ký hiệu bị bỏ/chèn), bộ
+giải mã dò lại từ đồng bộ ở mọi vị trí bit. Với mã nhiều ký hiệu mỗi nhóm bit
+(Manchester, RZ, 4B5B/MLT-3...), một mẫu bị bỏ/chèn làm lệch cả pha ký hiệu:
+phần tín hiệu sau chỗ hỏng được giải mã lại ở từng pha và các khung tìm thấy
+được gộp lại (deframe_signal). Payload được kiểm tra CRC và chép về đúng vị
+trí độc lập với nhau; kết quả cho biết khung nào lỗi.
+Ví dụ:
+    signal = encoders.ENCODERS["ami"](frame(pixels.tobytes()))
+    data, frames, missing, damaged = decode_frames(signal, "ami")
+"""
+import os
+import struct
+import zlib
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from linecode import decoders, parallel, registry, scrambler
+from linecode.bitbuffer import as_packed
+from linecode.signalfile import SignalFile
+
+# === ĐỊNH DẠNG KHUNG ===
+FRAME_PAYLOAD = 1 << 16
+# Chuỗi 0101... giúp bên thu bắt nhịp trước từ đồng bộ
+PREAMBLE = b'\x55\x55'
+# Từ đồng bộ 32 bit (attached sync marker của CCSDS)
+SYNC = bytes.fromhex('1acffc1d')
+_HEADER = struct.Struct('>IQQII')
+_CRC = struct.Struct('>I')
+_HEADER_SIZE = len(SYNC) + _HEADER.size + _CRC.size
+OVERHEAD = len(PREAMBLE) + _HEADER_SIZE
+# Số byte dò từ đồng bộ mỗi lượt
+_SEARCH_BYTES = 1 << 16
+
+# Khung tìm thấy: `bit` là vị trí từ đồng bộ trong chuỗi bit giải mã, `offset`
+# và `length` là vùng payload trong dữ liệu, `ok` là kết quả kiểm tra CRC.
+FrameInfo = namedtuple('FrameInfo', ['sequence', 'bit', 'offset', 'length', 'ok'])
+# Kết quả bỏ khung: `data` là dữ liệu (bytearray, vùng hỏng giữ nguyên bit nhận
+# được hoặc 0 nếu mất cả khung), `missing` là số thứ tự các khung không tìm
+# thấy, `damaged` là các vùng byte [start, stop) không khôi phục được.
+DeframeResult = namedtuple('DeframeResult', ['data', 'frames', 'missing', 'damaged'])
+
+# === ĐÓNG KHUNG ===
+def frames(data, payload_size=FRAME_PAYLOAD):
+    """Chia `data` (bytes-like hoặc BitBuffer trọn byte) thành các khung, trả về iterator bytes từng khung.
+
+    Dữ liệu rỗng vẫn cho một khung (payload rỗng) để bên thu biết tổng độ dài.
+    """
+    packed, nbits = as_packed(data)
+    if nbits % 8:
+        raise ValueError(f"Chỉ đóng khung được dữ liệu trọn byte ({nbits} bit).")
+    if payload_size < 1:
+        raise ValueError("Kích thước payload phải lớn hơn 0.")
+    view = memoryview(packed[:nbits // 8])
+    total = len(view)
+    yield from _framed([view[offset:offset + payload_size] for offset in range(0, total, payload_size)], total)
+
+def block_frames(blocks):
+    """Mỗi khối (bytes-like, ví dụ các khối của compression.compress_blocks) thành một khung, trả về iterator.
+
+    Payload các khung dài khác nhau; vị trí payload là tổng độ dài các khối trước nó.
+    """
+    blocks = [memoryview(block).cast('B') for block in blocks]
+    yield from _framed(blocks, sum(len(block) for block in blocks))
+
+def _framed(payloads, total):
+    """Đóng khung lần lượt các payload (danh sách, tổng `total` byte); danh sách rỗng cho một khung rỗng."""
+    offset = 0
+    for sequence, payload in enumerate(payloads or [b'']):
+        header = SYNC + _HEADER.pack(sequence, offset, total, len(payload), zlib.crc32(payload))
+        yield PREAMBLE + header + _CRC.pack(zlib.crc32(header)) + payload
+        offset += len(payload)
+
+def frame(data, payload_size=FRAME_PAYLOAD):
+    """Đóng khung toàn bộ `data`, trả về bytes."""
+    return b''.join(frames(data, payload_size))
+
+# === TÌM KHUNG ===
+def _read_bytes(packed, bit, count):
+    """`count` byte bắt đầu từ vị trí bit `bit` (trùng biên byte thì không sao chép)."""
+    first, shift = divmod(bit, 8)
+    if not shift:
+        return packed[first:first + count]
+    block = packed[first:first + count + 1]
+    if block.size <= count:
+        block = np.append(block, np.zeros(count + 1 - block.size, dtype=np.uint8))
+    out = block[:count] << np.uint8(shift)
+    out |= block[1:] >> np.uint8(8 - shift)
+    return out
+
+def _header_at(packed, nbits, bit):
+    """Header hợp lệ (từ đồng bộ và CRC đúng) tại vị trí bit `bit`, None nếu không có."""
+    if bit + _HEADER_SIZE * 8 > nbits:
+        return None
+    raw = _read_bytes(packed, bit, _HEADER_SIZE).tobytes()
+    if not raw.startswith(SYNC) or zlib.crc32(raw[:-_CRC.size]) != _CRC.unpack(raw[-_CRC.size:])[0]:
+        return None
+    return _HEADER.unpack(raw[len(SYNC):-_CRC.size])
+
+def _find_header(packed, nbits, start):
+    """Vị trí bit đầu tiên từ `start` có header hợp lệ, None nếu không còn.
+
+    Dò theo từng đoạn _SEARCH_BYTES byte: với mỗi độ lệch bit 0..7, dịch cả
+    đoạn rồi tìm từ đồng bộ bằng bytes.find; ứng viên được xác nhận bằng CRC header.
+    """
+    while start + _HEADER_SIZE * 8 <= nbits:
+        first = start // 8
+        stop = min(first + _SEARCH_BYTES, -(-nbits // 8)) * 8
+        chunk = packed[first:first + _SEARCH_BYTES + len(SYNC) + 1]
+        candidates = []
+        for shift in range(8):
+            if shift:
+                shifted = chunk[:-1] << np.uint8(shift)
+                shifted |= chunk[1:] >> np.uint8(8 - shift)
+            else:
+                shifted = chunk
+            text = shifted.tobytes()
+            index = text.find(SYNC)
+            while index >= 0:
+                bit = (first + index) * 8 + shift
+                if start <= bit < stop:
+                    candidates.append(bit)
+                index = text.find(SYNC, index + 1)
+        for bit in sorted(candidates):
+            if _header_at(packed, nbits, bit) is not None:
+                return bit
+        start = stop
+    return None
+
+def _scan(packed, nbits):
+    """Duyệt chuỗi bit, trả về [(vị trí bit, header)] của các khung tìm thấy.
+
+    Sau mỗi khung, khung kế tiếp được thử ngay ở vị trí dự kiến; chỉ khi
+    không khớp mới dò lại từ đồng bộ, bắt đầu từ cuối header trước đó (bit
+    bị bỏ/chèn trong payload làm khung sau lệch về cả hai phía).
+    """
+    found = []
+    resume = bit = len(PREAMBLE) * 8
+    while True:
+        header = _header_at(packed, nbits, bit)
+        if header is None:
+            bit = _find_header(packed, nbits, resume)
+            if bit is None:
+                return found
+            header = _header_at(packed, nbits, bit)
+        found.append((bit, header))
+        resume = bit + _HEADER_SIZE * 8
+        bit = resume + (header[3] + len(PREAMBLE)) * 8
+
+# === BỎ KHUNG ===
+def _payload(packed, nbits, bit, length):
+    """Payload (tối đa `length` byte còn trong chuỗi bit) của khung có từ đồng bộ tại `bit`."""
+    start = bit + _HEADER_SIZE * 8
+    return _read_bytes(packed, start, max(min(length, (nbits - start) // 8), 0))
+
+def _restore(task):
+    """Chép payload của một khung vào `data`, trả về kết quả kiểm tra CRC; chạy được trong luồng con."""
+    packed, nbits, data, bit, offset, length, crc = task
+    payload = _payload(packed, nbits, bit, length)
+    data[offset:offset + payload.size] = payload
+    return payload.size == length and zlib.crc32(payload) == crc
+
+def _intact(stream, bit, header):
+    packed, nbits, _ = stream
+    payload = _payload(packed, nbits, bit, header[3])
+    return payload.size == header[3] and zlib.crc32(payload) == header[4]
+
+def _gaps(ranges, total):
+    """Các vùng [start, stop) trong [0, total) không nằm trong `ranges`."""
+    gaps = []
+    position = 0
+    for start, stop in sorted(ranges):
+        if start > position:
+            gaps.append((position, start))
+        position = max(position, stop)
+    if position < total:
+        gaps.append((position, total))
+    return gaps
+
+def deframe(bits, processes=None):
+    """Tìm các khung trong chuỗi bit đã giải mã và ghép lại dữ liệu, trả về DeframeResult.
+
+    Payload của các khung được kiểm tra CRC và chép về vị trí của nó trên
+    nhiều luồng (zlib.crc32 và phép dịch numpy nhả GIL, dữ liệu không phải
+    chép sang tiến trình khác). Khung có header lệch với đa số (tổng độ dài
+    khác) bị bỏ qua.
+    """
+    packed, nbits = as_packed(bits)
+    return _assemble(_streams(packed, nbits), processes)
+
+def _streams(packed, nbits, base=0):
+    """Các khung tìm thấy trong một chuỗi bit: [((packed, nbits, base), vị trí bit, header)].
+
+    `base` là vị trí (ước lượng) của chuỗi bit này trong chuỗi bit giải mã đầy đủ.
+    """
+    stream = (packed, nbits, base)
+    return [(stream, bit, header) for bit, header in _scan(packed, nbits)]
+
+def _assemble(found, processes=None):
+    """Ghép dữ liệu từ các khung tìm thấy (có thể thuộc nhiều chuỗi bit), trả về DeframeResult."""
+    if not found:
+        return DeframeResult(bytearray(), [], [], [])
+    total = Counter(header[2] for _, _, header in found).most_common(1)[0][0]
+    found = [item for item in found if item[2][2] == total and item[2][1] + item[2][3] <= total]
+    if len({header[0] for _, _, header in found}) < len(found):
+        # Cùng một khung tìm thấy ở nhiều pha: giữ bản đầu tiên có payload đúng CRC
+        chosen = {}
+        for item in found:
+            sequence = item[2][0]
+            if sequence in chosen and chosen[sequence][1]:
+                continue
+            ok = _intact(*item)
+            if sequence not in chosen or ok:
+                chosen[sequence] = (item, ok)
+        found = sorted((item for item, _ in chosen.values()), key=lambda item: item[2][0])
+    data = bytearray(total)
+    view = np.frombuffer(data, dtype=np.uint8)
+    tasks = [(packed, nbits, view, bit, offset, length, crc)
+             for (packed, nbits, _), bit, (_, offset, _, length, crc) in found]
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(tasks) <= 1:
+        results = [_restore(task) for task in tasks]
+    else:
+        with ThreadPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(_restore, tasks))
+    infos = [FrameInfo(sequence, base + bit, offset, length, ok)
+             for ((_, _, base), bit, (sequence, offset, _, length, _)), ok in zip(found, results)]
+    # Khung cùng kích thước (frames): mọi khung trừ khung cuối dài bằng nhau nên biết được số khung;
+    # khung dài khác nhau (block_frames): chỉ biết được tới khung cuối cùng tìm thấy (và khung kết thúc dữ liệu)
+    sizes = [info.length for info in infos if info.offset + info.length < total]
+    if sizes and all(info.offset == info.sequence * sizes[0] for info in infos):
+        count = -(-total // sizes[0])
+    else:
+        count = max(info.sequence for info in infos) + 1
+        count += not any(info.offset + info.length == total for info in infos)
+    missing = sorted(set(range(count)) - {info.sequence for info in infos})
+    damaged = _gaps([(info.offset, info.offset + info.length) for info in infos if info.ok], total)
+    return DeframeResult(data, infos, missing, damaged)
+
+def describe(report):
+    """Mô tả ngắn các khung lỗi/mất trong DeframeResult, chuỗi rỗng nếu mọi khung đều tốt."""
+    if not report.frames:
+        return "không tìm thấy khung nào"
+    failed = [f"#{info.sequence}" for info in report.frames if not info.ok]
+    notes = []
+    if failed:
+        notes.append(f"{len(failed)} khung sai CRC ({', '.join(failed[:10])}{', ...' if len(failed) > 10 else ''})")
+    if report.missing:
+        missing = [f"#{sequence}" for sequence in report.missing[:10]]
+        notes.append(f"mất {len(report.missing)} khung ({', '.join(missing)}{', ...' if len(report.missing) > 10 else ''})")
+    if report.damaged:
+        lost = sum(stop - start for start, stop in report.damaged)
+        notes.append(f"{lost} / {len(report.data)} byte không khôi phục được")
+    return "; ".join(notes)
+
+def _resume_symbol(report, gap, codec):
+    """Vị trí ký hiệu để giải mã lại: cuối khung tốt cuối cùng trước byte `gap` không khung nào phủ (lùi một ít)."""
+    ends = [info.bit + (_HEADER_SIZE + info.length) * 8 for info in report.frames
+            if info.ok and info.offset + info.length <= gap]
+    if not ends:
+        return 0
+    # Lùi 64 nhóm: ký hiệu chèn trước đó làm vị trí bit ước lượng lệch một chút
+    return max(max(ends) // codec.group_bits - 64, 0) * codec.group_symbols
+
+def deframe_signal(signal, code, bits, processes=None, scramble=None):
+    """Bỏ khung chuỗi bit `bits` đã giải mã (và giải xáo trộn) từ `signal`, trả về DeframeResult.
+
+    Nếu có vùng dữ liệu không khung nào phủ (khung bị mất) và mã có nhiều
+    ký hiệu mỗi nhóm, phần tín hiệu từ sau khung tốt cuối cùng trước chỗ
+    hỏng được giải mã lại ở từng pha ký hiệu 1..group_symbols-1; mỗi đoạn sau một lần mẫu bị bỏ/chèn khớp với
+    đúng một pha nên gộp khung của mọi pha khôi phục được các đoạn đó (chỉ
+    mất khung chứa chỗ hỏng). Xáo trộn cộng (`scramble` 'additive') không
+    tự đồng bộ nên không thử lại được.
+    """
+    packed, nbits = as_packed(bits)
+    found = _streams(packed, nbits)
+    report = _assemble(found, processes)
+    codec = registry.get(code)
+    uncovered = _gaps([(info.offset, info.offset + info.length) for info in report.frames], len(report.data))
+    if codec.group_symbols == 1 or scramble == 'additive' or (report.frames and not uncovered):
+        return report
+    start = _resume_symbol(report, uncovered[0][0] if uncovered else 0, codec)
+    levels = signal.read(start) if isinstance(signal, SignalFile) else decoders.as_levels(signal)[start:]
+    for phase in range(1, codec.group_symbols):
+        tail = parallel.decode(levels[phase:], code, processes).bits
+        if scramble:
+            tail = scrambler.descramble(tail, scramble)
+        base = (start + phase) // codec.group_symbols * codec.group_bits
+        found += _streams(*as_packed(tail), base)
+    return _assemble(found, processes)
+
+def decode_frames(signal, code, processes=None, scramble=None):
+    """Giải mã tín hiệu đã đóng khung (mảng mức hoặc SignalFile) bằng mã `code`, trả về DeframeResult."""
+    bits = parallel.decode(signal, code, processes).bits
+    if scramble:
+        bits = scrambler.descramble(bits, scramble)
+    return deframe_signal(signal, code, bits, processes, scramble)
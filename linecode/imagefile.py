@@ -0,0 +1,166 @@
+"""Ảnh mã hóa tự mô tả: mỗi ảnh là một bản ghi .lcs mang đủ thông tin để giải mã lại.
+
+Header .lcs đã ghi mã đường truyền, tập mức và cách lưu gọn (1-2 bit mỗi ký
+hiệu); payload của ảnh ghi thêm tên, shape, dtype, kích thước, mode PIL, bảng
+màu của ảnh 'P'/'PA', màu trong suốt và CRC32 của các byte pixel. Nhiều ảnh
+có thể nằm chung một kho .lca (linecode.archive). PIL chỉ được nạp khi
+đọc/ghi file ảnh.
+
+Pixel được lấy thẳng từ bộ đệm thô của PIL (img.tobytes()) theo đúng mode:
+ảnh '1' đóng gói 8 pixel/byte, ảnh 'P' là chỉ số bảng màu (đóng gói 1/2/4
+bit nếu bảng màu có tối đa 16 màu, như PNG), kênh 16 bit ('I;16') giữ đủ 2
+byte, 'I'/'F' 4 byte; không mở rộng mọi kênh thành 8 bit.
+Ví dụ:
+    image = load_image("anh.png")
+    write_signal("anh.lcs", encoders.ENCODERS["ami"](image.pixels.tobytes()), "ami",
+                 payload=image_payload(image, "anh.png"))
+    pixels, errors, warnings = decode_pixels(open_signal("anh.lcs"))
+"""
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+from linecode import compression, framing, parallel, scrambler
+
+# Mode ghi lại được không mất mát ra PNG; các mode còn lại trong MODES ghi ra TIFF
+PNG_MODES = frozenset({'1', 'L', 'LA', 'P', 'RGB', 'RGBA', 'I;16', 'I;16B'})
+MODES = PNG_MODES | {'PA', 'CMYK', 'LAB', 'I', 'F', 'I;16L'}
+
+# Số bit mỗi pixel của các rawmode đóng gói nhiều pixel vào một byte
+_PACKED_BITS = {'1': 1, 'P;1': 1, 'P;2': 2, 'P;4': 4}
+
+# Ảnh đã đọc: `pixels` là mảng liền mạch trên bộ đệm thô của PIL theo
+# `rawmode` (thường trùng `mode`), `size` là (rộng, cao), `transparency` lấy từ img.info.
+ImageData = namedtuple('ImageData', ['pixels', 'mode', 'rawmode', 'size', 'palette', 'transparency'])
+
+# === ĐỌC ẢNH VÀ PAYLOAD ===
+def pixel_layout(rawmode, size):
+    """(shape, dtype) của bộ đệm thô img.tobytes('raw', rawmode) với kích thước (rộng, cao).
+
+    Rawmode '1', 'P;1', 'P;2', 'P;4' đóng gói nhiều pixel mỗi byte, bit cao
+    trước, mỗi hàng đệm tới trọn byte.
+    """
+    from PIL import ImageMode
+    width, height = size
+    if rawmode in _PACKED_BITS:
+        return (height, -(-width * _PACKED_BITS[rawmode] // 8)), np.dtype(np.uint8)
+    info = ImageMode.getmode(rawmode)
+    shape = (height, width) if len(info.bands) == 1 else (height, width, len(info.bands))
+    return shape, np.dtype(info.typestr)
+
+def load_image(path):
+    """Đọc ảnh thành ImageData; mode ngoài MODES (HSV, YCbCr...) được đổi sang RGB/RGBA."""
+    from PIL import Image
+    with Image.open(path) as img:
+        if img.mode not in MODES:
+            img = img.convert('RGBA' if 'A' in img.getbands() or 'transparency' in img.info else 'RGB')
+        rawmode = img.mode
+        if img.mode == 'P':
+            colors = img.getextrema()[1] + 1
+            rawmode = next((f'P;{bits}' for bits in (1, 2, 4) if colors <= 1 << bits), 'P')
+        shape, dtype = pixel_layout(rawmode, img.size)
+        pixels = np.frombuffer(img.tobytes('raw', rawmode), dtype=dtype).reshape(shape)
+        palette = img.getpalette() if img.mode in ('P', 'PA') else None
+        return ImageData(pixels, img.mode, rawmode, img.size, palette, img.info.get('transparency'))
+
+def image_payload(image, name):
+    """Payload mô tả ảnh (ImageData) cho header .lcs, kèm CRC32 của các byte pixel."""
+    pixels = image.pixels
+    payload = {"kind": "image", "name": name, "shape": [int(n) for n in pixels.shape],
+               "dtype": pixels.dtype.str, "size": [int(n) for n in image.size], "mode": image.mode}
+    if image.rawmode != image.mode:
+        payload["rawmode"] = image.rawmode
+    if image.palette is not None:
+        payload["palette"] = [int(value) for value in image.palette]
+    if isinstance(image.transparency, (bytes, tuple)):
+        payload["transparency"] = list(image.transparency)
+    elif image.transparency is not None:
+        payload["transparency"] = image.transparency
+    payload["crc32"] = zlib.crc32(pixels.reshape(-1).view(np.uint8))
+    return payload
+
+def bytes_per_pixel(image):
+    """Số byte mỗi pixel trong bộ đệm của ImageData (1 với ảnh đóng gói nhiều pixel mỗi byte), dùng làm stride của bộ lọc delta."""
+    pixels = image.pixels
+    return pixels.itemsize * (pixels.shape[2] if pixels.ndim == 3 else 1)
+
+def image_extension(mode):
+    """Đuôi file ghi lại ảnh mode `mode` không mất mát: '.png', hoặc '.tiff' (CMYK, LAB, F...)."""
+    return '.png' if mode is None or mode in PNG_MODES else '.tiff'
+
+# === GIẢI MÃ ===
+def decode_pixels(signal_file, processes=None):
+    """Giải mã bản ghi ảnh (SignalFile), trả về (mảng pixel, số ký hiệu lỗi, danh sách cảnh báo).
+
+    Tín hiệu được giải mã thẳng vào mảng pixel cấp phát sẵn, hoặc qua bước
+    giải xáo trộn và bỏ khung nếu dữ liệu đã xáo trộn/đóng khung; dữ liệu đã
+    nén được giải nén sau cùng (nén riêng từng khung thì khung hỏng chỉ làm
+    mất phần ảnh của nó). CRC32 trong payload (nếu có) được
+    kiểm tra lại; sai lệch được báo trong cảnh báo, không làm dừng giải mã.
+    """
+    payload = signal_file.payload or {}
+    shape = payload["shape"]
+    dtype = np.dtype(payload.get("dtype", "uint8"))
+    count = int(np.prod(shape)) * dtype.itemsize
+    # Dữ liệu đã nén (linecode.compression): giải mã ra byte nén rồi mới giải nén thành pixel
+    packed = payload.get("compression")
+    size = packed["compressed"] if packed else count
+    warnings = []
+    if "framing" in payload or "scrambler" in payload:
+        bits, invalid = parallel.decode(signal_file, signal_file.code, processes)
+        errors = int(np.count_nonzero(invalid))
+        del invalid
+        if "scrambler" in payload:
+            bits = scrambler.descramble(bits, payload["scrambler"])
+        damaged = ()
+        if "framing" in payload:
+            report = framing.deframe_signal(signal_file, signal_file.code, bits, processes, payload.get("scrambler"))
+            if report.damaged or not report.frames:
+                warnings.append(framing.describe(report))
+            recovered, damaged = report.data, report.damaged
+        else:
+            recovered = bits.memoryview()[:bits.nbits // 8]
+        del bits
+        if len(recovered) < size:
+            raise ValueError(f"Chỉ khôi phục được {len(recovered)} / {size} byte ảnh.")
+        data = np.frombuffer(recovered, dtype=np.uint8, count=size)
+    else:
+        data = np.empty(size if packed else shape, dtype=np.uint8 if packed else dtype)
+        nbits, positions = parallel.decode_into(signal_file, signal_file.code, data, processes)
+        if nbits < size * 8:
+            raise ValueError(f"Tín hiệu chỉ đủ cho {nbits // 8} / {size} byte ảnh.")
+        errors = int(positions.size)
+    if packed and "block_size" in packed:
+        # Nén riêng từng khung: khối hỏng để 0, phần còn lại của ảnh vẫn giữ được
+        data, lost = compression.decompress_blocks(data, packed, damaged)
+        if lost:
+            warnings.append(compression.describe_lost(lost, data.size))
+    elif packed:
+        data = compression.decompress(data, packed)
+    pixels = data.reshape(-1).view(dtype).reshape(shape)
+    if "crc32" in payload and zlib.crc32(pixels.reshape(-1).view(np.uint8)) != payload["crc32"]:
+        warnings.append("CRC32 của ảnh không khớp, ảnh giải mã bị sai")
+    return pixels, errors, warnings
+
+def to_image(pixels, payload):
+    """Dựng ảnh PIL từ bộ đệm pixel theo mode, kích thước, bảng màu và màu trong suốt trong payload."""
+    from PIL import Image
+    mode = payload.get("mode")
+    if mode is None:
+        return Image.fromarray(pixels)
+    size = tuple(payload.get("size") or (pixels.shape[1], pixels.shape[0]))
+    img = Image.frombuffer(mode, size, pixels, 'raw', payload.get("rawmode", mode), 0, 1)
+    if payload.get("palette"):
+        img.putpalette(payload["palette"])
+    transparency = payload.get("transparency")
+    if isinstance(transparency, list):
+        # Bảng độ trong suốt của ảnh 'P' là bytes, màu trong suốt của ảnh RGB là tuple
+        transparency = bytes(transparency) if mode == 'P' else tuple(transparency)
+    if transparency is not None:
+        img.info["transparency"] = transparency
+    return img
+
+def save_image(pixels, payload, path):
+    """Ghi mảng pixel ra file ảnh (định dạng theo đuôi file, xem image_extension)."""
+    to_image(pixels, payload).save(path)
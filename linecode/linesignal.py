@@ -0,0 +1,118 @@
+"""Tín hiệu đường truyền kèm nhịp lấy mẫu: mức theo ký hiệu + số mẫu mỗi ký hiệu.
+
+Mỗi mã có số ký hiệu/bit riêng (RZ, Manchester, Diff-Manchester: 2; 2B1Q: 1/2;
+còn lại: 1). Signal giữ mảng mức theo ký hiệu cùng mã, tập mức và số mẫu mỗi
+ký hiệu, nên số mẫu mỗi bit luôn suy ra được. Dạng sóng lấy mẫu là view
+broadcast của mảng ký hiệu (không sao chép) hoặc tích ngoài với dạng xung;
+phía thu tích phân từng ký hiệu (integrate-and-dump) đúng pha.
+"""
+from fractions import Fraction
+
+import numpy as np
+
+from linecode import decoders, registry
+from linecode.signalfile import SignalFile, open_signal
+
+# === DẠNG XUNG ===
+PULSES = ('rect', 'halfsine', 'raised-cosine')
+
+def pulse_shape(name, samples_per_symbol):
+    """Dạng một xung dài `samples_per_symbol` mẫu (float32, đỉnh bằng 1); 'rect' là xung chữ nhật."""
+    t = (np.arange(samples_per_symbol, dtype=np.float64) + 0.5) / samples_per_symbol
+    if name == 'rect':
+        shape = np.ones_like(t)
+    elif name == 'halfsine':
+        shape = np.sin(np.pi * t)
+    elif name == 'raised-cosine':
+        shape = (1 - np.cos(2 * np.pi * t)) / 2
+    else:
+        raise ValueError(f"Không hỗ trợ dạng xung {name!r} (chọn một trong {', '.join(PULSES)}).")
+    return shape.astype(np.float32)
+
+# === TÍN HIỆU ===
+class Signal:
+    """Mảng mức int8 theo ký hiệu cùng mã đường truyền, tập mức và số mẫu mỗi ký hiệu."""
+
+    def __init__(self, symbols, code=None, samples_per_symbol=1, alphabet=None, pulse='rect'):
+        self.symbols = decoders.as_levels(symbols)
+        self.code = code
+        codec = registry.find(code)
+        self.alphabet = tuple(alphabet) if alphabet is not None else codec.alphabet if codec else None
+        self.samples_per_symbol = int(samples_per_symbol)
+        self.pulse = pulse
+
+    @classmethod
+    def encode(cls, data, code, samples_per_bit=None, pulse='rect'):
+        """Mã hóa `data`; `samples_per_bit` (mặc định: 1 mẫu mỗi ký hiệu) phải chia hết cho số ký hiệu/bit."""
+        signal = cls(registry.get(code).encode(data), code, pulse=pulse)
+        if samples_per_bit is not None:
+            signal.samples_per_bit = samples_per_bit
+        return signal
+
+    @classmethod
+    def open(cls, path, samples_per_symbol=1, pulse='rect'):
+        """Mở file .lcs (mức đọc qua memmap với kiểu lưu 'int8')."""
+        source = path if isinstance(path, SignalFile) else open_signal(path)
+        return cls(source.levels(), source.code, samples_per_symbol, source.alphabet, pulse)
+
+    @property
+    def symbols_per_bit(self):
+        codec = registry.find(self.code)
+        return Fraction(codec.group_symbols, codec.group_bits) if codec else Fraction(1)
+
+    @property
+    def samples_per_bit(self):
+        """Số mẫu mỗi bit dữ liệu (có thể là phân số, ví dụ 2B1Q với 1 mẫu/ký hiệu)."""
+        value = self.samples_per_symbol * self.symbols_per_bit
+        return int(value) if value.denominator == 1 else value
+
+    @samples_per_bit.setter
+    def samples_per_bit(self, value):
+        samples = Fraction(value) / self.symbols_per_bit
+        if samples.denominator != 1 or samples < 1:
+            raise ValueError(f"{value} mẫu/bit không chia đều cho {self.symbols_per_bit} ký hiệu/bit của {self.code}.")
+        self.samples_per_symbol = int(samples)
+
+    def __len__(self):
+        """Số mẫu của dạng sóng."""
+        return self.symbols.size * self.samples_per_symbol
+
+    def waveform(self):
+        """Dạng sóng dạng (ký hiệu × mẫu).
+
+        Xung chữ nhật: view broadcast chỉ đọc của mảng ký hiệu (không sao
+        chép); dạng xung khác: tích ngoài float32 giữa mức và dạng xung.
+        """
+        if self.pulse == 'rect':
+            return np.broadcast_to(self.symbols[:, None], (self.symbols.size, self.samples_per_symbol))
+        return np.multiply.outer(self.symbols.astype(np.float32),
+                                 pulse_shape(self.pulse, self.samples_per_symbol))
+
+    def samples(self, dtype=np.float32):
+        """Dạng sóng phẳng (một bản sao kiểu `dtype`), dùng khi cần ghi đè như cộng nhiễu."""
+        return self.waveform().astype(dtype).reshape(-1)
+
+    def decode(self):
+        """Giải mã mảng ký hiệu bằng bộ giải mã của mã, trả về DecodeResult."""
+        return registry.get(self.code).decode(self.symbols)
+
+    def __repr__(self):
+        return (f"Signal(code={self.code!r}, symbols={self.symbols.size}, "
+                f"samples_per_symbol={self.samples_per_symbol}, pulse={self.pulse!r})")
+
+# === PHÍA THU ===
+def integrate_and_dump(samples, samples_per_symbol, phase=0, pulse='rect'):
+    """Ước lượng biên độ từng ký hiệu: tích phân các mẫu của ký hiệu theo dạng xung rồi chuẩn hóa.
+
+    `phase` là số mẫu lệch của biên ký hiệu đầu tiên; phần mẫu lẻ ở cuối bị
+    bỏ. Với xung chữ nhật đây là trung bình các mẫu của mỗi ký hiệu (bộ lọc
+    phối hợp); 1 mẫu/ký hiệu thì trả lại chính các mẫu.
+    """
+    samples = np.asarray(samples)[phase:]
+    if samples_per_symbol == 1 and pulse == 'rect':
+        return samples
+    count = samples.size // samples_per_symbol
+    blocks = samples[:count * samples_per_symbol].reshape(count, samples_per_symbol)
+    template = pulse_shape(pulse, samples_per_symbol)
+    template /= np.dot(template, template)
+    return blocks.astype(np.float32, copy=False) @ template
@@ -0,0 +1,68 @@
+"""MLT-3 (Multi-Level Transmit, 3 mức): mã cắm thêm, tự đăng ký vào linecode.registry.
+
+Bit 1 chuyển sang mức kế tiếp trong chu kỳ 0, +1, 0, -1; bit 0 giữ nguyên
+mức. Một chu kỳ đủ cần 4 bit 1 nên tần số cơ bản chỉ bằng 1/4 tốc độ bit
+(dùng trong 100BASE-TX sau 4B5B). Bộ giải mã chỉ nhìn mức trước đó: mức ngoài
+{-1, 0, 1} hoặc nhảy thẳng giữa +1 và -1 bị đánh dấu lỗi.
+Ví dụ:
+    signal = registry.get("mlt-3").encode(b"Xin chao")
+"""
+import numpy as np
+
+from linecode import registry
+from linecode.bitbuffer import BitBuffer, as_packed
+from linecode.decoders import DecodeResult, as_levels
+
+CYCLE = np.array([0, 1, 0, -1], dtype=np.int8)
+_BYTE_ONES = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+def encode_bits(bits, phase=0):
+    """Mã hóa mảng bit 0/1 (uint8), bắt đầu từ vị trí `phase` trong chu kỳ (0 ứng với mức 0 trước bit đầu)."""
+    steps = np.cumsum(bits, dtype=np.uint8)
+    steps += np.uint8(phase)
+    steps &= 3
+    return CYCLE[steps]
+
+def encode(data, phase=0):
+    """Mã hóa chuỗi bit (BitBuffer, bytes, mảng bit hoặc chuỗi '0'/'1') tiếp nối vị trí `phase` trong chu kỳ."""
+    packed, nbits = as_packed(data)
+    return encode_bits(np.unpackbits(packed, count=nbits), phase)
+
+def decode(signal, previous=0):
+    """Bit là 1 khi mức đổi so với mức trước (`previous`, mặc định 0), kèm mặt nạ mức không hợp lệ."""
+    levels = as_levels(signal)
+    before = np.empty_like(levels)
+    before[:1] = previous
+    before[1:] = levels[:-1]
+    jump = np.abs(levels.astype(np.int16) - before)
+    invalid = (np.abs(levels) > 1) | (jump == 2)
+    return DecodeResult(BitBuffer.from_bits(levels != before), invalid)
+
+class CycleState:
+    """Trạng thái MLT-3: vị trí trong chu kỳ (bộ mã hóa), mức cuối (bộ giải mã).
+
+    Pha tăng theo số bit 1 đưa vào MLT-3; mã xếp chồng lên MLT-3 (4B5B) thay
+    ones() để đếm bit 1 của chuỗi bit sau khi mã khối.
+    """
+    initial = 0
+    previous = 0
+    lookahead = 0
+    context = (0, 0)
+
+    def ones(self, packed, nbits):
+        """Số bit 1 mà `nbits` bit đầu của `packed` đưa vào MLT-3."""
+        if nbits % 8:
+            return int(np.count_nonzero(np.unpackbits(packed, count=nbits)))
+        return int(_BYTE_ONES[packed[:nbits // 8]].sum(dtype=np.uint64))
+
+    def encode(self, encode, data, phase, ahead=0):
+        packed, nbits = as_packed(data)
+        return encode(BitBuffer(packed, nbits), phase), (phase + self.ones(packed, nbits)) % 4
+
+    def advance(self, packed, phase):
+        return (phase + self.ones(packed, packed.size * 8)) % 4
+
+    def carry(self, read, start, stop, previous):
+        return int(read(stop - 1, stop)[0]) if start < stop else previous
+
+registry.register(registry.Codec("mlt-3", encode, decode, 1, (-1, 0, 1), CycleState(), "MLT-3"))
@@ -0,0 +1,258 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from linecode import decoders, registry
+from linecode.bitbuffer import BitBuffer, as_packed
+from linecode.signalfile import SignalFile
+
+# === CHIA KHỐI AN TOÀN CHO MÃ CÓ NHỚ ===
+# Mã hóa: khối được cắt theo byte (luôn chẵn bit, hợp với cặp bit 2B1Q). Trạng
+# thái đầu khối do codec.state.advance tính từ các byte của các khối trước
+# (chẵn lẻ qua XOR của các byte với mã đảo dấu), rẻ hơn nhiều so với mã hóa.
+# Giải mã: khối là bội số của codec.block_symbols (số bit ra chia hết cho 8);
+# trạng thái đầu khối do codec.state.carry đọc từ phần tín hiệu đứng trước.
+# Tiến trình con nhận thẳng đối tượng Codec (qua pickle) chứ không tra lại
+# theo tên, nên mã đăng ký lúc chạy cũng chia khối được. Mã cần nhìn trước
+# (B8ZS, HDB3): mỗi khối mã hóa nhận thêm vài byte sau nó để nhìn trước, mỗi
+# khối giải mã được đọc rộng thêm codec.state.context ký hiệu hai bên rồi cắt lại.
+def _bit_offset(codec, start):
+    """Vị trí byte của bit giải mã từ ký hiệu `start` (đầu một khối)."""
+    return start // codec.group_symbols * codec.group_bits // 8
+
+def _attach(name, dtype, count):
+    """Gắn vào vùng nhớ dùng chung đã có, trả về (SharedMemory, mảng trên vùng nhớ đó)."""
+    memory = shared_memory.SharedMemory(name=name)
+    return memory, np.ndarray(count, dtype=dtype, buffer=memory.buf)
+
+def _share(array):
+    """Sao chép mảng vào một vùng nhớ dùng chung mới."""
+    memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)[...] = array
+    return memory
+
+def _release(*memories, unlink=False):
+    for memory in memories:
+        memory.close()
+        if unlink:
+            memory.unlink()
+
+# === MÃ HÓA SONG SONG ===
+def _encode_chunk(task):
+    codec, source_name, nbytes, first, last, nbits, ahead, target_name, length, offset, state = task
+    source, packed = _attach(source_name, np.uint8, nbytes)
+    target, signal = _attach(target_name, np.int8, length)
+    try:
+        chunk, _ = codec.state.encode(codec.encode, BitBuffer(packed[first:last], nbits), state, ahead)
+        signal[offset:offset + chunk.size] = chunk
+    finally:
+        del packed, signal
+        _release(source, target)
+
+def encode(data, code, processes=None, chunk_size=1 << 22):
+    """Mã hóa `data` bằng nhiều tiến trình; kết quả trùng với mã hóa một lần.
+
+    `chunk_size` là số byte dữ liệu mỗi khối. Dữ liệu chỉ có một khối hoặc
+    `processes=1` được mã hóa trực tiếp, không tạo tiến trình con.
+    """
+    codec = registry.get(code)
+    packed, nbits = as_packed(data)
+    packed = packed[:-(-nbits // 8)]
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or packed.size <= chunk_size:
+        return codec.encode(BitBuffer(packed, nbits))
+    length = codec.symbols(nbits)
+    source = _share(packed)
+    target = shared_memory.SharedMemory(create=True, size=length)
+    try:
+        tasks = []
+        state = codec.state.initial
+        extra = -(-codec.state.lookahead // 8)
+        for first in range(0, packed.size, chunk_size):
+            last = min(first + chunk_size, packed.size)
+            ahead_last = min(last + extra, packed.size)
+            count = min(nbits, ahead_last * 8) - first * 8
+            ahead = count - (min(nbits, last * 8) - first * 8)
+            tasks.append((codec, source.name, packed.size, first, ahead_last, count, ahead,
+                          target.name, length, codec.symbols(first * 8), state))
+            state = codec.state.advance(packed[first:last], state)
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            list(pool.map(_encode_chunk, tasks))
+        return np.ndarray(length, dtype=np.int8, buffer=target.buf).copy()
+    finally:
+        _release(source, target, unlink=True)
+
+# === GIẢI MÃ SONG SONG ===
+def _reader(signal):
+    """Hàm đọc đoạn [start, stop) của mảng mức hoặc SignalFile."""
+    if isinstance(signal, SignalFile):
+        return signal.read
+    return lambda start, stop: signal[start:stop]
+
+def _start_states(codec, read, starts):
+    """Trạng thái `previous` ở đầu phần ngữ cảnh trước mỗi khối (chỉ đọc phần đuôi của khối trước)."""
+    back = codec.state.context[0]
+    firsts = [max(start - back, 0) for start in starts]
+    previous = codec.state.previous
+    states = [previous]
+    for before, first in zip(firsts, firsts[1:]):
+        previous = codec.state.carry(read, before, first, previous)
+        states.append(previous)
+    return states
+
+def _decode_span(codec, read, start, stop, previous, length):
+    """Giải mã đoạn [start, stop) của tín hiệu dài `length`, đọc kèm ngữ cảnh codec.state.context."""
+    back, ahead = codec.state.context
+    first = max(start - back, 0)
+    levels = read(first, min(stop + ahead, length))
+    return codec.decode_window(levels, previous, start - first, stop - first)
+
+def _source(signal):
+    """Mô tả nguồn tín hiệu cho tiến trình con: ('file', đường dẫn) hoặc vùng nhớ dùng chung chứa tín hiệu.
+
+    Trả về (mô tả, vùng nhớ cần giải phóng hoặc None).
+    """
+    if isinstance(signal, SignalFile):
+        return ('file', signal.path), None
+    memory = _share(signal)
+    return ('shm', memory.name, len(signal)), memory
+
+def _read_source(source, start, stop, memories):
+    """Đọc đoạn [start, stop) của nguồn do _source mô tả (vùng nhớ được gắn thêm vào `memories`)."""
+    if source[0] == 'file':
+        return SignalFile(source[1]).read(start, stop)
+    memory, shared = _attach(source[1], np.int8, source[2])
+    memories.append(memory)
+    return shared[start:stop]
+
+def _decode_chunk(task):
+    (codec, source, length, start, stop, previous, bits_name, nbytes, invalid_name, ninvalid,
+     bit_offset, invalid_offset) = task
+    memories = []
+    bits_memory, bits = _attach(bits_name, np.uint8, nbytes)
+    invalid_memory, invalid = _attach(invalid_name, np.bool_, ninvalid)
+    try:
+        result = _decode_span(codec, lambda first, last: _read_source(source, first, last, memories),
+                              start, stop, previous, length)
+        bits[bit_offset:bit_offset + result.bits.packed.size] = result.bits.packed
+        invalid[invalid_offset:invalid_offset + result.invalid.size] = result.invalid
+        del result
+    finally:
+        del bits, invalid
+        _release(bits_memory, invalid_memory, *memories)
+
+def decode(signal, code, processes=None, chunk_size=1 << 24):
+    """Giải mã tín hiệu (mảng mức hoặc SignalFile) bằng nhiều tiến trình, trả về DecodeResult.
+
+    Với SignalFile, mỗi tiến trình con tự đọc phần của mình qua memmap; với
+    mảng, tín hiệu được chép một lần vào vùng nhớ dùng chung.
+    """
+    codec = registry.get(code)
+    if not isinstance(signal, SignalFile):
+        signal = decoders.as_levels(signal)
+    length = len(signal)
+    processes = processes or os.cpu_count() or 1
+    read = _reader(signal)
+    align = codec.block_symbols
+    chunk_size = max(chunk_size // align, 1) * align
+    if processes == 1 or length <= chunk_size:
+        return codec.decode_from(read(0, length), codec.state.previous)
+
+    # Phần thân (bội số của block_symbols) chia cho các tiến trình, phần đuôi giải mã tại chỗ
+    body = length - length % align
+    starts = list(range(0, body, chunk_size))
+    states = _start_states(codec, read, starts + [body])
+    nbits = codec.decoded_bits(body)
+    ninvalid = body // codec.group_symbols
+    bits_memory = shared_memory.SharedMemory(create=True, size=nbits // 8)
+    invalid_memory = shared_memory.SharedMemory(create=True, size=ninvalid)
+    source_memory = None
+    try:
+        source, source_memory = _source(signal)
+        tasks = [(codec, source, length, start, min(start + chunk_size, body), previous,
+                  bits_memory.name, nbits // 8, invalid_memory.name, ninvalid,
+                  _bit_offset(codec, start), start // codec.group_symbols)
+                 for start, previous in zip(starts, states)]
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            list(pool.map(_decode_chunk, tasks))
+        tail = _decode_span(codec, read, body, length, states[-1], length)
+        packed = np.concatenate([np.ndarray(nbits // 8, dtype=np.uint8, buffer=bits_memory.buf),
+                                 tail.bits.packed])
+        invalid = np.concatenate([np.ndarray(ninvalid, dtype=np.bool_, buffer=invalid_memory.buf),
+                                  tail.invalid])
+        return decoders.DecodeResult(BitBuffer(packed, nbits + tail.bits.nbits), invalid)
+    finally:
+        _release(bits_memory, invalid_memory, unlink=True)
+        if source_memory is not None:
+            _release(source_memory, unlink=True)
+
+# === GIẢI MÃ VÀO BỘ ĐỆM CÓ SẴN ===
+def _decode_block(codec, read, start, stop, previous, length, bits, bit_offset, invalid_offset):
+    """Giải mã đoạn [start, stop), ghi bit đóng gói vào `bits` từ byte `bit_offset`, trả về vị trí ký hiệu lỗi."""
+    result = _decode_span(codec, read, start, stop, previous, length)
+    bits[bit_offset:bit_offset + result.bits.packed.size] = result.bits.packed
+    return np.flatnonzero(result.invalid) + invalid_offset
+
+def _decode_into_chunk(task):
+    codec, source, length, start, stop, previous, bits_name, nbytes, bit_offset, invalid_offset = task
+    memories = []
+    bits_memory, bits = _attach(bits_name, np.uint8, nbytes)
+    try:
+        return _decode_block(codec, lambda first, last: _read_source(source, first, last, memories),
+                             start, stop, previous, length, bits, bit_offset, invalid_offset)
+    finally:
+        del bits
+        _release(bits_memory, *memories)
+
+def decode_into(signal, code, out, processes=None, chunk_size=1 << 22):
+    """Giải mã tín hiệu (mảng mức hoặc SignalFile) thẳng vào mảng uint8 liền mạch `out`.
+
+    Trả về (số bit giải mã, vị trí các ký hiệu lỗi theo chỉ số của mặt nạ
+    `invalid` trong DecodeResult). Tín hiệu được giải mã theo từng khối
+    `chunk_size` ký hiệu nên ngoài `out` chỉ cần bộ nhớ tạm cỡ một khối: mảng
+    bit và mặt nạ lỗi đầy đủ không bao giờ được dựng. Với nhiều tiến trình,
+    các khối được ghi vào một vùng nhớ dùng chung cỡ `out` rồi chép sang.
+    """
+    codec = registry.get(code)
+    if not isinstance(signal, SignalFile):
+        signal = decoders.as_levels(signal)
+    if not out.flags.c_contiguous:
+        raise ValueError("Bộ đệm giải mã phải liền mạch.")
+    out = out.view(np.uint8).reshape(-1)
+    length = len(signal)
+    total = codec.decoded_bits(length)
+    if -(-total // 8) > out.size:
+        raise ValueError(f"Bộ đệm {out.size} byte không đủ cho {total} bit giải mã.")
+    read = _reader(signal)
+    align = codec.block_symbols
+    chunk_size = max(chunk_size // align, 1) * align
+    body = length - length % align
+    starts = list(range(0, body, chunk_size))
+    states = _start_states(codec, read, starts + [body])
+    spans = [(start, min(start + chunk_size, body), previous) for start, previous in zip(starts, states)]
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(spans) <= 1:
+        errors = [_decode_block(codec, read, start, stop, previous, length, out,
+                                _bit_offset(codec, start), start // codec.group_symbols)
+                  for start, stop, previous in spans]
+    else:
+        nbytes = codec.decoded_bits(body) // 8
+        bits_memory = shared_memory.SharedMemory(create=True, size=nbytes)
+        source_memory = None
+        try:
+            source, source_memory = _source(signal)
+            tasks = [(codec, source, length, start, stop, previous, bits_memory.name, nbytes,
+                      _bit_offset(codec, start), start // codec.group_symbols)
+                     for start, stop, previous in spans]
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                errors = list(pool.map(_decode_into_chunk, tasks))
+            out[:nbytes] = np.ndarray(nbytes, dtype=np.uint8, buffer=bits_memory.buf)
+        finally:
+            _release(bits_memory, unlink=True)
+            if source_memory is not None:
+                _release(source_memory, unlink=True)
+    errors.append(_decode_block(codec, read, body, length, states[-1], length, out,
+                                _bit_offset(codec, body), body // codec.group_symbols))
+    return total, np.concatenate(errors)
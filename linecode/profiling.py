@@ -0,0 +1,309 @@
+"""Đo từng khâu xử lý (tùy chọn): thời gian thực, thời gian CPU, số byte vào/ra và bộ nhớ đỉnh.
+
+Bật bằng biến môi trường LINECODE_PROFILE=<tiền tố> (LINECODE_PROFILE=1 dùng
+tiền tố mặc định) hoặc cờ --profile của CLI. Khi kết thúc, kết quả được ghi ra
+<tiền tố>.json (từng khâu và tổng theo tên khâu) và <tiền tố>.trace.json (định
+dạng Chrome trace, mở bằng chrome://tracing hoặc ui.perfetto.dev; khâu lồng
+nhau hiện thành các tầng). Khi tắt, stage() trả về một đối tượng rỗng dùng
+chung và hàm bọc bởi profiled() gọi thẳng hàm gốc, nên gần như không tốn gì.
+Bộ nhớ đỉnh đo bằng tracemalloc (kể cả mảng numpy), là phần tăng so với lúc
+vào khâu; tracemalloc làm chậm mã Python thuần nên có thể tắt bằng
+LINECODE_PROFILE_MEMORY=0 (hoặc enable(memory=False)). Chỉ tiến trình đã bật
+được đo; các tiến trình con chia khối của linecode.parallel không được ghi.
+Ví dụ:
+    with profiling.stage("encode", bytes_in=len(data)) as stage:
+        signal = codec.encode(data)
+        stage.record(bytes_out=signal.nbytes)
+    bits = profiling.call("text_to_bits", text_to_bits, text)
+"""
+import atexit
+import functools
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import namedtuple
+
+import numpy as np
+
+from linecode.bitbuffer import BitBuffer
+from linecode.signalfile import SignalFile
+
+try:
+    import resource
+except ImportError:  # Windows không có resource
+    resource = None
+
+ENVIRONMENT = 'LINECODE_PROFILE'
+DEFAULT_PREFIX = 'linecode-profile'
+
+StageRecord = namedtuple('StageRecord', ['name', 'depth', 'pid', 'thread', 'start_ns', 'wall_ns', 'cpu_ns',
+                                         'bytes_in', 'bytes_out', 'peak_bytes', 'max_rss', 'error'])
+
+# Phiên đo hiện tại (None khi tắt)
+_session = None
+
+def nbytes(value):
+    """Số byte của dữ liệu: BitBuffer (làm tròn lên), mảng numpy, SignalFile, bytes/memoryview, str (UTF-8).
+
+    Với tuple lấy phần tử đầu (các hàm trả về (dữ liệu, thông tin)); None nếu không xác định được.
+    """
+    if isinstance(value, tuple):
+        value = value[0] if value else None
+    if isinstance(value, BitBuffer):
+        return -(-len(value) // 8)
+    if isinstance(value, SignalFile):
+        return int(value.raw.nbytes)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, memoryview):
+        return value.nbytes
+    if isinstance(value, str):
+        return len(value.encode('utf-8', 'surrogatepass'))
+    return None
+
+def _max_rss():
+    """Bộ nhớ thường trú lớn nhất của tiến trình từ lúc chạy (byte), None nếu hệ điều hành không hỗ trợ."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux tính theo KiB, macOS theo byte
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+# === KHÂU ===
+class _NullStage:
+    """Khâu rỗng dùng chung khi tắt đo."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def record(self, bytes_in=None, bytes_out=None):
+        pass
+
+_NULL_STAGE = _NullStage()
+
+class Stage:
+    """Một khâu đang đo (dùng với `with`); record() cập nhật số byte vào/ra khi đã biết."""
+
+    def __init__(self, session, name, bytes_in=None):
+        self.session = session
+        self.name = name
+        self.bytes_in = bytes_in
+        self.bytes_out = None
+
+    def record(self, bytes_in=None, bytes_out=None):
+        if bytes_in is not None:
+            self.bytes_in = bytes_in
+        if bytes_out is not None:
+            self.bytes_out = bytes_out
+
+    def __enter__(self):
+        stack = self.session.stack()
+        self.depth = len(stack)
+        if self.session.memory:
+            # Đỉnh tính tới giờ thuộc về khâu cha, rồi đặt lại để đo riêng khâu này
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]._peak = max(stack[-1]._peak, peak)
+            tracemalloc.reset_peak()
+            self._base = self._peak = current
+        stack.append(self)
+        self._cpu = time.process_time_ns()
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, kind, error, traceback):
+        end = time.perf_counter_ns()
+        cpu = time.process_time_ns() - self._cpu
+        stack = self.session.stack()
+        stack.pop()
+        peak = None
+        if self.session.memory:
+            self._peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            if stack:
+                stack[-1]._peak = max(stack[-1]._peak, self._peak)
+            peak = self._peak - self._base
+        self.session.add(StageRecord(self.name, self.depth, os.getpid(), threading.get_native_id(),
+                                     self._start - self.session.origin, end - self._start, cpu,
+                                     self.bytes_in, self.bytes_out, peak, _max_rss(),
+                                     kind.__name__ if kind is not None else None))
+        return False
+
+class Session:
+    """Các khâu đã đo của một lần bật; mỗi luồng có ngăn xếp khâu lồng nhau riêng."""
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.records = []
+        self.origin = time.perf_counter_ns()
+        self.started = time.time()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._tracing = memory and not tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.start()
+
+    def stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def add(self, record):
+        with self._lock:
+            self.records.append(record)
+
+    def close(self):
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+# === BẬT/TẮT ===
+def enabled():
+    return _session is not None
+
+def enable(memory=True):
+    """Bật đo (không làm gì nếu đã bật); `memory` đo thêm bộ nhớ đỉnh bằng tracemalloc."""
+    global _session
+    if _session is None:
+        _session = Session(memory)
+    return _session
+
+def disable():
+    """Tắt đo, trả về phiên vừa kết thúc (None nếu chưa bật)."""
+    global _session
+    session, _session = _session, None
+    if session is not None:
+        session.close()
+    return session
+
+def stage(name, bytes_in=None):
+    """Khâu `name` để dùng với `with`; khi tắt đo trả về khâu rỗng dùng chung."""
+    if _session is None:
+        return _NULL_STAGE
+    return Stage(_session, name, bytes_in)
+
+def _call(name, function, args, kwargs, data):
+    with Stage(_session, name, nbytes(args[data]) if data is not None and len(args) > data else None) as current:
+        result = function(*args, **kwargs)
+        current.record(bytes_out=nbytes(result))
+    return result
+
+def call(name, function, *args, **kwargs):
+    """Gọi function(*args, **kwargs) như khâu `name`: byte vào theo đối số đầu, byte ra theo kết quả."""
+    if _session is None:
+        return function(*args, **kwargs)
+    return _call(name, function, args, kwargs, 0)
+
+def profiled(name=None, data=0):
+    """Decorator đo mỗi lần gọi hàm như một khâu (mặc định mang tên hàm).
+
+    Byte vào là kích thước đối số vị trí thứ `data` (None: không tính), byte ra
+    là kích thước kết quả (phần tử đầu nếu kết quả là tuple).
+    """
+    def decorate(function):
+        label = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _session is None:
+                return function(*args, **kwargs)
+            return _call(label, function, args, kwargs, data)
+        return wrapper
+    return decorate
+
+# === KẾT QUẢ ===
+def records():
+    """Các StageRecord đã đo theo thứ tự kết thúc ([] khi tắt)."""
+    return list(_session.records) if _session is not None else []
+
+def take():
+    """Lấy và xóa các StageRecord đã đo (tiến trình con gửi về tiến trình chính qua absorb())."""
+    if _session is None:
+        return []
+    with _session._lock:
+        taken, _session.records = _session.records, []
+    return taken
+
+def absorb(items):
+    """Thêm các StageRecord đo ở tiến trình khác vào phiên hiện tại."""
+    if _session is not None:
+        for record in items:
+            _session.add(StageRecord(*record))
+
+def to_dict(record):
+    """StageRecord → dict ghi được ra JSON (thời gian tính bằng giây)."""
+    result = record._asdict()
+    for field in ('start', 'wall', 'cpu'):
+        result[f"{field}_s"] = result.pop(f"{field}_ns") / 1e9
+    return result
+
+def totals(items=None):
+    """Tổng theo tên khâu: số lần, thời gian thực/CPU, byte vào/ra và bộ nhớ đỉnh lớn nhất."""
+    result = {}
+    for record in records() if items is None else items:
+        total = result.setdefault(record.name, {"count": 0, "wall_s": 0.0, "cpu_s": 0.0, "bytes_in": 0,
+                                                "bytes_out": 0, "peak_bytes": None})
+        total["count"] += 1
+        total["wall_s"] += record.wall_ns / 1e9
+        total["cpu_s"] += record.cpu_ns / 1e9
+        total["bytes_in"] += record.bytes_in or 0
+        total["bytes_out"] += record.bytes_out or 0
+        if record.peak_bytes is not None:
+            total["peak_bytes"] = max(total["peak_bytes"] or 0, record.peak_bytes)
+    return result
+
+def report():
+    """Toàn bộ kết quả của phiên hiện tại dạng dict (JSON)."""
+    items = sorted(records(), key=lambda record: record.start_ns)
+    return {"pid": os.getpid(), "argv": sys.argv,
+            "started": time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(_session.started)) if _session else None,
+            "memory": bool(_session and _session.memory), "max_rss": _max_rss(),
+            "stages": [to_dict(record) for record in items], "totals": totals(items)}
+
+def chrome_trace():
+    """Kết quả theo định dạng Chrome trace: mỗi khâu một sự kiện 'X' (ts, dur tính bằng micro giây)."""
+    events = []
+    for record in sorted(records(), key=lambda record: record.start_ns):
+        args = {"cpu_ms": record.cpu_ns / 1e6, "bytes_in": record.bytes_in, "bytes_out": record.bytes_out,
+                "peak_bytes": record.peak_bytes, "max_rss": record.max_rss}
+        if record.error:
+            args["error"] = record.error
+        events.append({"name": record.name, "cat": "linecode", "ph": "X", "ts": record.start_ns / 1e3,
+                       "dur": record.wall_ns / 1e3, "pid": record.pid, "tid": record.thread,
+                       "args": {key: value for key, value in args.items() if value is not None}})
+    for pid in sorted({event["pid"] for event in events}):
+        events.append({"name": "process_name", "ph": "M", "pid": pid,
+                       "args": {"name": f"linecode {pid}" if pid != os.getpid() else "linecode"}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+def export(prefix=DEFAULT_PREFIX):
+    """Ghi <prefix>.json và <prefix>.trace.json, trả về hai đường dẫn."""
+    paths = (f"{prefix}.json", f"{prefix}.trace.json")
+    directory = os.path.dirname(prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    for path, content in zip(paths, (report(), chrome_trace())):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(content, f, indent=1)
+    return paths
+
+def _export_at_exit(prefix):
+    if _session is None:
+        return
+    paths = export(prefix)
+    print(f"⏱️ Đã ghi kết quả đo vào {paths[0]} và {paths[1]}", file=sys.stderr)
+
+# Bật theo biến môi trường, chỉ ở tiến trình chính (tiến trình con kiểu spawn
+# nhận lại biến môi trường nhưng không được ghi đè file kết quả)
+if os.environ.get(ENVIRONMENT) and multiprocessing.parent_process() is None:
+    enable(os.environ.get(f"{ENVIRONMENT}_MEMORY", '1') != '0')
+    atexit.register(_export_at_exit, DEFAULT_PREFIX if os.environ[ENVIRONMENT] == '1' else os.environ[ENVIRONMENT])
@@ -0,0 +1,215 @@
+"""Bảng mã đường truyền dùng chung cho mọi đường đi (văn bản, ảnh, dòng lệnh, luồng, song song, kênh).
+
+Mỗi mã là một Codec đăng ký theo tên: bộ mã hóa và bộ giải mã vector hóa,
+số ký hiệu mỗi bit, tập mức và kiểu trạng thái giữa các khối (dùng khi mã
+hóa/giải mã theo luồng hoặc chia khối cho nhiều tiến trình). Các đường đi chỉ
+tra mã theo tên, nên mã mới chỉ cần đăng ký một lần là dùng được ở mọi nơi:
+    register(Codec("mlt-3", encode, decode, 1, (-1, 0, 1), CycleState(), "MLT-3"))
+Các mã cài sẵn lấy từ linecode.encoders/decoders; các module trong PLUGINS
+được nạp ở cuối module này và tự đăng ký.
+"""
+import importlib
+import math
+from fractions import Fraction
+
+import numpy as np
+
+from linecode import decoders, encoders, two_b_one_q
+from linecode.bitbuffer import BitBuffer
+
+# Module mã cắm thêm, nạp sau khi đăng ký các mã cài sẵn
+PLUGINS = ('linecode.mlt3', 'linecode.substitution', 'linecode.four_b_five_b')
+
+# === TRẠNG THÁI GIỮA CÁC KHỐI ===
+# Bộ mã hóa giữ trạng thái `state` (khởi đầu `initial`): encode() mã hóa một
+# khối tiếp nối trạng thái đó, advance() tính trạng thái sau một khối trọn
+# byte mà không mã hóa (để chia khối cho nhiều tiến trình). Bộ giải mã nhận
+# tham số `previous` (khởi đầu `previous`): carry() tính nó sau đoạn
+# [start, stop) của tín hiệu, chỉ đọc phần cần thiết qua `read(start, stop)`.
+# Mã thay thế (B8ZS, HDB3) cần nhìn trước: `lookahead` bit sau khối quyết
+# định các ký hiệu cuối khối, nên encode() nhận thêm `ahead` bit cuối chỉ để
+# nhìn trước (không mã hóa, trạng thái trả về tính tới trước chúng); khi giải
+# mã, mỗi khối được giải mã kèm `context` = (số ký hiệu trước, số ký hiệu sau)
+# rồi cắt lại, `previous` khi đó là trạng thái ở đầu phần ngữ cảnh phía trước.
+def last_pulse(signal):
+    """Xung ±1 cuối cùng của khối (chỉ duyệt phần đuôi), None nếu không có."""
+    tail = 64
+    while True:
+        pulses = np.flatnonzero(np.abs(signal[-tail:]) == 1)
+        if pulses.size:
+            return int(signal[-tail:][pulses[-1]])
+        if tail >= signal.size:
+            return None
+        tail *= 4
+
+class Stateless:
+    """Mã không nhớ: mọi khối được mã hóa/giải mã độc lập."""
+    initial = None
+    previous = None
+    lookahead = 0
+    context = (0, 0)
+
+    def encode(self, encode, data, state, ahead=0):
+        return encode(data), None
+
+    def advance(self, packed, state):
+        return None
+
+    def carry(self, read, start, stop, previous):
+        return None
+
+class PolarityState:
+    """Mã có nhớ kiểu đảo dấu (NRZ-I, Diff-Manchester, AMI, Pseudoternary, 2B1Q).
+
+    Bộ mã hóa: trạng thái là cờ đảo dấu, khối tiếp theo được mã hóa như khi
+    bắt đầu từ đầu rồi đảo dấu toàn bộ. Sau một khối trọn byte, cờ đổi theo
+    chẵn lẻ của các bit `mask` trong XOR mọi byte (số bit 1, hoặc số bit đầu
+    cặp của 2B1Q; với khối trọn byte số bit 0 và số bit 1 cùng chẵn lẻ nên
+    Pseudoternary dùng chung cách tính với AMI). Bộ giải mã: `previous` là mức
+    cuối, hoặc xung ±1 cuối với `pulses`.
+    """
+    initial = False
+    lookahead = 0
+    context = (0, 0)
+
+    def __init__(self, previous, mask=0xFF, pulses=False):
+        self.previous = previous
+        self.mask = mask
+        self.pulses = pulses
+
+    def _ends_negative(self, signal):
+        """Trạng thái cuối khối (tính như khi khối bắt đầu từ trạng thái mặc định) có âm không."""
+        if not signal.size:
+            return False
+        if self.pulses:
+            # Xung tiếp theo phải ngược dấu xung cuối; mặc định xung đầu là +1
+            return last_pulse(signal) == 1
+        return bool(signal[-1] < 0)
+
+    def encode(self, encode, data, negative, ahead=0):
+        signal = encode(data)
+        ends_negative = self._ends_negative(signal)
+        if negative:
+            np.negative(signal, out=signal)
+        return signal, negative ^ ends_negative
+
+    def advance(self, packed, negative):
+        if not packed.size:
+            return negative
+        return negative ^ bool(bin(int(np.bitwise_xor.reduce(packed)) & self.mask).count('1') & 1)
+
+    def carry(self, read, start, stop, previous):
+        if start >= stop:
+            return previous
+        if self.pulses:
+            pulse = last_pulse(read(start, stop))
+            return previous if pulse is None else pulse
+        return int(read(stop - 1, stop)[0])
+
+_STATELESS = Stateless()
+
+# === MÃ ĐƯỜNG TRUYỀN ===
+class Codec:
+    """Một mã đường truyền: mã hóa/giải mã vector hóa, số ký hiệu mỗi bit, tập mức và kiểu trạng thái.
+
+    `encode(data)` nhận BitBuffer/bytes/mảng bit, trả về mảng mức int8;
+    `decode(levels[, previous])` trả về DecodeResult. Số ký hiệu mỗi bit là
+    phân số nhóm ký hiệu/nhóm bit (Manchester 2/1, 2B1Q 1/2); `explain` (tùy
+    chọn) báo lỗi chi tiết cho ký hiệu không hợp lệ thay cho thông báo chung.
+    """
+
+    def __init__(self, name, encode, decode, symbols_per_bit, alphabet, state=None, label=None, explain=None):
+        self.name = name
+        self.encode = encode
+        self.decode = decode
+        self.symbols_per_bit = symbols_per_bit
+        self.alphabet = tuple(alphabet)
+        self.state = state or _STATELESS
+        self.label = label or name
+        self.explain = explain
+        group = Fraction(symbols_per_bit).limit_denominator()
+        self.group_symbols, self.group_bits = group.numerator, group.denominator
+        # Khối chia tín hiệu: trọn nhóm ký hiệu, số bit ra chia hết cho 8, bội số của 16 ký hiệu
+        self.block_symbols = math.lcm(16, self.group_symbols * 8 // math.gcd(8, self.group_bits))
+
+    def symbols(self, nbits):
+        """Số ký hiệu sinh ra khi mã hóa `nbits` bit (nhóm bit cuối thiếu được đệm)."""
+        return -(-nbits // self.group_bits) * self.group_symbols
+
+    def decoded_bits(self, length):
+        """Số bit giải mã được từ `length` ký hiệu (nhóm ký hiệu cuối thiếu vẫn tính trọn nhóm)."""
+        return -(-length // self.group_symbols) * self.group_bits
+
+    def decode_from(self, levels, previous):
+        """Giải mã một khối tiếp nối trạng thái `previous` của bộ giải mã."""
+        return self.decode(levels) if previous is None else self.decode(levels, previous)
+
+    def decode_window(self, levels, previous, start, stop):
+        """Giải mã ký hiệu [start, stop) của `levels`; phần ngoài đoạn chỉ làm ngữ cảnh (xem state.context)."""
+        result = self.decode_from(levels, previous)
+        if start == 0 and stop == len(levels):
+            return result
+        first, last = start // self.group_symbols, -(-stop // self.group_symbols)
+        bits = result.bits.unpack()[first * self.group_bits:last * self.group_bits]
+        return decoders.DecodeResult(BitBuffer.from_bits(bits), result.invalid[first:last])
+
+    def raise_on_invalid(self, levels, invalid, offset=0):
+        """ValueError cho ký hiệu lỗi đầu tiên trong mặt nạ `invalid` (mỗi phần tử một nhóm ký hiệu), nếu có.
+
+        `offset` là vị trí của `levels[0]` trong tín hiệu, chỉ dùng trong thông báo.
+        """
+        if not np.any(invalid):
+            return
+        if self.explain is not None:
+            self.explain(levels, invalid)
+        first = int(np.flatnonzero(invalid)[0]) * self.group_symbols
+        found = [int(level) for level in levels[first:first + self.group_symbols]]
+        raise ValueError(f"Lỗi tín hiệu {self.label}: ký hiệu {found} không hợp lệ tại vị trí {offset + first}.")
+
+    def __repr__(self):
+        return f"Codec({self.name!r}, symbols_per_bit={self.symbols_per_bit}, alphabet={self.alphabet})"
+
+# === ĐĂNG KÝ VÀ TRA CỨU ===
+_CODECS = {}
+
+def register(codec, replace=False):
+    """Đăng ký `codec` theo tên (`replace=True` để thay mã cùng tên), trả về chính nó."""
+    if codec.name in _CODECS and not replace:
+        raise ValueError(f"Mã đường truyền {codec.name!r} đã được đăng ký.")
+    _CODECS[codec.name] = codec
+    return codec
+
+def get(name):
+    """Codec tên `name`; ValueError nếu chưa đăng ký."""
+    try:
+        return _CODECS[name]
+    except KeyError:
+        raise ValueError(f"Không hỗ trợ mã đường truyền {name!r} (chọn một trong {', '.join(_CODECS)}).") from None
+
+def find(name):
+    """Codec tên `name`, None nếu không có (ví dụ file tín hiệu không ghi mã)."""
+    return _CODECS.get(name)
+
+def names():
+    """Tên các mã theo thứ tự đăng ký (thứ tự trong các menu)."""
+    return list(_CODECS)
+
+# === CÁC MÃ CÀI SẴN ===
+_BUILTIN = [
+    ("unipolar", "Unipolar", None),
+    ("nrz-l", "NRZ-L", None),
+    ("nrz-i", "NRZ-I", PolarityState(1)),
+    ("rz", "RZ", None),
+    ("manchester", "Manchester", None),
+    ("diffmanchester", "Diff-Manchester", PolarityState(1)),
+    ("ami", "AMI", PolarityState(-1, pulses=True)),
+    ("pseudoternary", "Pseudoternary", PolarityState(-1, pulses=True)),
+    ("2b1q", "2B1Q", PolarityState(1, mask=0xAA)),
+]
+for _name, _label, _state in _BUILTIN:
+    register(Codec(_name, encoders.ENCODERS[_name], decoders.DECODERS[_name], encoders.SYMBOLS_PER_BIT[_name],
+                   encoders.ALPHABETS[_name], _state, _label,
+                   explain=two_b_one_q.raise_on_invalid if _name == "2b1q" else None))
+
+for _module in PLUGINS:
+    importlib.import_module(_module)
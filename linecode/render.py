@@ -0,0 +1,115 @@
+"""Xuất ảnh PNG/SVG của tín hiệu hàng loạt, không cần màn hình.
+
+Dùng thẳng Figure + FigureCanvasAgg (không qua pyplot, không nạp backend
+giao diện). Mỗi tiến trình giữ một Renderer cho mỗi kích thước ảnh: một
+Figure/Axes, một đường vẽ, kiểu trục và font dựng sẵn; mỗi file chỉ thay dữ
+liệu, trục tung và tiêu đề rồi ghi.
+Ví dụ:
+    render_batch(["a.lcs", "b.lcs", ("anh.lca", "meo.png")], "thumbs/", fmt="svg", processes=8)
+"""
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from linecode import registry
+from linecode.archive import Archive
+from linecode.waveform import WaveformPlot, WaveformSource, set_levels, style_axes
+
+FONT = 'Times New Roman'
+
+@functools.lru_cache(maxsize=None)
+def use_font(family=FONT):
+    """Đặt font cho matplotlib một lần mỗi tiến trình; font không có thì giữ font mặc định.
+
+    Trả về tên font thực sự được dùng.
+    """
+    import matplotlib
+    from matplotlib import font_manager
+    try:
+        font_manager.findfont(family, fallback_to_default=False)
+    except ValueError:
+        return matplotlib.rcParams['font.family'][0]
+    matplotlib.rcParams['font.family'] = family
+    return family
+
+class Renderer:
+    """Một Figure/Axes dùng lại cho nhiều ảnh (kích thước tính bằng inch như matplotlib)."""
+
+    def __init__(self, size=(12, 4), dpi=100, font=FONT):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        use_font(font)
+        self.figure = Figure(figsize=size, dpi=dpi)
+        FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+        style_axes(self.ax)
+        self.plot = WaveformPlot(self.ax, WaveformSource([]))
+        # Bố cục tính một lần, có chừa chỗ cho tiêu đề
+        self.ax.set_title(' ')
+        self.figure.tight_layout()
+        # tight_layout để lại một layout engine giữ chỗ, khiến savefig vẽ thêm một lượt trước khi ghi
+        self.figure.set_layout_engine(None)
+
+    def render(self, signal, output, title=None, start=0, stop=None, bits=None, code=None):
+        """Vẽ đoạn [start, stop) của tín hiệu (mảng, SignalFile hoặc đường dẫn) và ghi ra `output`.
+
+        Định dạng ảnh lấy theo đuôi file (.png, .svg, ...).
+        """
+        source = WaveformSource(signal)
+        code = code or source.code
+        codec = registry.find(code)
+        self.plot.set_source(source, bits, codec.symbols_per_bit if codec else 1)
+        set_levels(self.ax, codec.alphabet if codec else source.levels())
+        self.ax.set_title(title or '')
+        stop = source.length if stop is None else min(stop, source.length)
+        # Khung nhìn có thể trùng với ảnh trước nên không dựa vào sự kiện xlim_changed
+        self.ax.set_xlim(start, max(stop, start + 1), emit=False)
+        self.plot.redraw()
+        self.figure.savefig(output)
+        return output
+
+@functools.lru_cache(maxsize=None)
+def renderer(size=(12, 4), dpi=100, font=FONT):
+    """Renderer dùng chung trong tiến trình cho mỗi bộ tham số (dựng ở lần gọi đầu)."""
+    return Renderer(size, dpi, font)
+
+# === XUẤT HÀNG LOẠT ===
+def output_path(item, output_dir, fmt='png'):
+    """Tên ảnh: <tên file tín hiệu>.<định dạng> (bản ghi trong kho: <tên kho>.<tên bản ghi>.<định dạng>)."""
+    name = f"{os.path.basename(item[0])}.{item[1]}" if isinstance(item, tuple) else os.path.basename(item)
+    return os.path.join(output_dir, f"{name}.{fmt}")
+
+def _render_one(task):
+    """Vẽ một file hoặc bản ghi (kho, tên), trả về (file ảnh, None) hoặc (None, thông báo lỗi).
+
+    Chạy được trong tiến trình con.
+    """
+    item, output, start, stop, size, dpi, font = task
+    try:
+        if isinstance(item, tuple):
+            path, name = item
+            archive = Archive(path)
+            if name not in archive:
+                raise ValueError(f"Kho không có bản ghi {name!r}.")
+            signal, title = archive[name], f"{os.path.basename(path)}:{name}"
+        else:
+            signal, title = item, os.path.basename(item)
+        return renderer(size, dpi, font).render(signal, output, title, start, stop), None
+    except (OSError, ValueError) as e:
+        return None, str(e)
+
+def render_batch(paths, output_dir, fmt='png', processes=None, size=(12, 4), dpi=100,
+                 start=0, stop=None, font=FONT):
+    """Xuất ảnh cho mỗi file tín hiệu hoặc bản ghi (kho .lca, tên), trả về [(file ảnh, lỗi)] theo thứ tự đầu vào.
+
+    Mỗi tiến trình con dựng một Renderer ở file đầu tiên nó nhận và dùng lại
+    cho các file sau; file lỗi không làm dừng cả lô. `processes=1` vẽ ngay
+    trong tiến trình hiện tại.
+    """
+    tasks = [(item, output_path(item, output_dir, fmt), start, stop, tuple(size), dpi, font) for item in paths]
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(tasks) <= 1:
+        return [_render_one(task) for task in tasks]
+    chunksize = max(1, len(tasks) // (processes * 4))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(_render_one, tasks, chunksize=chunksize))
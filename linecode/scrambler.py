@@ -0,0 +1,100 @@
+"""Xáo trộn bit (scrambler) trước khi mã hóa đường truyền, tùy chọn.
+
+Dữ liệu nhiều bit 0 (hoặc 1) liên tiếp làm tín hiệu NRZ-L/AMI/MLT-3 đứng yên
+lâu và có thành phần DC; xáo trộn biến chúng thành chuỗi trông ngẫu nhiên
+mà không tốn thêm bit nào:
+    additive        cộng (XOR) với dãy giả ngẫu nhiên x^11 + x^9 + 1 như 100BASE-TX,
+                    bắt đầu từ trạng thái toàn bit 1; lỗi bit không lan nhưng bên thu
+                    phải đồng bộ với đầu luồng
+    multiplicative  tự đồng bộ x^23 + x^18 + 1 (như ITU-T V.34): y[n] = x[n] ^ y[n-18] ^ y[n-23],
+                    trạng thái đầu toàn bit 1 (để dữ liệu toàn bit 0 vẫn được xáo trộn);
+                    không cần đồng bộ nhưng mỗi bit lỗi thành 3 bit lỗi khi giải xáo trộn
+Cả hai tính trên toàn mảng: dãy cộng là 2047 byte dựng sẵn lặp lại (chu kỳ 2047
+bit, 8 chu kỳ vừa trọn byte); bộ nhân là một số nguyên lớn, hồi quy được khai
+triển bằng cách bình phương đa thức (mỗi lượt gấp đôi độ dài đã xáo trộn).
+Kiểu xáo trộn được ghi vào payload "scrambler" của file tín hiệu.
+Ví dụ:
+    bits = scramble(data, "additive")
+    data = descramble(decoded_bits, "additive").tobytes()
+"""
+import functools
+
+import numpy as np
+
+from linecode.bitbuffer import BitBuffer, as_packed
+
+SCRAMBLERS = ('additive', 'multiplicative')
+# Các nhánh hồi tiếp (độ trễ tính bằng bit)
+ADDITIVE_TAPS = (9, 11)
+MULTIPLICATIVE_TAPS = (18, 23)
+
+def _check(kind):
+    if kind not in SCRAMBLERS:
+        raise ValueError(f"Không hỗ trợ kiểu xáo trộn {kind!r} (chọn một trong {', '.join(SCRAMBLERS)}).")
+
+# === XÁO TRỘN CỘNG ===
+@functools.lru_cache(maxsize=None)
+def _additive_key():
+    """Dãy x^11 + x^9 + 1 đủ 8 chu kỳ (2047 byte), dựng một lần mỗi tiến trình."""
+    short, long = ADDITIVE_TAPS
+    period = (1 << long) - 1
+    bits = np.ones(period * 8 + long, dtype=np.uint8)
+    # s[n] = s[n-9] ^ s[n-11]: mỗi lượt tính 9 bit bằng phép toán mảng
+    for n in range(long, bits.size, short):
+        end = min(n + short, bits.size)
+        np.bitwise_xor(bits[n - short:end - short], bits[n - long:end - long], out=bits[n:end])
+    return np.packbits(bits[:period * 8])
+
+def _additive(data):
+    packed, nbits = as_packed(data)
+    size = -(-nbits // 8)
+    out = np.resize(_additive_key(), size)
+    out ^= packed[:size]
+    if nbits % 8:
+        out[-1] &= 0xFF << (8 - nbits % 8) & 0xFF
+    return BitBuffer(out, nbits)
+
+# === XÁO TRỘN NHÂN ===
+def _to_int(data):
+    """Chuỗi bit thành số nguyên (bit đầu là bit cao nhất), kèm số bit."""
+    packed, nbits = as_packed(data)
+    size = -(-nbits // 8)
+    return int.from_bytes(packed[:size].tobytes(), 'big') >> (size * 8 - nbits), nbits
+
+def _from_int(value, nbits):
+    size = -(-nbits // 8)
+    packed = np.frombuffer((value << (size * 8 - nbits)).to_bytes(size, 'big'), dtype=np.uint8)
+    return BitBuffer(packed, nbits)
+
+def _seed(nbits):
+    """Phần đóng góp của trạng thái đầu toàn bit 1: y[n-18] ^ y[n-23] = 1 với 18 <= n < 23."""
+    short, long = MULTIPLICATIVE_TAPS
+    count = max(min(long, nbits) - short, 0)
+    return ((1 << count) - 1) << (nbits - short - count) if count else 0
+
+def _multiplicative(data):
+    # Chia cho 1 + P với P = x^18 + x^23: nhân (1 + P)(1 + P^2)(1 + P^4)... trên GF(2),
+    # P^(2^j) = x^(18*2^j) + x^(23*2^j); dừng khi độ trễ nhỏ nhất vượt quá độ dài
+    value, nbits = _to_int(data)
+    value ^= _seed(nbits)
+    short, long = MULTIPLICATIVE_TAPS
+    while short < nbits:
+        value ^= (value >> short) ^ (value >> long)
+        short, long = short * 2, long * 2
+    return _from_int(value, nbits)
+
+def _demultiplicative(data):
+    value, nbits = _to_int(data)
+    short, long = MULTIPLICATIVE_TAPS
+    return _from_int(value ^ (value >> short) ^ (value >> long) ^ _seed(nbits), nbits)
+
+# === GIAO DIỆN ===
+def scramble(data, kind):
+    """Xáo trộn chuỗi bit (BitBuffer, bytes, mảng bit hoặc chuỗi '0'/'1'), trả về BitBuffer cùng số bit."""
+    _check(kind)
+    return _additive(data) if kind == 'additive' else _multiplicative(data)
+
+def descramble(data, kind):
+    """Ngược của scramble."""
+    _check(kind)
+    return _additive(data) if kind == 'additive' else _demultiplicative(data)
@@ -0,0 +1,284 @@
+import json
+import os
+import struct
+import warnings
+
+import numpy as np
+
+from linecode import registry
+
+# === ĐỊNH DẠNG FILE TÍN HIỆU NHỊ PHÂN (.lcs) ===
+# [MAGIC 4 byte][phiên bản 1 byte][3 byte trống][độ dài header 4 byte]
+# [header JSON, đệm khoảng trắng tới bội số 64 byte][dữ liệu ký hiệu]
+#
+# Header ghi mã đường truyền, số ký hiệu/bit, tập mức, kiểu lưu trữ, số ký
+# hiệu và thông tin payload (shape/dtype). Kiểu lưu trữ:
+#   'int8'  - mỗi ký hiệu một byte có dấu
+#   'bits1' - chỉ số mức 1 bit (tập 2 mức), 8 ký hiệu/byte
+#   'bits2' - chỉ số mức 2 bit (tập 3-4 mức), 4 ký hiệu/byte
+MAGIC = b'LCSG'
+VERSION = 1
+_PREFIX = struct.Struct('<4sB3xI')
+_ALIGN = 64
+# Chừa chỗ để ghi lại header khi biết số ký hiệu cuối cùng (tối đa 20 chữ số)
+_SLACK = 32
+_SYMBOLS_PER_BYTE = {'int8': 1, 'bits1': 8, 'bits2': 4}
+
+def _storage_for(alphabet):
+    """Chọn kiểu lưu trữ gọn nhất cho tập mức."""
+    if alphabet is None or len(alphabet) > 4:
+        return 'int8'
+    return 'bits1' if len(alphabet) <= 2 else 'bits2'
+
+def _index_table(alphabet):
+    """Bảng 256 phần tử: mức (byte int8) → chỉ số trong tập mức, 255 nếu không thuộc tập."""
+    table = np.full(256, 255, dtype=np.uint8)
+    for index, level in enumerate(alphabet):
+        table[np.uint8(np.int8(level))] = index
+    return table
+
+def _level_table(alphabet, storage):
+    """Bảng 256 phần tử: byte đã đóng gói → khối 8 (bits1) hoặc 4 (bits2) mức int8."""
+    per_byte = _SYMBOLS_PER_BYTE[storage]
+    width = 8 // per_byte
+    codes = np.arange(256, dtype=np.uint8)[:, None]
+    shifts = np.arange(8 - width, -1, -width, dtype=np.uint8)
+    indices = (codes >> shifts) & ((1 << width) - 1)
+    levels = np.zeros(1 << width, dtype=np.int8)
+    levels[:len(alphabet)] = alphabet
+    blocks = np.ascontiguousarray(levels[indices])
+    return blocks.view(np.uint64 if per_byte == 8 else np.uint32).ravel()
+
+def _build_header(code, alphabet, storage, length, payload, size=None):
+    """Tạo phần đầu file (đã căn lề, hoặc đệm đúng `size` byte) cho các tham số cho trước."""
+    codec = registry.find(code)
+    header = {
+        "code": code,
+        "symbols_per_bit": codec.symbols_per_bit if codec else None,
+        "alphabet": None if alphabet is None else [int(level) for level in alphabet],
+        "storage": storage,
+        "length": int(length),
+        "payload": payload,
+    }
+    text = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    if size is None:
+        size = -(-(_PREFIX.size + len(text) + _SLACK) // _ALIGN) * _ALIGN
+    elif _PREFIX.size + len(text) > size:
+        raise RuntimeError("Header vượt quá vùng đã chừa sẵn.")
+    text = text.ljust(size - _PREFIX.size)
+    return _PREFIX.pack(MAGIC, VERSION, len(text)) + text
+
+# === GHI FILE ===
+class SignalWriter:
+    """Ghi tín hiệu vào file .lcs theo từng khối; số ký hiệu được cập nhật khi đóng.
+
+    Với `file` (file nhị phân đã mở), bản ghi .lcs được ghi từ vị trí hiện
+    tại của file đó và file không bị đóng (dùng cho kho nhiều ảnh, linecode.archive).
+    """
+
+    def __init__(self, path, code=None, alphabet=None, storage=None, payload=None, file=None):
+        if alphabet is None and registry.find(code):
+            alphabet = registry.get(code).alphabet
+        self.path = path
+        self.code = code
+        self.alphabet = alphabet
+        self.storage = storage or _storage_for(alphabet)
+        self.payload = payload
+        self.length = 0
+        self._pending = np.zeros(0, dtype=np.uint8)
+        self._index = None if self.storage == 'int8' else _index_table(alphabet)
+        self._owns_file = file is None
+        self._file = open(path, 'wb') if file is None else file
+        self._start = self._file.tell()
+        self._closed = False
+        self._header_size = len(_build_header(code, alphabet, self.storage, 0, payload))
+        self._file.write(b'\0' * self._header_size)
+
+    def write(self, signal):
+        """Ghi thêm một khối mức tín hiệu."""
+        levels = np.asarray(signal)
+        if levels.dtype != np.int8:
+            levels = levels.astype(np.int8)
+        levels = levels.ravel()
+        self.length += levels.size
+        if self.storage == 'int8':
+            self._file.write(levels.tobytes())
+            return
+        indices = self._index[levels.view(np.uint8)]
+        if indices.size and indices.max() == 255:
+            raise ValueError(f"Tín hiệu có mức không thuộc tập {list(self.alphabet)}.")
+        if self._pending.size:
+            indices = np.concatenate([self._pending, indices])
+        per_byte = _SYMBOLS_PER_BYTE[self.storage]
+        whole = indices.size - indices.size % per_byte
+        self._pending = indices[whole:]
+        self._file.write(self._pack(indices[:whole]).tobytes())
+
+    def _pack(self, indices):
+        """Đóng gói chỉ số mức (độ dài là bội số của số ký hiệu/byte)."""
+        if self.storage == 'bits1':
+            return np.packbits(indices)
+        quads = indices.reshape(-1, 4)
+        return (quads[:, 0] << 6) | (quads[:, 1] << 4) | (quads[:, 2] << 2) | quads[:, 3]
+
+    def close(self):
+        """Ghi phần còn dư và cập nhật header."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._pending.size:
+            per_byte = _SYMBOLS_PER_BYTE[self.storage]
+            padded = np.zeros(per_byte, dtype=np.uint8)
+            padded[:self._pending.size] = self._pending
+            self._file.write(self._pack(padded).tobytes())
+            self._pending = self._pending[:0]
+        header = _build_header(self.code, self.alphabet, self.storage, self.length, self.payload,
+                               self._header_size)
+        self._file.seek(self._start)
+        self._file.write(header)
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.seek(0, os.SEEK_END)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def write_signal(path, signal, code=None, alphabet=None, storage=None, payload=None):
+    """Ghi toàn bộ tín hiệu vào file .lcs (tự chuyển sang int8 nếu có mức lạ)."""
+    levels = np.asarray(signal, dtype=np.int8).ravel()
+    if storage != 'int8':
+        try:
+            with SignalWriter(path, code, alphabet, storage, payload) as writer:
+                writer.write(levels)
+            return
+        except ValueError:
+            storage = 'int8'
+    with SignalWriter(path, code, alphabet, storage, payload) as writer:
+        writer.write(levels)
+
+class TextSignalWriter:
+    """Ghi tín hiệu theo khối vào file .txt kiểu cũ (mỗi dòng một số nguyên)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.length = 0
+        self._file = open(path, 'w')
+
+    def write(self, signal):
+        """Ghi thêm một khối mức tín hiệu."""
+        levels = np.asarray(signal).ravel()
+        self.length += levels.size
+        np.savetxt(self._file, levels, fmt='%d')
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# === ĐỌC FILE ===
+class SignalFile:
+    """File .lcs mở bằng np.memmap: chỉ phần được đọc mới nạp vào bộ nhớ."""
+
+    def __init__(self, path, offset=0):
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            prefix = f.read(_PREFIX.size)
+            if len(prefix) < _PREFIX.size:
+                raise ValueError(f"{path} không phải file tín hiệu .lcs")
+            magic, version, size = _PREFIX.unpack(prefix)
+            if magic != MAGIC:
+                raise ValueError(f"{path} không phải file tín hiệu .lcs")
+            if version > VERSION:
+                raise ValueError(f"Không hỗ trợ phiên bản file tín hiệu {version}")
+            self.header = json.loads(f.read(size).decode('utf-8'))
+        self.path = path
+        self.code = self.header["code"]
+        self.alphabet = self.header["alphabet"]
+        self.storage = self.header["storage"]
+        self.payload = self.header["payload"]
+        self.symbols_per_bit = self.header["symbols_per_bit"]
+        self.length = self.header["length"]
+        per_byte = _SYMBOLS_PER_BYTE[self.storage]
+        nbytes = -(-self.length // per_byte)
+        dtype = np.int8 if self.storage == 'int8' else np.uint8
+        if nbytes:
+            self.raw = np.memmap(path, dtype=dtype, mode='r',
+                                 offset=offset + _PREFIX.size + size, shape=(nbytes,))
+        else:
+            self.raw = np.zeros(0, dtype=dtype)
+        self._levels = None if self.storage == 'int8' else _level_table(self.alphabet, self.storage)
+
+    def __len__(self):
+        return self.length
+
+    def read(self, start=0, stop=None):
+        """Đọc các mức từ ký hiệu `start` tới `stop` (chỉ giải nén phần cần thiết)."""
+        stop = self.length if stop is None else min(stop, self.length)
+        start = min(max(start, 0), stop)
+        if self.storage == 'int8':
+            return self.raw[start:stop]
+        per_byte = _SYMBOLS_PER_BYTE[self.storage]
+        first = start // per_byte
+        block = np.take(self._levels, self.raw[first:-(-stop // per_byte)]).view(np.int8)
+        return block[start - first * per_byte:stop - first * per_byte]
+
+    def levels(self):
+        """Toàn bộ tín hiệu int8 (với 'int8' là chính vùng memmap, không sao chép)."""
+        return self.read()
+
+    def chunks(self, size):
+        """Duyệt tín hiệu theo từng khối `size` ký hiệu."""
+        for start in range(0, self.length, size):
+            yield self.read(start, start + size)
+
+def open_signal(path):
+    """Mở file .lcs"""
+    return SignalFile(path)
+
+def is_signal_file(path):
+    """Kiểm tra file có phải định dạng .lcs hay không."""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def _bad_text_line(path):
+    """Số dòng (từ 1) và nội dung dòng đầu tiên không phải một mức int8 trong file .txt kiểu cũ."""
+    with open(path, 'r') as f:
+        for number, line in enumerate(f, 1):
+            value = line.strip()
+            if not value:
+                continue
+            try:
+                if -128 <= int(value) <= 127:
+                    continue
+            except ValueError:
+                pass
+            return number, value
+    return None
+
+def read_text_signal(path):
+    """Đọc file .txt kiểu cũ (mỗi dòng một số nguyên); giá trị lạ gây ValueError kèm số dòng."""
+    try:
+        with warnings.catch_warnings():
+            # File rỗng là tín hiệu rỗng, không cần cảnh báo
+            warnings.simplefilter('ignore', UserWarning)
+            return np.loadtxt(path, dtype=np.int8, ndmin=1)
+    except ValueError as e:
+        bad = _bad_text_line(path)
+        if bad is None:
+            raise ValueError(f"{path}: {e}") from None
+        number, value = bad
+        raise ValueError(f"{path}, dòng {number}: giá trị {value!r} không phải mức tín hiệu hợp lệ") from None
+
+def load_signal(path):
+    """Đọc tín hiệu từ file .lcs hoặc file .txt kiểu cũ."""
+    if is_signal_file(path):
+        return open_signal(path).levels()
+    return read_text_signal(path)
@@ -0,0 +1,172 @@
+import numpy as np
+
+from linecode import decoders, registry
+from linecode.bitbuffer import BitBuffer, as_packed
+
+# === MÃ HÓA THEO KHỐI ===
+# Trạng thái giữa các khối (cờ đảo dấu, mức cuối, pha MLT-3...) do
+# codec.state quản lý (xem linecode.registry); mã nhóm nhiều bit một ký hiệu
+# (2B1Q) giữ lại các bit lẻ cuối khối, mã nhiều ký hiệu một bit (Manchester)
+# giữ lại các ký hiệu lẻ, để ghép với khối sau. Mã cần nhìn trước (B8ZS,
+# HDB3) giữ lại `lookahead` bit cuối khối: chúng được mã hóa ở khối sau, khối
+# này chỉ dùng chúng để quyết định các ký hiệu cuối.
+class StreamEncoder:
+    """Mã hóa dữ liệu theo từng khối, cho kết quả trùng với mã hóa một lần."""
+
+    def __init__(self, code):
+        self.code = code
+        self.codec = registry.get(code)
+        self.state = self.codec.state.initial
+        self._pending = None
+        self._held = np.zeros(0, dtype=np.uint8)
+
+    def feed(self, chunk):
+        """Mã hóa một khối bit (BitBuffer, bytes, mảng bit hoặc chuỗi '0'/'1')."""
+        if self.codec.group_bits > 1:
+            chunk = self._align(chunk)
+        if self.codec.state.lookahead:
+            return self._look_ahead(chunk)
+        return self._encode(chunk)
+
+    def _encode(self, chunk, ahead=0):
+        signal, self.state = self.codec.state.encode(self.codec.encode, chunk, self.state, ahead)
+        return signal
+
+    def _look_ahead(self, chunk):
+        """Mã hóa các bit giữ lại lần trước cùng khối mới, giữ lại `lookahead` bit cuối làm phần nhìn trước."""
+        packed, nbits = as_packed(chunk)
+        bits = np.concatenate([self._held, np.unpackbits(packed, count=nbits)])
+        ahead = min(self.codec.state.lookahead, bits.size)
+        self._held = bits[bits.size - ahead:]
+        return self._encode(bits, ahead)
+
+    def _align(self, chunk):
+        """Giữ lại các bit cuối khối chưa đủ nhóm để ghép với khối sau."""
+        group = self.codec.group_bits
+        packed, nbits = as_packed(chunk)
+        if self._pending is None and nbits % group == 0:
+            return BitBuffer(packed, nbits)
+        bits = np.unpackbits(packed, count=nbits)
+        if self._pending is not None:
+            bits = np.concatenate([self._pending, bits])
+        whole = bits.size - bits.size % group
+        self._pending = bits[whole:] if whole < bits.size else None
+        return bits[:whole]
+
+    def flush(self):
+        """Mã hóa phần còn giữ lại (bit lẻ cuối của 2B1Q, bit nhìn trước của B8ZS/HDB3) và kết thúc luồng."""
+        pending, self._pending = self._pending, None
+        held, self._held = self._held, np.zeros(0, dtype=np.uint8)
+        if held.size:
+            return self._encode(held)
+        if pending is None:
+            return np.zeros(0, dtype=np.int8)
+        return self._encode(pending)
+
+# === GIẢI MÃ THEO KHỐI ===
+# Mã cần ngữ cảnh hai bên (codec.state.context) giữ lại `back` ký hiệu đã giải
+# mã và `ahead` ký hiệu chưa giải mã cuối khối; `previous` khi đó là trạng
+# thái ở đầu phần giữ lại.
+class StreamDecoder:
+    """Giải mã tín hiệu theo từng khối, cho kết quả trùng với giải mã một lần."""
+
+    def __init__(self, code):
+        self.code = code
+        self.codec = registry.get(code)
+        self.previous = self.codec.state.previous
+        self._pending = np.zeros(0, dtype=np.int8)
+        self._window = np.zeros(0, dtype=np.int8)
+        self._decoded = 0
+
+    def feed(self, chunk):
+        """Giải mã một khối mức tín hiệu, trả về DecodeResult."""
+        levels = decoders.as_levels(chunk)
+        group = self.codec.group_symbols
+        if group > 1:
+            if self._pending.size:
+                levels = np.concatenate([self._pending, levels])
+            whole = levels.size - levels.size % group
+            self._pending = levels[whole:].copy()
+            levels = levels[:whole]
+        if self.codec.state.context != (0, 0):
+            return self._decode_context(levels, self.codec.state.context[1])
+        return self._decode(levels)
+
+    def _decode_context(self, levels, ahead):
+        """Giải mã khối kèm phần giữ lại, trừ `ahead` ký hiệu cuối (để lại làm ngữ cảnh cho khối sau)."""
+        back = self.codec.state.context[0]
+        levels = np.concatenate([self._window, levels])
+        stop = max(levels.size - ahead, self._decoded)
+        result = self.codec.decode_window(levels, self.previous, self._decoded, stop)
+        first = max(stop - back, 0)
+        self.previous = self.codec.state.carry(lambda start, stop: levels[start:stop], 0, first, self.previous)
+        self._window = levels[first:]
+        self._decoded = stop - first
+        return result
+
+    def _decode(self, levels):
+        result = self.codec.decode_from(levels, self.previous)
+        self.previous = self.codec.state.carry(lambda start, stop: levels[start:stop], 0, levels.size, self.previous)
+        return result
+
+    def flush(self):
+        """Giải mã phần chu kỳ bit còn dư (nếu có) và kết thúc luồng."""
+        pending, self._pending = self._pending, np.zeros(0, dtype=np.int8)
+        if self.codec.state.context != (0, 0):
+            return self._decode_context(pending, 0)
+        return self._decode(pending)
+
+# === XỬ LÝ FILE THEO KHỐI ===
+class BitWriter:
+    """Ghi các khối bit giải mã vào `sink` dạng bytes; bit lẻ byte cuối khối được giữ lại ghép với khối sau."""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self._tail = np.zeros(0, dtype=np.uint8)
+
+    def write(self, bits):
+        if not self._tail.size and bits.nbits % 8 == 0:
+            self.sink.write(bits.packed)
+            return
+        tail = np.concatenate([self._tail, bits.unpack()])
+        whole = tail.size - tail.size % 8
+        self.sink.write(np.packbits(tail[:whole]))
+        self._tail = tail[whole:]
+
+    def close(self):
+        """Ghi nốt các bit còn giữ lại (byte cuối đệm bit 0)."""
+        tail, self._tail = self._tail, np.zeros(0, dtype=np.uint8)
+        self.sink.write(np.packbits(tail))
+
+def encode_chunks(chunks, writer, code):
+    """Mã hóa lần lượt các khối bit từ `chunks` và ghi tín hiệu vào `writer`."""
+    encoder = StreamEncoder(code)
+    for chunk in chunks:
+        writer.write(encoder.feed(chunk))
+    writer.write(encoder.flush())
+
+def encode_stream(source, writer, code, chunk_size=1 << 20):
+    """Đọc bytes từ file nhị phân/pipe `source` theo khối và ghi tín hiệu vào `writer`."""
+    encode_chunks(iter(lambda: source.read(chunk_size), b''), writer, code)
+
+def decode_stream(signal_file, sink, chunk_size=1 << 23):
+    """Giải mã SignalFile theo khối, ghi bytes vào `sink`; trả về số ký hiệu lỗi.
+
+    Kích thước khối được làm tròn tới bội số của codec.block_symbols để mỗi
+    khối (trừ khối cuối) cho số bit chia hết cho 8 và ghi thẳng được ra `sink`.
+    Mã cần ngữ cảnh phía sau (B8ZS, HDB3) lệch đi vài bit: BitWriter giữ lại
+    các bit lẻ byte để ghép với khối sau.
+    """
+    decoder = StreamDecoder(signal_file.code)
+    align = decoder.codec.block_symbols
+    writer = BitWriter(sink)
+    errors = 0
+    for block in signal_file.chunks(max(chunk_size // align, 1) * align):
+        bits, invalid = decoder.feed(block)
+        errors += int(np.count_nonzero(invalid))
+        writer.write(bits)
+    bits, invalid = decoder.flush()
+    errors += int(np.count_nonzero(invalid))
+    writer.write(bits)
+    writer.close()
+    return errors
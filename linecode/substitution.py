@@ -0,0 +1,176 @@
+"""Mã thay thế trên nền AMI: B8ZS và HDB3 giữ đồng bộ khi có chuỗi bit 0 dài.
+
+AMI không có xung nào trong chuỗi bit 0 nên bộ thu mất đồng bộ. Hai mã thay
+mỗi nhóm bit 0 (đếm từ đầu mỗi đoạn bit 0) bằng một mẫu chứa vi phạm lưỡng
+cực V (xung cùng dấu với xung trước; p là dấu xung trước, B là xung đúng luật):
+    B8ZS  8 bit 0 → 000VB0VB = 0 0 0 p -p 0 -p p, cực tính sau mẫu không đổi
+    HDB3  4 bit 0 → 000V = 0 0 0 p nếu số xung từ lần thay trước là lẻ,
+                    B00V = -p 0 0 -p nếu chẵn; các V liên tiếp đổi dấu (không có DC)
+Mã hóa bằng phép toán mảng: vị trí các nhóm lấy từ chỉ số đầu/cuối các đoạn
+bit 0; dấu mọi xung là chẵn lẻ tích lũy của số bit 1 và số mẫu B00V đứng
+trước (chỉ mẫu B00V làm đổi cực tính). Bộ giải mã tìm các vi phạm: vi phạm
+đúng chỗ trong một mẫu thì cả mẫu là bit 0, vi phạm lạc chỗ bị đánh dấu lỗi.
+Ví dụ:
+    signal = registry.get("hdb3").encode(b"\\x80\\x00\\x00\\x01")
+"""
+import numpy as np
+
+from linecode import registry
+from linecode.bitbuffer import BitBuffer, as_packed
+from linecode.decoders import DecodeResult, as_levels
+
+# Mẫu thay thế khi dấu xung trước là +1 (nhân với dấu xung trước)
+B8ZS_PATTERN = np.array([0, 0, 0, 1, -1, 0, -1, 1], dtype=np.int8)
+HDB3_PATTERNS = np.array([[-1, 0, 0, -1],   # B00V
+                          [0, 0, 0, 1]],    # 000V
+                         dtype=np.int8)
+# Trạng thái bộ mã hóa ở đầu luồng: (dấu xung trước, chẵn lẻ số xung từ lần
+# thay trước, số bit 0 cuối khối trước chưa đủ nhóm); xung đầu tiên là +1 như AMI
+INITIAL = (-1, 0, 0)
+
+# === MÃ HÓA ===
+def _zero_groups(bits, size):
+    """Vị trí bắt đầu các nhóm `size` bit 0 liên tiếp, đếm từ đầu mỗi đoạn bit 0."""
+    padded = np.ones(bits.size + 2, dtype=np.int8)
+    padded[1:-1] = bits
+    edges = np.diff(padded)
+    starts = np.flatnonzero(edges == -1)
+    counts = (np.flatnonzero(edges == 1) - starts) // size
+    keep = counts > 0
+    starts, counts = starts[keep], counts[keep]
+    offset = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + offset * size
+
+def _exclusive_parity(bits):
+    """Chẵn lẻ của tổng các phần tử đứng trước mỗi vị trí (độ dài size + 1, uint8 tràn không đổi chẵn lẻ)."""
+    parity = np.zeros(bits.size + 1, dtype=np.uint8)
+    np.cumsum(bits, dtype=np.uint8, out=parity[1:])
+    parity &= 1
+    return parity
+
+def _encode(bits, size, state, ahead=0, levels=True):
+    """Mã hóa mảng bit tiếp nối `state` (xem INITIAL), trả về (tín hiệu, trạng thái).
+
+    `ahead` bit cuối chỉ dùng để nhìn trước: tín hiệu và trạng thái trả về
+    dừng trước chúng. Trạng thái được lấy ở đầu nhóm bit 0 còn dở cuối khối,
+    để khối sau ghép tiếp nhóm đó. Với `levels=False` chỉ tính trạng thái.
+    """
+    previous, parity, zeros = state
+    if zeros:
+        bits = np.concatenate((np.zeros(zeros, dtype=np.uint8), bits))
+    stop = bits.size - ahead
+    groups = _zero_groups(bits, size)
+    flips = bits.copy()
+    if size == 4:
+        # HDB3: B00V khi số xung từ lần thay trước (hoặc từ đầu luồng) là chẵn
+        ones = _exclusive_parity(bits)
+        counted = ones[groups]
+        since = counted.copy()
+        since[1:] ^= counted[:-1]
+        since[:1] ^= parity
+        bpv = since == 0
+        flips[groups[bpv]] = 1
+    sign = _exclusive_parity(flips)
+    del flips
+
+    # Nhóm bit 0 còn dở cuối phần được mã hóa bắt đầu ở `boundary`
+    tail = bits[:stop][::-1].view(np.bool_)
+    run = int(np.argmax(tail)) if tail.size and tail.any() else stop
+    boundary = stop - run % size
+    next_previous = previous if sign[boundary] == 0 else -previous
+    next_parity = 0
+    if size == 4:
+        done = int(np.searchsorted(groups, boundary))
+        base = ones[groups[done - 1]] if done else parity
+        next_parity = int(ones[boundary] ^ base)
+    next_state = (next_previous, next_parity, run % size)
+    if not levels:
+        return None, next_state
+
+    # Dấu xung đứng trước mỗi vị trí; bit 1 là xung ngược dấu xung trước
+    before = sign[:-1].view(np.int8)
+    before *= -2
+    before += 1
+    before *= previous
+    signal = before * bits.view(np.int8)
+    np.negative(signal, out=signal)
+    if groups.size:
+        p = before[groups][:, None]
+        patterns = B8ZS_PATTERN[None, :] if size == 8 else HDB3_PATTERNS[(~bpv).view(np.uint8)]
+        signal[groups[:, None] + np.arange(size)] = patterns * p
+    return signal[zeros:stop], next_state
+
+def b8zs(data):
+    """B8ZS: AMI, mỗi 8 bit 0 liên tiếp thay bằng 000VB0VB."""
+    packed, nbits = as_packed(data)
+    return _encode(np.unpackbits(packed, count=nbits), 8, INITIAL)[0]
+
+def hdb3(data):
+    """HDB3: AMI, mỗi 4 bit 0 liên tiếp thay bằng 000V hoặc B00V."""
+    packed, nbits = as_packed(data)
+    return _encode(np.unpackbits(packed, count=nbits), 4, INITIAL)[0]
+
+# === GIẢI MÃ ===
+def _decode(signal, previous, size):
+    levels = as_levels(signal)
+    n = levels.size
+    # Mức ngoài {-1, 0, +1} không được tính là xung (như AMI và last_pulse khi chia khối)
+    pulses = np.flatnonzero(np.abs(levels) == 1)
+    before = np.empty(pulses.size, dtype=np.int8)
+    before[:1] = previous
+    before[1:] = levels[pulses[:-1]]
+    violations = pulses[levels[pulses] == before]
+    bits = levels != 0
+    allowed = np.zeros(n, dtype=np.bool_)
+    if size == 8:
+        # 000VB0VB: vi phạm V đầu ở vị trí 3 của mẫu, V sau ở vị trí 6
+        starts = violations - 3
+        starts = starts[(starts >= 0) & (starts + 8 <= n)]
+        window = levels[starts[:, None] + np.arange(8)]
+        starts = starts[np.all(window == levels[starts + 3][:, None] * B8ZS_PATTERN, axis=1)]
+        allowed[starts + 3] = True
+        allowed[starts + 6] = True
+        bits[starts[:, None] + np.arange(8)] = False
+    else:
+        # 000V hoặc B00V: hai mức trước V là 0, mức thứ ba là 0 hoặc B cùng dấu V
+        ends = violations[violations >= 3]
+        ends = ends[(levels[ends - 1] == 0) & (levels[ends - 2] == 0)
+                    & ((levels[ends - 3] == 0) | (levels[ends - 3] == levels[ends]))]
+        allowed[ends] = True
+        bits[ends[:, None] - np.arange(4)] = False
+    invalid = (levels > 1) | (levels < -1)
+    invalid[violations] |= ~allowed[violations]
+    return DecodeResult(BitBuffer.from_bits(bits), invalid)
+
+def decode_b8zs(signal, previous=-1):
+    """Giải mã B8ZS; `previous` là dấu xung trước tín hiệu (mặc định -1: xung đầu là +1)."""
+    return _decode(signal, previous, 8)
+
+def decode_hdb3(signal, previous=-1):
+    """Giải mã HDB3; `previous` là dấu xung trước tín hiệu (mặc định -1: xung đầu là +1)."""
+    return _decode(signal, previous, 4)
+
+# === TRẠNG THÁI GIỮA CÁC KHỐI ===
+class SubstitutionState(registry.PolarityState):
+    """Trạng thái B8ZS/HDB3: bộ mã hóa giữ (dấu xung trước, chẵn lẻ số xung, số bit 0 dở), bộ giải mã giữ xung ±1 cuối.
+
+    Một nhóm `size` bit 0 có thể vắt qua ranh giới khối nên bộ mã hóa cần
+    nhìn trước `size` - 1 bit, bộ giải mã cần `size` - 1 ký hiệu ngữ cảnh mỗi bên.
+    """
+    initial = INITIAL
+
+    def __init__(self, size):
+        super().__init__(-1, pulses=True)
+        self.size = size
+        self.lookahead = size - 1
+        self.context = (size - 1, size - 1)
+
+    def encode(self, encode, data, state, ahead=0):
+        packed, nbits = as_packed(data)
+        return _encode(np.unpackbits(packed, count=nbits), self.size, state, ahead)
+
+    def advance(self, packed, state):
+        return _encode(np.unpackbits(packed), self.size, state, levels=False)[1]
+
+registry.register(registry.Codec("b8zs", b8zs, decode_b8zs, 1, (-1, 0, 1), SubstitutionState(8), "B8ZS"))
+registry.register(registry.Codec("hdb3", hdb3, decode_hdb3, 1, (-1, 0, 1), SubstitutionState(4), "HDB3"))
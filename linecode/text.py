@@ -0,0 +1,27 @@
+"""Chuyển văn bản ↔ chuỗi bit qua các byte đã mã hóa ký tự (mặc định UTF-8).
+
+Văn bản được mã hóa thành bytes bằng bảng mã `encoding` (ký tự ngoài
+Latin-1 như chữ tiếng Việt chiếm 2-4 byte trong UTF-8), rồi các byte được
+xem thẳng như chuỗi bit đóng gói: một bước chuyển cả khối, không định dạng
+từng ký tự. Khi giải mã chỉ các byte trọn vẹn được dùng; byte không hợp lệ
+được xử lý theo chính sách `errors` của bytes.decode (mặc định 'replace':
+thay bằng U+FFFD thay vì dừng hay bỏ qua lặng lẽ).
+Ví dụ:
+    bits = text_to_bits("Xin chào")
+    text = bits_to_text(decoders.ami(encoders.ami(bits)).bits)
+"""
+from linecode.bitbuffer import BitBuffer, as_packed
+
+ENCODING = 'utf-8'
+ERRORS = 'replace'
+
+def text_to_bits(text, encoding=ENCODING):
+    """Mã hóa văn bản bằng bảng mã `encoding`, trả về BitBuffer trên chính các byte đó (không sao chép)."""
+    return BitBuffer.from_bytes(text.encode(encoding))
+
+def bits_to_text(bits, encoding=ENCODING, errors=ERRORS):
+    """Ghép chuỗi bit (BitBuffer, chuỗi '0'/'1', mảng bit hoặc bytes) thành văn bản; bit lẻ cuối cùng bị bỏ."""
+    if isinstance(bits, str):
+        bits = BitBuffer.from_string(bits)
+    packed, nbits = as_packed(bits)
+    return packed[:nbits // 8].tobytes().decode(encoding, errors)
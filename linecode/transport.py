@@ -0,0 +1,274 @@
+"""Truyền tín hiệu qua socket (TCP hoặc Unix) giữa tiến trình mã hóa và tiến trình giải mã, dùng asyncio.
+
+Bên gửi đọc dữ liệu theo khối, mã hóa bằng StreamEncoder, cho qua khâu suy
+giảm kênh (tùy chọn) rồi gửi từng khối ký hiệu int8; bên nhận giải mã ngay
+bằng StreamDecoder và ghi bytes ra `sink`. Giao thức:
+    gửi  MAGIC, u32 độ dài + JSON {"code": ...}
+         mỗi khối: u32 số ký hiệu, u64 thời điểm lấy dữ liệu (monotonic, ns), các ký hiệu int8
+         khối 0 ký hiệu là kết thúc luồng
+    nhận u32 độ dài + JSON báo cáo (số khối, số bit, số ký hiệu lỗi, độ trễ, thời gian)
+Các khối được gom lại tới `batch_size` byte rồi mới ghi một lần (writelines);
+sau mỗi lần ghi bên gửi chờ drain(), nên khi bên nhận giải mã chậm, bộ đệm
+socket đầy và bên gửi tự dừng lại (back-pressure) thay vì dồn tín hiệu vào bộ
+nhớ. Độ trễ đầu-cuối của một khối tính từ lúc bên gửi lấy dữ liệu tới lúc bên
+nhận giải mã xong khối đó; đồng hồ monotonic dùng chung trong một máy nên chỉ
+có nghĩa khi hai tiến trình chạy cùng máy (loopback).
+Địa chỉ: "host:port" (hoặc "tcp://host:port") và "unix:/đường/dẫn".
+Ví dụ:
+    report = loopback(iter([data]), "hdb3", impair=impairment("flip:1e-4", "hdb3"))
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import struct
+import tempfile
+import time
+
+import numpy as np
+
+from linecode import registry
+from linecode.bitbuffer import as_packed
+from linecode.channel import slice_levels, transmit
+from linecode.stream import BitWriter, StreamDecoder, StreamEncoder
+
+MAGIC = b'LCTP'
+_LENGTH = struct.Struct('<I')
+_BLOCK = struct.Struct('<IQ')
+# Số byte dữ liệu mỗi khối mã hóa
+CHUNK_SIZE = 1 << 16
+# Số byte ký hiệu gom lại trước mỗi lần ghi socket
+BATCH_SIZE = 1 << 20
+# Ngưỡng bộ đệm ghi của bên gửi (vượt ngưỡng thì drain() chờ)
+HIGH_WATER = 4 << 20
+
+# === ĐỊA CHỈ ===
+def parse_address(address):
+    """'unix:/đường/dẫn' → ('unix', đường dẫn); 'host:port' hoặc 'tcp://host:port' → ('tcp', host, port)."""
+    if address.startswith('unix:'):
+        return ('unix', address[len('unix:'):])
+    host, _, port = address.removeprefix('tcp://').rpartition(':')
+    if not port.isdigit():
+        raise ValueError(f"Địa chỉ {address!r} không hợp lệ (dùng host:port hoặc unix:/đường/dẫn).")
+    return ('tcp', host or '127.0.0.1', int(port))
+
+async def _connect(address):
+    kind, *where = parse_address(address)
+    if kind == 'unix':
+        return await asyncio.open_unix_connection(where[0])
+    return await asyncio.open_connection(*where)
+
+def _message(obj):
+    data = json.dumps(obj).encode('utf-8')
+    return _LENGTH.pack(len(data)) + data
+
+async def _read_message(reader):
+    size, = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    return json.loads(await reader.readexactly(size))
+
+# === KHÂU SUY GIẢM KÊNH ===
+class SymbolErrors:
+    """Thay ngẫu nhiên mỗi ký hiệu bằng một mức khác trong tập mức với xác suất `rate`."""
+
+    def __init__(self, rate, alphabet, seed=None):
+        self.rate = rate
+        self.alphabet = np.asarray(alphabet, dtype=np.int8)
+        self.rng = np.random.default_rng(seed)
+
+    def __call__(self, levels):
+        hits = np.flatnonzero(self.rng.random(levels.size) < self.rate)
+        if not hits.size:
+            return levels
+        levels = levels.copy()
+        # Dịch vị trí trong tập mức đi 1..n-1 bước nên mức mới luôn khác mức cũ
+        index = np.searchsorted(np.sort(self.alphabet), levels[hits])
+        shift = self.rng.integers(1, self.alphabet.size, hits.size)
+        levels[hits] = np.sort(self.alphabet)[(index + shift) % self.alphabet.size]
+        return levels
+
+class NoisyChannel:
+    """Kênh AWGN của linecode.channel: truyền từng khối (suy hao, nhiễu) rồi so ngưỡng về mức gần nhất."""
+
+    def __init__(self, snr_db, alphabet, attenuation=1.0, seed=None):
+        self.snr_db = snr_db
+        self.alphabet = tuple(alphabet)
+        self.attenuation = attenuation
+        self.rng = np.random.default_rng(seed)
+
+    def __call__(self, levels):
+        samples = transmit(levels, self.snr_db, self.attenuation, rng=self.rng)
+        return slice_levels(samples, self.alphabet, scale=self.attenuation)
+
+def impairment(spec, code, seed=None):
+    """Khâu suy giảm theo mô tả dòng lệnh: 'flip:TỈ_LỆ' (lỗi ký hiệu) hoặc 'awgn:SNR_DB' (nhiễu + so ngưỡng)."""
+    kind, _, value = spec.partition(':')
+    alphabet = registry.get(code).alphabet
+    try:
+        value = float(value)
+    except ValueError:
+        value = None
+    if kind == 'flip' and value is not None:
+        return SymbolErrors(value, alphabet, seed)
+    if kind == 'awgn' and value is not None:
+        return NoisyChannel(value, alphabet, seed=seed)
+    raise ValueError(f"Khâu suy giảm {spec!r} không hợp lệ (dùng flip:TỈ_LỆ hoặc awgn:SNR_DB).")
+
+# === BÊN GỬI ===
+async def send(address, chunks, code, impair=None, batch_size=BATCH_SIZE, high_water=HIGH_WATER):
+    """Mã hóa các khối dữ liệu từ `chunks` và gửi tới bên nhận ở `address`, trả về báo cáo (dict).
+
+    Báo cáo của bên nhận được bổ sung số bit đã gửi, số lần ghi và thông
+    lượng đầu-cuối (bit dữ liệu / thời gian từ khối đầu tới lúc giải mã xong).
+    """
+    encoder = StreamEncoder(code)
+    reader, writer = await _connect(address)
+    writer.transport.set_write_buffer_limits(high=high_water)
+    writer.write(MAGIC + _message({"code": code}))
+    pending, size, writes, sent_bits = [], 0, 0, 0
+
+    async def flush():
+        nonlocal pending, size, writes
+        writer.writelines(pending)
+        pending, size = [], 0
+        writes += 1
+        await writer.drain()
+
+    def queue(signal, stamp):
+        nonlocal size
+        if impair is not None:
+            signal = impair(signal)
+        if signal.size:
+            pending.extend((_BLOCK.pack(signal.size, stamp), signal.tobytes()))
+            size += signal.size
+
+    try:
+        for chunk in chunks:
+            stamp = time.monotonic_ns()
+            sent_bits += as_packed(chunk)[1]
+            queue(encoder.feed(chunk), stamp)
+            if size >= batch_size:
+                await flush()
+        queue(encoder.flush(), time.monotonic_ns())
+        pending.append(_BLOCK.pack(0, 0))
+        await flush()
+        report = await _read_message(reader)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    seconds = report["seconds"]
+    report.update(sent_bits=sent_bits, writes=writes,
+                  mbit_per_s=sent_bits / seconds / 1e6 if seconds else None)
+    return report
+
+# === BÊN NHẬN ===
+def _latency(latencies):
+    """Thống kê độ trễ (ms) của các khối."""
+    if not latencies:
+        return None
+    values = np.asarray(latencies, dtype=np.float64) / 1e6
+    return {"mean": float(values.mean()), "p50": float(np.percentile(values, 50)),
+            "p99": float(np.percentile(values, 99)), "max": float(values.max())}
+
+async def receive(reader, writer, sink):
+    """Nhận một luồng trên kết nối (reader, writer), giải mã vào `sink` và gửi báo cáo về bên gửi."""
+    if await reader.readexactly(len(MAGIC)) != MAGIC:
+        raise ValueError("Kết nối không phải luồng tín hiệu linecode.")
+    header = await _read_message(reader)
+    code = header["code"]
+    decoder = StreamDecoder(code)
+    bits_out = BitWriter(sink)
+    blocks = symbols = nbits = errors = 0
+    first, latencies = None, []
+
+    def consume(result):
+        nonlocal nbits, errors
+        bits, invalid = result
+        bits_out.write(bits)
+        nbits += bits.nbits
+        errors += int(np.count_nonzero(invalid))
+
+    while True:
+        count, stamp = _BLOCK.unpack(await reader.readexactly(_BLOCK.size))
+        if not count:
+            break
+        levels = np.frombuffer(await reader.readexactly(count), dtype=np.int8)
+        first = stamp if first is None else first
+        consume(decoder.feed(levels))
+        latencies.append(time.monotonic_ns() - stamp)
+        blocks += 1
+        symbols += count
+    consume(decoder.flush())
+    bits_out.close()
+    seconds = (time.monotonic_ns() - first) / 1e9 if first is not None else 0.0
+    report = {"code": code, "blocks": blocks, "symbols": symbols, "bits": nbits, "invalid": errors,
+              "seconds": seconds, "latency_ms": _latency(latencies)}
+    writer.write(_message(report))
+    await writer.drain()
+    return report
+
+async def serve(address, open_sink=None, connections=None, ready=None):
+    """Nhận các luồng tại `address`; mỗi kết nối ghi vào `open_sink()` (mặc định bỏ đi).
+
+    Dừng sau `connections` kết nối nếu có; `ready(địa chỉ thực)` được gọi khi
+    đã lắng nghe (cổng 0 được thay bằng cổng hệ điều hành cấp). Trả về danh
+    sách báo cáo theo thứ tự kết nối xong.
+    """
+    reports = []
+    done = asyncio.Event()
+
+    async def handle(reader, writer):
+        sink = open_sink() if open_sink is not None else open(os.devnull, 'wb')
+        try:
+            with sink:
+                reports.append(await receive(reader, writer, sink))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            reports.append({"error": str(e)})
+        finally:
+            writer.close()
+            if connections is not None and len(reports) >= connections:
+                done.set()
+
+    kind, *where = parse_address(address)
+    if kind == 'unix':
+        server = await asyncio.start_unix_server(handle, where[0])
+        bound = address
+    else:
+        server = await asyncio.start_server(handle, *where)
+        host, port = server.sockets[0].getsockname()[:2]
+        bound = f"{host}:{port}"
+    async with server:
+        if ready is not None:
+            ready(bound)
+        if connections is None:
+            await server.serve_forever()
+        await done.wait()
+    if kind == 'unix' and os.path.exists(where[0]):
+        os.unlink(where[0])
+    return reports
+
+# === CHẠY CẢ HAI ĐẦU TRÊN MỘT MÁY ===
+def _serve_once(address, output, queue):
+    """Tiến trình nhận: một kết nối, ghi vào `output` (hoặc bỏ đi), báo địa chỉ thực qua `queue`."""
+    open_sink = (lambda: open(output, 'wb')) if output else None
+    asyncio.run(serve(address, open_sink, connections=1, ready=queue.put))
+
+def loopback(chunks, code, address=None, impair=None, output=None, batch_size=BATCH_SIZE):
+    """Chạy bên nhận trong một tiến trình riêng và gửi `chunks` tới nó, trả về báo cáo của send().
+
+    Mặc định dùng Unix socket trong thư mục tạm (TCP 127.0.0.1 với cổng tự
+    chọn nếu hệ điều hành không hỗ trợ).
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        if address is None:
+            address = f"unix:{os.path.join(directory, 'linecode.sock')}" if hasattr(asyncio, 'start_unix_server') \
+                else '127.0.0.1:0'
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_serve_once, args=(address, output, queue), daemon=True)
+        process.start()
+        try:
+            bound = queue.get(timeout=30)
+            return asyncio.run(send(bound, chunks, code, impair, batch_size))
+        finally:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
@@ -0,0 +1,113 @@
+"""Bộ mã hóa/giải mã 2B1Q dùng chung cho phần văn bản và phần ảnh.
+
+Mỗi cặp bit (dibit = 2·bit đầu + bit sau) cho một mức: bit đầu là 1 thì đổi
+dấu so với mức trước, bit sau là 1 thì biên độ bằng 3. Mức được đánh số theo
+LEVELS (mã mức 0..3), trạng thái duy nhất là dấu của mức trước.
+
+Chuỗi bit có độ dài lẻ được đệm thêm một bit 0 ở cuối, nên mức cuối là một
+mức hợp lệ (bản cũ cho mức 0); khi giải mã truyền `nbits` để bỏ bit đệm.
+"""
+import numpy as np
+
+from linecode.bitbuffer import BitBuffer, as_packed, byte_states, gather_bytes
+
+# === BẢNG MÃ ===
+LEVELS = np.array([-3, -1, 1, 3], dtype=np.int8)
+
+# LEVEL_TABLE[dấu mức trước (0: dương, 1: âm)][dibit] → mã mức (chỉ số trong LEVELS).
+# Chiều ngược lại không cần bảng: bit đầu = dấu đổi so với mức trước, bit sau = |mức| là 3.
+LEVEL_TABLE = np.array([[2, 3, 1, 0],
+                        [1, 0, 2, 3]], dtype=np.uint8)
+
+def _byte_table():
+    """Bảng 2×256: dòng 2·byte + dấu trước byte → 4 mức int8 (gói trong một uint32)."""
+    dibits = (np.arange(256, dtype=np.uint8)[:, None] >> np.array([6, 4, 2, 0], dtype=np.uint8)) & 3
+    blocks = np.empty((256, 2, 4), dtype=np.int8)
+    for state in (0, 1):
+        sign = np.full(256, state, dtype=np.uint8)
+        for k in range(4):
+            codes = LEVEL_TABLE[sign, dibits[:, k]]
+            blocks[:, state, k] = LEVELS[codes]
+            sign = (codes < 2).astype(np.uint8)
+    return blocks.reshape(512, 4).view(np.uint32).ravel()
+
+_BYTE_TABLE = _byte_table()
+
+# === MÃ HÓA ===
+def encode(data):
+    """Mã hóa 2B1Q, trả về mảng mức int8 (độ dài = số bit / 2, làm tròn lên).
+
+    Mỗi byte tra ra 4 mức; dấu trước mỗi byte là chẵn lẻ số bit đầu cặp của
+    các byte đứng trước, tính một lượt cho cả dãy (byte_states).
+    """
+    packed, nbits = as_packed(data)
+    packed = packed[:-(-nbits // 8)]
+    states = byte_states(packed & 0xAA)
+    blocks = gather_bytes(_BYTE_TABLE, packed, states)
+    if nbits % 8:
+        # Các bit sau `nbits` trong byte cuối (gồm bit đệm) đều là 0
+        last = int(packed[-1]) & (0xFF << (8 - nbits % 8)) & 0xFF
+        blocks[-1] = _BYTE_TABLE[2 * last + int(states[-1])]
+    return blocks.view(np.int8)[:-(-nbits // 2)]
+
+# === GIẢI MÃ ===
+def _pair_words():
+    """Bảng 256×256: (byte bit đầu, byte bit sau) → 16 bit xen kẽ bit đầu/bit sau của 8 mức."""
+    spread = np.zeros(256, dtype=np.uint16)
+    for bit in range(8):
+        spread |= ((np.arange(256, dtype=np.uint16) >> bit) & 1) << (2 * bit)
+    return (spread[:, None] << 1 | spread[None, :]).ravel()
+
+_PAIR_WORDS = _pair_words()
+
+def _legacy_bits(levels, previous, positions):
+    """Cặp bit tại `positions` theo quy tắc gốc (dùng cho mức lỗi và mức ngay sau đó)."""
+    current = levels[positions].astype(np.int16)
+    before = np.where(positions > 0, levels[positions - 1], previous).astype(np.int16)
+    flipped = ((current ^ before) < 0) & (current != 0) & (before != 0)
+    return flipped.astype(np.uint8) << 1 | (np.abs(current) == 3)
+
+def decode(levels, previous=1, nbits=None):
+    """Giải mã mảng mức int8, trả về (BitBuffer, mặt nạ lỗi theo từng mức).
+
+    `previous` là mức đứng trước khối (mặc định +1). Bit dấu và bit biên độ
+    được gói 8 mức một byte, bit đầu cặp là XOR bit dấu với bit dấu dịch một
+    mức, rồi hai dãy được xen nhau qua bảng _PAIR_WORDS. Mức lỗi (và mức
+    ngay sau nó) lấy bit theo quy tắc cũ. `nbits` cắt bỏ bit đệm ở cuối.
+    """
+    count = levels.size
+    # Mức hợp lệ ⇔ mức + 3 thuộc {0, 2, 4, 6}
+    shifted = levels.view(np.uint8) + np.uint8(3)
+    shifted &= 0xF9
+    invalid = shifted != 0
+    del shifted
+    signs = np.packbits(levels < 0)
+    amplitudes = np.packbits(np.abs(levels) == 3)
+    # Dấu của mức đứng trước từng mức: dịch dãy bit dấu sang phải một vị trí
+    before = signs >> 1
+    before[1:] |= signs[:-1] << 7
+    if before.size:
+        before[0] |= np.uint8(previous < 0) << 7
+    index = (signs ^ before).astype(np.uint16)
+    index <<= 8
+    index |= amplitudes
+    packed = gather_bytes(_PAIR_WORDS, index).astype('>u2').view(np.uint8)
+    start_valid = previous in (-3, -1, 1, 3)
+    if count and (not start_valid or invalid.any()):
+        touched = invalid.copy()
+        touched[1:] |= invalid[:-1]
+        touched[0] |= not start_valid
+        errors = np.flatnonzero(touched)
+        # Mỗi cặp bit nằm gọn trong một byte; dùng .at vì nhiều lỗi có thể chung một byte
+        shift = (6 - 2 * (errors % 4)).astype(np.uint8)
+        np.bitwise_and.at(packed, errors // 4, ~(np.uint8(3) << shift))
+        np.bitwise_or.at(packed, errors // 4, _legacy_bits(levels, previous, errors) << shift)
+    total = 2 * count if nbits is None else min(nbits, 2 * count)
+    return BitBuffer(packed[:-(-total // 8)], total), invalid
+
+def raise_on_invalid(levels, invalid, previous=1):
+    """Báo lỗi kiểu cũ cho mức không hợp lệ đầu tiên (nếu có)."""
+    if invalid.any():
+        i = int(np.argmax(invalid))
+        previous_level = levels[i - 1] if i else previous
+        raise ValueError(f"Không tìm thấy giá trị {levels[i]} với mức trước đó {previous_level}.")
@@ -0,0 +1,211 @@
+"""Vẽ tín hiệu dài tùy ý: giảm mẫu min/max theo từng cột điểm ảnh.
+
+Khung nhìn hẹp được vẽ đúng từng bước; khung nhìn rộng hơn 2 ký hiệu/cột
+được thay bằng dải tô kín giữa min và max của mỗi cột. Với khung nhìn rất rộng, min/max
+lấy từ bảng tóm tắt theo khối SUMMARY_BLOCK ký hiệu (tính một lượt khi cần lần
+đầu), nên phóng to/thu nhỏ một tín hiệu 100 triệu ký hiệu vẫn vẽ lại tức thì.
+Tín hiệu trong file .lcs được đọc lười qua memmap, chỉ đoạn nhìn thấy mới nạp.
+
+matplotlib chỉ được nạp trong plot_waveform; xuất ảnh hàng loạt xem linecode.render.
+"""
+import os
+from fractions import Fraction
+
+import numpy as np
+
+from linecode import registry
+from linecode.bitbuffer import as_packed
+from linecode.linesignal import Signal
+from linecode.signalfile import SignalFile, is_signal_file, open_signal, read_text_signal
+
+SUMMARY_BLOCK = 1 << 10
+# Số khối tóm tắt xử lý mỗi lượt khi tính bảng tóm tắt
+_SUMMARY_CHUNK = 1 << 12
+# Chỉ vẽ nhãn bit khi khung nhìn có không quá từng này nhãn
+LABEL_LIMIT = 128
+
+# === NGUỒN TÍN HIỆU ===
+class WaveformSource:
+    """Tín hiệu cần vẽ (mảng mức, Signal, SignalFile hoặc đường dẫn .lcs/.txt) kèm bảng min/max theo khối."""
+
+    def __init__(self, signal):
+        if isinstance(signal, (str, os.PathLike)):
+            signal = open_signal(signal) if is_signal_file(signal) else read_text_signal(signal)
+        if isinstance(signal, Signal):
+            # Vẽ theo ký hiệu (mỗi ký hiệu một đơn vị trên trục hoành)
+            self.code, self.alphabet = signal.code, signal.alphabet
+            symbols = signal.symbols
+            self.read = lambda start, stop: symbols[start:stop]
+        elif isinstance(signal, SignalFile):
+            self.code = signal.code
+            self.alphabet = signal.alphabet
+            self.read = signal.read
+        else:
+            levels = np.asarray(signal).ravel()
+            self.code = self.alphabet = None
+            self.read = lambda start, stop: levels[start:stop]
+        self.signal = signal
+        self.length = signal.symbols.size if isinstance(signal, Signal) else len(signal)
+        self._summary = None
+
+    def summary(self):
+        """(min, max) của từng khối SUMMARY_BLOCK ký hiệu; khối cuối có thể ngắn hơn."""
+        if self._summary is None:
+            count = -(-self.length // SUMMARY_BLOCK)
+            low = np.empty(count, dtype=np.int8)
+            high = np.empty(count, dtype=np.int8)
+            step = SUMMARY_BLOCK * _SUMMARY_CHUNK
+            for start in range(0, self.length, step):
+                levels = self.read(start, start + step)
+                first = start // SUMMARY_BLOCK
+                whole = levels.size // SUMMARY_BLOCK
+                blocks = levels[:whole * SUMMARY_BLOCK].reshape(whole, SUMMARY_BLOCK)
+                blocks.min(axis=1, out=low[first:first + whole])
+                blocks.max(axis=1, out=high[first:first + whole])
+                if levels.size % SUMMARY_BLOCK:
+                    low[first + whole] = levels[whole * SUMMARY_BLOCK:].min()
+                    high[first + whole] = levels[whole * SUMMARY_BLOCK:].max()
+            self._summary = (low, high)
+        return self._summary
+
+    def levels(self):
+        """Các mức dùng cho trục tung: tập mức của mã nếu biết, không thì min/max toàn tín hiệu."""
+        if self.alphabet is not None:
+            return list(self.alphabet)
+        if not self.length:
+            return [0]
+        low, high = self.summary()
+        return [int(low.min()), int(high.max())]
+
+    def envelope(self, start, stop, columns):
+        """Chia [start, stop) thành `columns` cột (mỗi cột ít nhất 2 ký hiệu), trả về (biên cột, min, max).
+
+        Cột rộng từ 2 khối tóm tắt trở lên dùng bảng tóm tắt, biên cột được
+        làm tròn về biên khối; còn lại đọc thẳng đoạn [start, stop).
+        """
+        edges = np.linspace(start, stop, columns + 1).astype(np.int64)
+        if stop - start >= 2 * SUMMARY_BLOCK * columns:
+            low, high = self.summary()
+            blocks = edges // SUMMARY_BLOCK
+            last = -(-stop // SUMMARY_BLOCK)
+            offsets = blocks[:-1] - blocks[0]
+            low = np.minimum.reduceat(low[blocks[0]:last], offsets)
+            high = np.maximum.reduceat(high[blocks[0]:last], offsets)
+            return blocks * SUMMARY_BLOCK, low, high
+        levels = self.read(start, stop)
+        offsets = edges[:-1] - start
+        return edges, np.minimum.reduceat(levels, offsets), np.maximum.reduceat(levels, offsets)
+
+# === VẼ ===
+class WaveformPlot:
+    """Đường tín hiệu trên một Axes, tự vẽ lại khi khung nhìn trục hoành thay đổi.
+
+    `bits` (tùy chọn) là dữ liệu gốc để ghi nhãn; mỗi nhãn là một nhóm
+    ký hiệu/bit nguyên của symbols_per_bit (như nhóm của bảng mã): Manchester
+    2 ký hiệu cho 1 bit, 2B1Q 1 ký hiệu cho 2 bit, 4B5B/MLT-3 5 ký hiệu cho 4 bit.
+    """
+
+    def __init__(self, ax, source, bits=None, symbols_per_bit=1, columns=None):
+        self.ax = ax
+        self.columns = columns
+        from matplotlib.patches import Polygon
+        self.line, = ax.plot([], [], linewidth=2, color='black')
+        # Đường bao min/max vẽ bằng đa giác tô kín: rẻ hơn nhiều so với đường zigzag dày đặc
+        self.band = ax.add_patch(Polygon(np.zeros((0, 2)), closed=True, facecolor='black',
+                                         edgecolor='black', linewidth=2, visible=False))
+        self.labels = []
+        self.set_source(source, bits, symbols_per_bit)
+        # Hàm lambda giữ tham chiếu mạnh tới đối tượng (matplotlib chỉ giữ tham chiếu yếu tới phương thức)
+        ax.callbacks.connect('xlim_changed', lambda ax: self.redraw())
+
+    def set_source(self, source, bits=None, symbols_per_bit=1):
+        """Đổi tín hiệu đang vẽ (dùng lại cùng Axes và đường vẽ); vẽ lại khi đặt khung nhìn."""
+        self.source = source
+        self.bits = None if bits is None else as_packed(bits)
+        ratio = Fraction(symbols_per_bit).limit_denominator()
+        self.span, self.group = ratio.numerator, ratio.denominator
+
+    def window(self):
+        """Đoạn ký hiệu [start, stop) đang nhìn thấy."""
+        left, right = self.ax.get_xlim()
+        start = min(max(int(np.floor(left)), 0), self.source.length)
+        return start, min(max(int(np.ceil(right)), start), self.source.length)
+
+    def redraw(self):
+        start, stop = self.window()
+        columns = self.columns or max(int(self.ax.bbox.width), 1)
+        envelope = stop - start > 2 * columns
+        if envelope:
+            edges, low, high = self.source.envelope(start, stop, columns)
+            x = np.repeat(edges, 2)[1:-1]
+            # Cạnh trên đi từ trái sang phải theo max, cạnh dưới quay về theo min
+            self.band.set_xy(np.concatenate([np.column_stack([x, np.repeat(high, 2)]),
+                                             np.column_stack([x[::-1], np.repeat(low[::-1], 2)])]))
+            self.line.set_data([], [])
+        elif stop > start:
+            # Vẽ đúng từng bước (kiểu where='post')
+            levels = self.source.read(start, stop)
+            self.line.set_data(np.repeat(np.arange(start, stop + 1), 2)[1:-1], np.repeat(levels, 2))
+        else:
+            self.line.set_data([], [])
+        self.band.set_visible(envelope)
+        self._draw_labels(start, stop)
+
+    def _draw_labels(self, start, stop):
+        for label in self.labels:
+            label.remove()
+        self.labels = []
+        if self.bits is None:
+            return
+        packed, nbits = self.bits
+        first = start // self.span
+        last = min(-(-stop // self.span), -(-nbits // self.group), -(-self.source.length // self.span))
+        if not first < last <= first + LABEL_LIMIT:
+            return
+        levels = self.source.read(first * self.span, last * self.span)
+        bits = np.unpackbits(packed[first * self.group // 8:-(-last * self.group // 8)])
+        bits = bits[first * self.group % 8:][:min(last * self.group, nbits) - first * self.group]
+        for k in range(last - first):
+            text = ''.join(map(str, bits[k * self.group:(k + 1) * self.group]))
+            top = levels[k * self.span:(k + 1) * self.span].max()
+            self.labels.append(self.ax.text((first + k + 0.5) * self.span, top + 0.2, text,
+                                            ha='center', va='bottom', fontsize=10,
+                                            bbox=dict(facecolor='white', edgecolor='none',
+                                                      boxstyle='round,pad=0')))
+
+def style_axes(ax):
+    """Kiểu trục chung của các đồ thị tín hiệu (nhãn trục, lưới đứt đoạn, bỏ khung trên/phải)."""
+    ax.set_xlabel("Thời gian (mẫu)")
+    ax.set_ylabel("Điện áp")
+    ax.grid(True, linestyle='dashed')
+    ax.spines['top'].set_color('none')
+    ax.spines['right'].set_color('none')
+
+def set_levels(ax, levels):
+    """Trục tung theo tập mức: mỗi mức một vạch, chừa 1 đơn vị trên và dưới."""
+    ax.set_ylim(min(levels) - 1, max(levels) + 1)
+    ax.set_yticks(levels, [f"{level:+d}" if level else "0" for level in levels])
+
+def plot_waveform(signal, title=None, bits=None, code=None, symbols_per_bit=None,
+                  start=0, stop=None, ax=None, columns=None):
+    """Vẽ tín hiệu (mảng mức, Signal, SignalFile hoặc đường dẫn file) trong khung nhìn [start, stop).
+
+    Trả về WaveformPlot; phóng to/kéo trên cửa sổ matplotlib sẽ tự vẽ lại.
+    `code` cho biết tập mức (trục tung) và số ký hiệu/bit để đặt nhãn bit.
+    """
+    source = WaveformSource(signal)
+    code = code or source.code
+    codec = registry.find(code)
+    if symbols_per_bit is None:
+        symbols_per_bit = codec.symbols_per_bit if codec else 1
+    if ax is None:
+        import matplotlib.pyplot as plt
+        _, ax = plt.subplots(figsize=(12, 4))
+    plot = WaveformPlot(ax, source, bits, symbols_per_bit, columns)
+    style_axes(ax)
+    set_levels(ax, codec.alphabet if codec else source.levels())
+    if title:
+        ax.set_title(title)
+    stop = source.length if stop is None else min(stop, source.length)
+    ax.set_xlim(start, max(stop, start + 1))
+    return plot
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Chạy được bằng `pytest` từ bất kỳ thư mục nào, không cần cài gói
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
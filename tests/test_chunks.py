@@ -0,0 +1,126 @@
+"""Mã hóa/giải mã theo khối (linecode.stream) và song song (linecode.parallel) phải trùng với làm một lần.
+
+Trạng thái vắt qua ranh giới khối (chẵn lẻ, mức cuối, pha MLT-3, bộ đếm
+thay thế B8ZS/HDB3, bit lẻ 2B1Q) là chỗ dễ sai nhất, nên mỗi mã đã đăng ký
+được thử với khối 1, 7 và 8·k±1 bit/ký hiệu.
+"""
+import numpy as np
+import pytest
+
+from linecode import parallel, registry
+from linecode.bitbuffer import BitBuffer
+from linecode.signalfile import SignalFile, write_signal
+from linecode.stream import StreamDecoder, StreamEncoder
+
+CODES = registry.names()
+CHUNKS = [1, 7, 15, 17, 63, 65]
+NBITS = 1203
+
+def random_bits(n, seed, ones=0.5):
+    return (np.random.default_rng([seed, n]).random(n) < ones).astype(np.uint8)
+
+def bit_streams():
+    # Mật độ bit 1 thấp để có các đoạn bit 0 dài (mẫu thay thế vắt qua ranh giới khối)
+    return [random_bits(NBITS, 0), random_bits(NBITS, 1, ones=0.08)]
+
+def split(array, size):
+    return [array[i:i + size] for i in range(0, array.size, size)]
+
+def stream_encode(code, bits, size):
+    encoder = StreamEncoder(code)
+    parts = [encoder.feed(chunk) for chunk in split(bits, size)]
+    parts.append(encoder.flush())
+    return np.concatenate(parts)
+
+def stream_decode(code, levels, size):
+    decoder = StreamDecoder(code)
+    results = [decoder.feed(chunk) for chunk in split(levels, size)]
+    results.append(decoder.flush())
+    bits = np.concatenate([result.bits.unpack() for result in results])
+    invalid = np.concatenate([result.invalid for result in results])
+    return bits, invalid
+
+def corrupt(signal, seed):
+    """Đổi vài ký hiệu thành mức lạ hoặc mức hợp lệ sai chỗ."""
+    signal = signal.copy()
+    rng = np.random.default_rng(seed)
+    positions = rng.choice(signal.size, size=max(signal.size // 50, 1), replace=False)
+    signal[positions] = rng.choice(np.array([-3, -1, 0, 1, 2, 3], np.int8), size=positions.size)
+    return signal
+
+# === LUỒNG ===
+@pytest.mark.parametrize("size", CHUNKS)
+@pytest.mark.parametrize("code", CODES)
+def test_stream_encoder_matches_one_shot(code, size):
+    codec = registry.get(code)
+    for bits in bit_streams():
+        np.testing.assert_array_equal(stream_encode(code, bits, size), codec.encode(BitBuffer.from_bits(bits)))
+
+@pytest.mark.parametrize("code", CODES)
+def test_stream_encoder_uneven_chunks(code):
+    codec = registry.get(code)
+    bits = random_bits(NBITS, 2, ones=0.1)
+    rng = np.random.default_rng(3)
+    cuts = np.sort(rng.choice(np.arange(1, NBITS), size=40, replace=False))
+    encoder = StreamEncoder(code)
+    parts = [encoder.feed(chunk) for chunk in np.split(bits, cuts)] + [encoder.flush()]
+    np.testing.assert_array_equal(np.concatenate(parts), codec.encode(BitBuffer.from_bits(bits)))
+
+@pytest.mark.parametrize("size", CHUNKS)
+@pytest.mark.parametrize("code", CODES)
+def test_stream_decoder_matches_one_shot(code, size):
+    codec = registry.get(code)
+    for seed, bits in enumerate(bit_streams()):
+        for levels in (codec.encode(BitBuffer.from_bits(bits)), corrupt(codec.encode(BitBuffer.from_bits(bits)), seed)):
+            expected = codec.decode(levels)
+            bits_out, invalid = stream_decode(code, levels, size)
+            np.testing.assert_array_equal(bits_out, expected.bits.unpack())
+            np.testing.assert_array_equal(invalid, expected.invalid)
+
+# === SONG SONG ===
+@pytest.mark.parametrize("size", [1, 7, 9, 15])
+@pytest.mark.parametrize("code", CODES)
+def test_parallel_encode_matches_one_shot(code, size):
+    codec = registry.get(code)
+    for bits in bit_streams():
+        # Số bit không trọn byte: khối cuối mang phần lẻ
+        data = BitBuffer.from_bits(bits)
+        np.testing.assert_array_equal(parallel.encode(data, code, processes=2, chunk_size=size), codec.encode(data))
+
+@pytest.mark.parametrize("code", CODES)
+def test_parallel_decode_matches_one_shot(code):
+    codec = registry.get(code)
+    for seed, bits in enumerate(bit_streams()):
+        levels = corrupt(codec.encode(BitBuffer.from_bits(bits)), seed)
+        expected = codec.decode(levels)
+        for size in CHUNKS:
+            # Khối được làm tròn lên bội số codec.block_symbols
+            result = parallel.decode(levels, code, processes=2, chunk_size=size * codec.block_symbols // 8 + 1)
+            np.testing.assert_array_equal(result.bits.unpack(), expected.bits.unpack())
+            np.testing.assert_array_equal(result.invalid, expected.invalid)
+
+@pytest.mark.parametrize("processes", [1, 2])
+@pytest.mark.parametrize("code", CODES)
+def test_parallel_decode_into_matches_one_shot(code, processes):
+    codec = registry.get(code)
+    levels = corrupt(codec.encode(BitBuffer.from_bits(random_bits(NBITS, 4, ones=0.1))), 5)
+    expected = codec.decode(levels)
+    for size in (1, 7, 17):
+        out = np.zeros(-(-expected.bits.nbits // 8) + 1, dtype=np.uint8)
+        nbits, errors = parallel.decode_into(levels, code, out, processes=processes,
+                                             chunk_size=size * codec.block_symbols)
+        assert nbits == expected.bits.nbits
+        np.testing.assert_array_equal(np.unpackbits(out, count=nbits), expected.bits.unpack())
+        np.testing.assert_array_equal(errors, np.flatnonzero(expected.invalid))
+
+@pytest.mark.parametrize("code", ["hdb3", "2b1q", "4b5b-mlt3"])
+def test_parallel_decode_signal_file(code, tmp_path):
+    # Tiến trình con tự đọc phần của mình từ file qua memmap
+    codec = registry.get(code)
+    levels = codec.encode(BitBuffer.from_bits(random_bits(NBITS, 6, ones=0.1)))
+    path = str(tmp_path / f"s.{code}.lcs")
+    write_signal(path, levels, code, codec.alphabet)
+    result = parallel.decode(SignalFile(path), code, processes=2, chunk_size=codec.block_symbols)
+    expected = codec.decode(levels)
+    np.testing.assert_array_equal(result.bits.unpack(), expected.bits.unpack())
+    np.testing.assert_array_equal(result.invalid, expected.invalid)
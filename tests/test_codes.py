@@ -0,0 +1,289 @@
+"""Các bộ mã hóa/giải mã vector hóa so với bản tham chiếu duyệt từng bit (theo bản gốc Encoding.py/Decoding.py).
+
+Bản tham chiếu cố ý viết chậm và đơn giản: mỗi mã một vòng lặp theo bit
+hoặc theo ký hiệu, không dùng chung gì với linecode ngoài tên mã.
+"""
+import numpy as np
+import pytest
+
+from linecode import decoders, encoders, registry
+from linecode.bitbuffer import BitBuffer
+
+# Độ dài gồm cả số lẻ (2B1Q đệm bit, 4B5B đệm nửa byte) và không trọn byte
+LENGTHS = [0, 1, 2, 3, 7, 8, 9, 15, 16, 17, 63, 64, 65, 255, 1001]
+CODES = list(encoders.ENCODERS)
+
+def random_bits(n, seed=0, ones=0.5):
+    return (np.random.default_rng([seed, n]).random(n) < ones).astype(np.uint8)
+
+# === MÃ HÓA THAM CHIẾU ===
+def ref_encode(code, bits):
+    bits = [int(b) for b in bits]
+    signal = []
+    if code == "unipolar":
+        signal = bits
+    elif code == "nrz-l":
+        signal = [-1 if b else 1 for b in bits]
+    elif code == "nrz-i":
+        level = 1
+        for b in bits:
+            if b:
+                level = -level
+            signal.append(level)
+    elif code == "rz":
+        for b in bits:
+            signal += [1, 0] if b else [-1, 0]
+    elif code == "manchester":
+        for b in bits:
+            signal += [-1, 1] if b else [1, -1]
+    elif code == "diffmanchester":
+        level = 1
+        for b in bits:
+            if not b:
+                level = -level
+            signal += [level, -level]
+            level = -level
+    elif code in ("ami", "pseudoternary"):
+        mark = 1 if code == "ami" else 0
+        level = 1
+        for b in bits:
+            if b == mark:
+                signal.append(level)
+                level = -level
+            else:
+                signal.append(0)
+    elif code == "2b1q":
+        table = {(0, 0): 1, (0, 1): 3, (1, 0): -1, (1, 1): -3}
+        level = 1
+        padded = bits + [0] * (len(bits) % 2)
+        for i in range(0, len(padded), 2):
+            magnitude = table[padded[i], padded[i + 1]]
+            level = magnitude if level > 0 else -magnitude
+            signal.append(level)
+    return np.array(signal, dtype=np.int8)
+
+def ref_substitution(bits, size):
+    """B8ZS (size 8) / HDB3 (size 4) duyệt từng bit, xung đầu tiên là +1."""
+    bits = [int(b) for b in bits]
+    signal, last, count, i = [], -1, 0, 0
+    while i < len(bits):
+        if bits[i]:
+            last = -last
+            signal.append(last)
+            count += 1
+            i += 1
+        elif bits[i:i + size] == [0] * size:
+            if size == 8:
+                signal += [0, 0, 0, last, -last, 0, -last, last]
+            elif count % 2:
+                signal += [0, 0, 0, last]
+            else:
+                last = -last
+                signal += [last, 0, 0, last]
+            count = 0
+            i += size
+        else:
+            signal.append(0)
+            i += 1
+    return np.array(signal, dtype=np.int8)
+
+def ref_mlt3(bits, phase=0):
+    cycle = [0, 1, 0, -1]
+    signal = []
+    for b in bits:
+        phase = (phase + int(b)) % 4
+        signal.append(cycle[phase])
+    return np.array(signal, dtype=np.int8)
+
+FOUR_B_FIVE_B = ["11110", "01001", "10100", "10101", "01010", "01011", "01110", "01111",
+                 "10010", "10011", "10110", "10111", "11010", "11011", "11100", "11101"]
+
+def ref_4b5b(bits):
+    bits = [int(b) for b in bits]
+    bits += [0] * (-len(bits) % 4)
+    words = []
+    for i in range(0, len(bits), 4):
+        nibble = int(''.join(map(str, bits[i:i + 4])), 2)
+        words += [int(c) for c in FOUR_B_FIVE_B[nibble]]
+    return ref_mlt3(words)
+
+# === GIẢI MÃ THAM CHIẾU ===
+def ref_decode(code, levels):
+    """(bit, mặt nạ lỗi) theo từng chu kỳ bit, hoặc từng mức với 2B1Q."""
+    levels = [int(level) for level in levels]
+    bits, invalid = [], []
+    if code == "unipolar":
+        bits = [int(level == 1) for level in levels]
+        invalid = [level not in (0, 1) for level in levels]
+    elif code == "nrz-l":
+        bits = [int(level == -1) for level in levels]
+        invalid = [abs(level) != 1 for level in levels]
+    elif code == "nrz-i":
+        previous = 1
+        for level in levels:
+            bits.append(int(level != previous))
+            invalid.append(abs(level) != 1)
+            previous = level
+    elif code in ("rz", "manchester", "diffmanchester"):
+        if len(levels) % 2:
+            levels.append(127)
+        one, zero = {"rz": ((1, 0), (-1, 0))}.get(code, ((-1, 1), (1, -1)))
+        previous = 1
+        for i in range(0, len(levels), 2):
+            pair = (levels[i], levels[i + 1])
+            invalid.append(pair not in (one, zero))
+            if code == "diffmanchester":
+                bits.append(int(levels[i] == previous))
+                previous = levels[i + 1]
+            elif pair in (one, zero):
+                bits.append(int(pair == one))
+            else:
+                # Chu kỳ lỗi lấy bit theo nửa đầu
+                bits.append(int(levels[i] == one[0]))
+    elif code in ("ami", "pseudoternary"):
+        last = -1
+        for level in levels:
+            bits.append(int((level != 0) == (code == "ami")))
+            invalid.append(abs(level) > 1 or level == last)
+            if abs(level) == 1:
+                last = level
+    elif code == "2b1q":
+        previous = 1
+        for level in levels:
+            bits += [int(level * previous < 0), int(abs(level) == 3)]
+            invalid.append(level not in (-3, -1, 1, 3))
+            previous = level
+    return np.array(bits, dtype=np.uint8), np.array(invalid, dtype=bool)
+
+def ref_decode_mlt3(levels):
+    bits, invalid, previous = [], [], 0
+    for level in map(int, levels):
+        bits.append(int(level != previous))
+        invalid.append(abs(level) > 1 or abs(level - previous) == 2)
+        previous = level
+    return np.array(bits, dtype=np.uint8), np.array(invalid, dtype=bool)
+
+def noisy_levels(code, n, seed):
+    """Tín hiệu ngẫu nhiên gồm mức hợp lệ và vài mức lạ, để thử cả nhánh xử lý ký hiệu lỗi."""
+    rng = np.random.default_rng([seed, n])
+    alphabet = np.array(encoders.ALPHABETS[code] + (0, 2, -3), dtype=np.int8)
+    weights = np.full(alphabet.size, 1.0)
+    weights[-3:] = 0.05
+    return rng.choice(alphabet, size=n, p=weights / weights.sum())
+
+# === CÁC MÃ TRONG linecode.encoders / linecode.decoders ===
+@pytest.mark.parametrize("n", LENGTHS)
+@pytest.mark.parametrize("code", CODES)
+def test_encoder_matches_reference(code, n):
+    bits = random_bits(n)
+    signal = encoders.ENCODERS[code](BitBuffer.from_bits(bits))
+    assert signal.dtype == np.int8
+    np.testing.assert_array_equal(signal, ref_encode(code, bits))
+
+@pytest.mark.parametrize("code", CODES)
+def test_encoder_long_runs(code):
+    # Chuỗi toàn 0, toàn 1 và thưa bit 1 kiểm tra trạng thái kéo dài qua nhiều byte
+    for bits in (np.zeros(77, np.uint8), np.ones(77, np.uint8), random_bits(333, 1, ones=0.05)):
+        np.testing.assert_array_equal(encoders.ENCODERS[code](BitBuffer.from_bits(bits)), ref_encode(code, bits))
+
+@pytest.mark.parametrize("n", LENGTHS)
+@pytest.mark.parametrize("code", CODES)
+def test_decoder_round_trip(code, n):
+    bits = random_bits(n, 2)
+    signal = ref_encode(code, bits)
+    if code == "2b1q":
+        result = decoders.DECODERS[code](signal, nbits=n)
+    else:
+        result = decoders.DECODERS[code](signal)
+    np.testing.assert_array_equal(result.bits.unpack(), bits)
+    assert not result.invalid.any()
+
+@pytest.mark.parametrize("n", LENGTHS)
+@pytest.mark.parametrize("code", CODES)
+def test_decoder_matches_reference_on_invalid_symbols(code, n):
+    levels = noisy_levels(code, n, 3)
+    bits, invalid = decoders.DECODERS[code](levels)
+    expected_bits, expected_invalid = ref_decode(code, levels)
+    np.testing.assert_array_equal(invalid, expected_invalid)
+    np.testing.assert_array_equal(bits.unpack(), expected_bits)
+
+def test_two_b_one_q_pads_odd_length():
+    # 3 bit "101" → cặp "10" (đổi dấu, biên độ 1) rồi "1" đệm thành "10"
+    np.testing.assert_array_equal(encoders.two_b_one_q("101"), [-1, 1])
+    bits, invalid = decoders.two_b_one_q(np.array([-1, 1], np.int8), nbits=3)
+    assert str(bits) == "101" and not invalid.any()
+
+# === B8ZS, HDB3, MLT-3, 4B5B (mã cắm thêm trong linecode.registry) ===
+def test_hdb3_hand_example():
+    # 1 | 0000 sau 1 xung (lẻ) → 000V | 1 | 0000 (lẻ) → 000V | 0000 (chẵn) → B00V
+    bits = "1" "0000" "1" "0000" "0000"
+    expected = [1, 0, 0, 0, 1, -1, 0, 0, 0, -1, 1, 0, 0, 1]
+    np.testing.assert_array_equal(registry.get("hdb3").encode(bits), expected)
+    result = registry.get("hdb3").decode(np.array(expected, np.int8))
+    assert str(result.bits) == bits and not result.invalid.any()
+
+def test_hdb3_starts_with_b00v():
+    # Từ đầu luồng chưa có xung nào (chẵn) → B00V, xung B là +1
+    np.testing.assert_array_equal(registry.get("hdb3").encode("00001"), [1, 0, 0, 1, -1])
+
+def test_b8zs_hand_example():
+    # Xung trước +1 → 000+-0-+; xung trước -1 → 000-+0+-; cực tính sau mẫu không đổi
+    bits = "1" "00000000" "1" "00000000" "1"
+    expected = [1, 0, 0, 0, 1, -1, 0, -1, 1, -1, 0, 0, 0, -1, 1, 0, 1, -1, 1]
+    np.testing.assert_array_equal(registry.get("b8zs").encode(bits), expected)
+    result = registry.get("b8zs").decode(np.array(expected, np.int8))
+    assert str(result.bits) == bits and not result.invalid.any()
+
+def test_b8zs_short_run_is_plain_ami():
+    np.testing.assert_array_equal(registry.get("b8zs").encode("100000001"), [1, 0, 0, 0, 0, 0, 0, 0, -1])
+
+@pytest.mark.parametrize("code", ["b8zs", "hdb3"])
+def test_stray_violation_is_invalid(code):
+    # Hai xung cùng dấu không nằm trong mẫu thay thế nào là lỗi
+    result = registry.get(code).decode(np.array([1, 0, 1, -1], np.int8))
+    np.testing.assert_array_equal(result.invalid, [False, False, True, False])
+
+@pytest.mark.parametrize("n", LENGTHS)
+@pytest.mark.parametrize("code,size", [("b8zs", 8), ("hdb3", 4)])
+def test_substitution_matches_reference(code, size, n):
+    for ones in (0.5, 0.1):
+        bits = random_bits(n, 4, ones)
+        signal = registry.get(code).encode(BitBuffer.from_bits(bits))
+        np.testing.assert_array_equal(signal, ref_substitution(bits, size))
+        result = registry.get(code).decode(signal)
+        np.testing.assert_array_equal(result.bits.unpack(), bits)
+        assert not result.invalid.any()
+
+def test_mlt3_hand_example():
+    # Chu kỳ 0 → +1 → 0 → -1 → 0, bit 0 giữ mức
+    np.testing.assert_array_equal(registry.get("mlt-3").encode("111101"), [1, 0, -1, 0, 0, 1])
+
+def test_mlt3_state_carries_phase():
+    codec = registry.get("mlt-3")
+    # Sau "11" pha là 2 (mức 0, lần chuyển tiếp theo xuống -1)
+    signal, phase = codec.state.encode(codec.encode, "11", codec.state.initial)
+    assert phase == 2
+    np.testing.assert_array_equal(codec.state.encode(codec.encode, "1011", phase)[0], [-1, -1, 0, 1])
+    assert codec.state.advance(np.array([0xFF], np.uint8), 0) == 0
+    assert codec.state.advance(np.array([0x07], np.uint8), 0) == 3
+
+@pytest.mark.parametrize("n", LENGTHS)
+def test_mlt3_matches_reference(n):
+    bits = random_bits(n, 5)
+    codec = registry.get("mlt-3")
+    np.testing.assert_array_equal(codec.encode(BitBuffer.from_bits(bits)), ref_mlt3(bits))
+    levels = noisy_levels("ami", n, 6)
+    result = codec.decode(levels)
+    expected_bits, expected_invalid = ref_decode_mlt3(levels)
+    np.testing.assert_array_equal(result.bits.unpack(), expected_bits)
+    np.testing.assert_array_equal(result.invalid, expected_invalid)
+
+@pytest.mark.parametrize("n", LENGTHS)
+def test_4b5b_matches_reference(n):
+    bits = random_bits(n, 7)
+    codec = registry.get("4b5b-mlt3")
+    signal = codec.encode(BitBuffer.from_bits(bits))
+    np.testing.assert_array_equal(signal, ref_4b5b(bits))
+    result = codec.decode(signal)
+    np.testing.assert_array_equal(result.bits.unpack()[:n], bits)
+    assert not result.invalid.any()
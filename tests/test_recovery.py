@@ -0,0 +1,197 @@
+"""Khôi phục khi tín hiệu hỏng: chỉ khung/khối nén chứa chỗ hỏng bị mất; kho .lca hỏng báo lỗi rõ ràng."""
+import io
+import os
+import zlib
+
+import numpy as np
+import pytest
+
+from linecode import archive, compression, framing, registry
+from linecode.archive import Archive, ArchiveWriter, compact
+
+PAYLOAD = 400
+FRAMES = 20
+HIT = 7
+
+def random_data(size, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, size, dtype=np.uint8).tobytes()
+
+def compressible_data(size, seed=0):
+    """Dữ liệu nén được (nhiều đoạn lặp) để khối nén ngắn hơn khối gốc."""
+    rng = np.random.default_rng(seed)
+    words = [bytes(rng.integers(97, 123, rng.integers(2, 9), dtype=np.uint8)) for _ in range(64)]
+    text = b' '.join(words[i] for i in rng.integers(0, len(words), size))
+    return text[:size]
+
+def slip(signal, position, kind):
+    """Bỏ (`drop`) hoặc chèn lặp (`insert`) một ký hiệu tại `position`."""
+    if kind == "drop":
+        return np.delete(signal, position)
+    return np.insert(signal, position, signal[position])
+
+def symbol_at(codec, byte):
+    """Vị trí ký hiệu ứng với byte `byte` của dữ liệu đã đóng khung."""
+    return codec.symbols(8 * byte)
+
+def covered(ranges):
+    return sum(stop - start for start, stop in ranges)
+
+# === ĐÓNG KHUNG: BỎ/CHÈN MẪU ===
+@pytest.mark.parametrize("kind", ["drop", "insert"])
+@pytest.mark.parametrize("code", registry.names())
+def test_slip_loses_only_the_hit_frame(code, kind):
+    codec = registry.get(code)
+    data = random_data(PAYLOAD * FRAMES)
+    signal = codec.encode(framing.frame(data, PAYLOAD))
+    # Giữa payload của khung HIT
+    frame_bytes = framing.OVERHEAD + PAYLOAD
+    bad = slip(signal, symbol_at(codec, HIT * frame_bytes + framing.OVERHEAD + PAYLOAD // 2), kind)
+    report = framing.decode_frames(bad, code, processes=1)
+    hit = (HIT * PAYLOAD, (HIT + 1) * PAYLOAD)
+    assert all(hit[0] <= start and stop <= hit[1] for start, stop in report.damaged), report.damaged
+    assert set(report.missing) <= {HIT}
+    assert [info.sequence for info in report.frames if not info.ok] in ([], [HIT])
+    restored = np.frombuffer(report.data, dtype=np.uint8).copy()
+    original = np.frombuffer(data, dtype=np.uint8).copy()
+    restored[hit[0]:hit[1]] = original[hit[0]:hit[1]] = 0
+    np.testing.assert_array_equal(restored, original)
+
+@pytest.mark.parametrize("code", ["nrz-l", "manchester", "4b5b-mlt3"])
+def test_two_slips_lose_two_frames(code):
+    codec = registry.get(code)
+    data = random_data(PAYLOAD * FRAMES, 1)
+    signal = codec.encode(framing.frame(data, PAYLOAD))
+    frame_bytes = framing.OVERHEAD + PAYLOAD
+    bad = slip(signal, symbol_at(codec, 12 * frame_bytes + 100), "insert")
+    bad = slip(bad, symbol_at(codec, 3 * frame_bytes + 100), "drop")
+    report = framing.decode_frames(bad, code, processes=1)
+    lost = {start // PAYLOAD for start, _ in report.damaged} | {(stop - 1) // PAYLOAD for _, stop in report.damaged}
+    assert lost <= {3, 12}
+    assert covered(report.damaged) <= 2 * PAYLOAD
+
+def test_unframed_region_reported_missing():
+    # Cắt bỏ hẳn một khung: khung đó nằm trong `missing`, các khung khác nguyên vẹn
+    codec = registry.get("ami")
+    data = random_data(PAYLOAD * FRAMES, 2)
+    frame_bytes = framing.OVERHEAD + PAYLOAD
+    signal = codec.encode(framing.frame(data, PAYLOAD))
+    bad = np.delete(signal, np.arange(symbol_at(codec, HIT * frame_bytes), symbol_at(codec, (HIT + 1) * frame_bytes)))
+    report = framing.decode_frames(bad, "ami", processes=1)
+    assert report.missing == [HIT]
+    assert report.damaged == [(HIT * PAYLOAD, (HIT + 1) * PAYLOAD)]
+
+# === NÉN THEO KHỐI ===
+def test_corrupt_block_loses_only_that_block():
+    data = compressible_data(20000)
+    blocks, info = compression.compress_blocks(data, "zlib", 2000)
+    stream = bytearray(b''.join(blocks))
+    # Hỏng giữa khối nén thứ 3 (zlib phát hiện qua checksum)
+    start = sum(info["blocks"][:3])
+    stream[start + info["blocks"][3] // 2] ^= 0xFF
+    out, lost = compression.decompress_blocks(bytes(stream), info)
+    assert lost == [(3 * 2000, 4 * 2000)]
+    original = np.frombuffer(data, dtype=np.uint8)
+    np.testing.assert_array_equal(out[:6000], original[:6000])
+    np.testing.assert_array_equal(out[8000:], original[8000:])
+    with pytest.raises(ValueError):
+        compression.decompress(bytes(stream), info)
+
+def test_damaged_ranges_skip_blocks():
+    data = compressible_data(10000, 1)
+    blocks, info = compression.compress_blocks(data, "delta+zlib", 1000)
+    stream = b''.join(blocks)
+    # Vùng hỏng (tọa độ dữ liệu nén) chạm hai khối 5 và 6
+    first = sum(info["blocks"][:5])
+    out, lost = compression.decompress_blocks(stream, info, damaged=[(first + 1, first + info["blocks"][5] + 1)])
+    assert lost == [(5000, 7000)]
+    np.testing.assert_array_equal(out[:5000], np.frombuffer(data, dtype=np.uint8)[:5000])
+
+@pytest.mark.parametrize("kind", ["drop", "insert"])
+@pytest.mark.parametrize("code", ["ami", "manchester", "2b1q"])
+def test_slip_in_framed_compressed_signal_loses_one_block(code, kind):
+    codec = registry.get(code)
+    data = compressible_data(30000, 2)
+    blocks, info = compression.compress_blocks(data, "zlib", 1500)
+    framed = b''.join(framing.block_frames(blocks))
+    signal = codec.encode(framed)
+    # Giữa payload của khung (khối nén) HIT
+    offsets = np.cumsum([0] + [framing.OVERHEAD + size for size in info["blocks"]])
+    bad = slip(signal, symbol_at(codec, int(offsets[HIT]) + framing.OVERHEAD + info["blocks"][HIT] // 2), kind)
+    report = framing.decode_frames(bad, code, processes=1)
+    out, lost = compression.decompress_blocks(report.data, info, report.damaged)
+    assert lost == [(HIT * 1500, (HIT + 1) * 1500)]
+    original = np.frombuffer(data, dtype=np.uint8)
+    np.testing.assert_array_equal(out[:HIT * 1500], original[:HIT * 1500])
+    np.testing.assert_array_equal(out[(HIT + 1) * 1500:], original[(HIT + 1) * 1500:])
+
+# === KHO .lca ===
+def write_archive(path, rounds=1):
+    signals = {}
+    rng = np.random.default_rng(3)
+    for _ in range(rounds):
+        with ArchiveWriter(path) as target:
+            for name in ("a", "b"):
+                signals[name] = rng.choice(np.array([-1, 0, 1], np.int8), size=5000)
+                target.write(name, signals[name], "ami", payload={"kind": "raw", "name": name})
+    return signals
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Ghi lại các file archive.py mở, để kiểm tra chúng đều được đóng."""
+    files = []
+
+    def tracking_open(*args, **kwargs):
+        f = io.open(*args, **kwargs)
+        files.append(f)
+        return f
+    monkeypatch.setattr(archive, "open", tracking_open, raising=False)
+    return files
+
+def corrupt_index(path):
+    with open(path, 'r+b') as f:
+        _, _, index_offset, index_size = archive._PREFIX.unpack(f.read(archive._PREFIX.size))
+        f.seek(index_offset)
+        f.write(b'\xff' * index_size)
+
+@pytest.mark.parametrize("damage", ["index", "not-archive"])
+def test_writer_closes_handle_on_bad_archive(tmp_path, opened, damage):
+    path = str(tmp_path / "x.lca")
+    if damage == "index":
+        write_archive(path)
+        corrupt_index(path)
+    else:
+        with open(path, 'wb') as f:
+            f.write(b'not an archive' * 8)
+    opened.clear()
+    with pytest.raises(ValueError):
+        ArchiveWriter(path)
+    assert opened and all(f.closed for f in opened)
+    with pytest.raises(ValueError):
+        Archive(path)
+    assert all(f.closed for f in opened)
+
+def test_compact_keeps_live_records(tmp_path):
+    path = str(tmp_path / "x.lca")
+    signals = write_archive(path, rounds=3)
+    before = os.path.getsize(path)
+    freed = compact(path)
+    assert freed > 0 and os.path.getsize(path) == before - freed
+    restored = Archive(path)
+    assert restored.names() == ["a", "b"]
+    for name, signal in signals.items():
+        np.testing.assert_array_equal(restored[name].levels(), signal)
+        assert restored[name].payload["name"] == name
+    assert compact(path) == 0
+    assert os.listdir(tmp_path) == ["x.lca"]
+
+def test_compact_leaves_bad_archive_untouched(tmp_path):
+    path = str(tmp_path / "x.lca")
+    write_archive(path)
+    corrupt_index(path)
+    with open(path, 'rb') as f:
+        checksum = zlib.crc32(f.read())
+    with pytest.raises(ValueError):
+        compact(path)
+    with open(path, 'rb') as f:
+        assert zlib.crc32(f.read()) == checksum
+    assert os.listdir(tmp_path) == ["x.lca"]